@@ -1,7 +1,13 @@
+import argparse
 import json
-import cv2
+import sys
 from pathlib import Path
 
+# Make the shared annotation_toolkit package importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from annotation_toolkit.profiling import count, profiling, stage
+
 """
 converter.py
 
@@ -11,19 +17,27 @@ Supported:
 - Standard COCO JSON structure
 - Bounding-box based annotations
 - Multiple categories
+- Optional NMS / weighted box fusion of overlapping boxes per class
 """
 
+# Print the progress counter every N images
+PROGRESS_EVERY = 100
+
 
 # --------------------------------------------------
 # Utility Functions
 # --------------------------------------------------
 
 def read_json(json_file):
-    with open(json_file, "r") as f:
-        return json.load(f)
+    with stage("read"), open(json_file, "r") as f:
+        text = f.read()
+    with stage("parse"):
+        return json.loads(text)
 
 
 def get_image_shape(image_path):
+    import cv2  # only needed here; keeps converter startup light
+
     img = cv2.imread(str(image_path))
     if img is None:
         raise FileNotFoundError(f"Image not found: {image_path}")
@@ -50,6 +64,43 @@ def coco_bbox_to_yolo(bbox, img_width, img_height):
     )
 
 
+def suppress_coco_bboxes(category_ids, bboxes, method, iou_thr):
+    """
+    Merge overlapping same-category COCO boxes of one image.
+
+    Args:
+        category_ids (list[int]): Category id (or YOLO class) per box
+        bboxes (list[list[float]]): COCO [xmin, ymin, width, height] boxes
+        method (str): "nms" or "wbf"
+        iou_thr (float): IoU threshold
+
+    Returns:
+        tuple: (category_ids, bboxes) after suppression
+    """
+
+    if len(bboxes) < 2:
+        return category_ids, bboxes
+
+    from annotation_toolkit.boxes import xywh_to_xyxy
+    from annotation_toolkit.suppression import suppress_boxes
+
+    leader_boxes = xywh_to_xyxy(bboxes)
+    boxes, classes, _, keep = suppress_boxes(
+        leader_boxes, category_ids, method=method, iou_thr=iou_thr
+    )
+
+    merged = []
+    for i, box in zip(keep, boxes):
+        # NMS leaders and boxes that absorbed nothing stay unchanged
+        if (box == leader_boxes[i]).all():
+            merged.append(bboxes[i])
+        else:
+            x1, y1, x2, y2 = box.tolist()
+            merged.append([x1, y1, x2 - x1, y2 - y1])
+
+    return classes.tolist(), merged
+
+
 def find_image_by_name(file_name, img_dir):
     """
     Locate image file using its file_name from COCO JSON.
@@ -65,7 +116,25 @@ def find_image_by_name(file_name, img_dir):
 # Main Conversion Logic
 # --------------------------------------------------
 
-def process_coco_json(json_file, img_dir, output_dir):
+def process_coco_json(json_file, img_dir, output_dir, suppression=None, iou_thr=0.7,
+                      writer=None, class_map=None):
+    """
+    Convert one COCO JSON file into per-image YOLO label files.
+
+    Args:
+        json_file (Path): COCO annotation file
+        img_dir (Path, optional): Image directory; None skips the image
+                                  existence check (e.g. images kept in shards)
+        output_dir (Path): YOLO TXT output directory
+        suppression (str, optional): "nms" or "wbf" to merge overlapping
+                                     boxes of the same category per image
+        iou_thr (float): IoU threshold for suppression
+        writer (ShardWriter, optional): Write labels into tar / zip shards
+                                        instead of output_dir
+        class_map (ClassMap, optional): Class mapping config, compiled against
+                                        the categories of this file
+    """
+
     coco = read_json(json_file)
 
     images = coco.get("images", [])
@@ -74,59 +143,158 @@ def process_coco_json(json_file, img_dir, output_dir):
     # Map image_id -> image info
     image_map = {img["id"]: img for img in images}
 
-    # Group annotations by image_id
+    # YOLO class of every annotation, mapped in one lookup
+    if class_map is None:
+        classes = [ann["category_id"] - 1 for ann in annotations]  # COCO → YOLO index
+    else:
+        categories = {c["id"]: c["name"] for c in coco.get("categories", [])}
+        class_lut = class_map.compile(categories, id_space="coco")
+        classes = class_lut.map([ann["category_id"] for ann in annotations]).tolist()
+
+    # Group (class, bbox) by image_id
     ann_by_image = {}
-    for ann in annotations:
-        ann_by_image.setdefault(ann["image_id"], []).append(ann)
+    for ann, class_id in zip(annotations, classes):
+        # Dropped by the class map
+        if class_map is not None and class_id < 0:
+            continue
+        ann_by_image.setdefault(ann["image_id"], []).append((class_id, ann["bbox"]))
+
+    for index, (image_id, image_info) in enumerate(image_map.items()):
+        # Console output is slow; report progress every few images only
+        if index % PROGRESS_EVERY == 0:
+            print(f"\rConverting {json_file.name}: image {index}", end="")
 
-    for image_id, image_info in image_map.items():
         file_name = image_info["file_name"]
         img_width = image_info["width"]
         img_height = image_info["height"]
 
-        image_path = find_image_by_name(file_name, img_dir)
+        if img_dir is not None:
+            with stage("probe"):
+                find_image_by_name(file_name, img_dir)
 
-        yolo_lines = []
+        image_anns = ann_by_image.get(image_id, [])
+        class_ids = [class_id for class_id, _ in image_anns]
+        bboxes = [bbox for _, bbox in image_anns]
 
-        for ann in ann_by_image.get(image_id, []):
-            category_id = ann["category_id"] - 1  # COCO → YOLO index
-            bbox = ann["bbox"]
+        with stage("transform"):
+            if suppression is not None:
+                class_ids, bboxes = suppress_coco_bboxes(
+                    class_ids, bboxes, suppression, iou_thr
+                )
 
-            x, y, w, h = coco_bbox_to_yolo(
-                bbox,
-                img_width,
-                img_height,
-            )
+            yolo_lines = []
 
-            yolo_lines.append(f"{category_id} {x} {y} {w} {h}")
+            for class_id, bbox in zip(class_ids, bboxes):
+                x, y, w, h = coco_bbox_to_yolo(
+                    bbox,
+                    img_width,
+                    img_height,
+                )
+
+                yolo_lines.append(f"{class_id} {x} {y} {w} {h}")
+
+        count("images")
+        count("objects", len(yolo_lines))
+
+        with stage("serialize"):
+            text = "\n".join(yolo_lines)
+
+        if writer is not None:
+            with stage("write"):
+                writer.write(Path(file_name).stem, {"txt": text})
+            continue
 
         output_dir.mkdir(parents=True, exist_ok=True)
         output_txt = output_dir / (Path(file_name).stem + ".txt")
 
-        with open(output_txt, "w") as f:
-            f.write("\n".join(yolo_lines))
+        with stage("write"), open(output_txt, "w") as f:
+            f.write(text)
+
+    target = "shards" if writer is not None else output_dir
+    print(f"\rConverted {json_file.name}: {len(image_map)} images → {target}")
 
-        print(f"Converted: {file_name} → {output_txt}")
 
+def convert_all_coco_to_yolo(json_dir, img_dir, output_dir, suppression=None, iou_thr=0.7,
+                             class_map=None):
+    """
+    Convert every COCO JSON file in a directory.
+
+    output_dir may also be a shard pattern ending in .tar / .zip
+    (e.g. "output/labels-%06d.tar"): labels are then written into
+    shards instead of one file per image.
+    """
+
+    from annotation_toolkit.shards import ShardWriter, is_shard
 
-def convert_all_coco_to_yolo(json_dir, img_dir, output_dir):
     json_dir = Path(json_dir)
-    img_dir = Path(img_dir)
-    output_dir = Path(output_dir)
+    img_dir = None if img_dir is None else Path(img_dir)
 
-    json_files = sorted(json_dir.glob("*.json"))
+    with stage("discover"):
+        json_files = sorted(json_dir.glob("*.json"))
 
+    if is_shard(output_dir):
+        with ShardWriter(str(output_dir)) as writer:
+            for json_file in json_files:
+                process_coco_json(
+                    json_file, img_dir, None, suppression, iou_thr, writer, class_map
+                )
+        return
+
+    output_dir = Path(output_dir)
     for json_file in json_files:
-        process_coco_json(json_file, img_dir, output_dir)
+        process_coco_json(
+            json_file, img_dir, output_dir, suppression, iou_thr, class_map=class_map
+        )
 
 
 # --------------------------------------------------
 # Entry Point
 # --------------------------------------------------
 
-if __name__ == "__main__":
-    json_dir = "input/json"      # COCO JSON files
-    img_dir = "input/img"        # Image directory
-    output_dir = "output/"   # YOLO TXT output
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
 
-    convert_all_coco_to_yolo(json_dir, img_dir, output_dir)
+    parser = argparse.ArgumentParser(
+        description="Convert COCO annotations to YOLO label files"
+    )
+    parser.add_argument("--json-dir", default="input/json", help="COCO JSON files.")
+    parser.add_argument("--img-dir", default="input/img", help="Image directory.")
+    parser.add_argument("--output", default="output/",
+                        help="YOLO TXT output directory or shard pattern (labels-%%06d.tar).")
+    parser.add_argument("--suppression", choices=["nms", "wbf"], default=None,
+                        help="Merge overlapping boxes of the same category.")
+    parser.add_argument("--iou-thr", type=float, default=0.7, help="IoU threshold for suppression.")
+    parser.add_argument("--class-map", default=None,
+                        help="Class mapping JSON (annotation_toolkit/classmap.py).")
+    parser.add_argument("--profile", default=None,
+                        help="Write per-stage timings and counters to this JSON file.")
+    parser.add_argument("--profile-capture", default=None,
+                        help="With --profile, also write a cProfile (.prof) or pyinstrument (.html) capture.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.profile:
+        with profiling(opt.profile, opt.profile_capture):
+            run(opt)
+    else:
+        run(opt)
+
+
+def run(opt):
+    class_map = None
+    if opt.class_map:
+        from annotation_toolkit.classmap import load_class_map
+
+        class_map = load_class_map(opt.class_map)
+
+    convert_all_coco_to_yolo(
+        opt.json_dir, opt.img_dir, opt.output, opt.suppression, opt.iou_thr, class_map
+    )
+
+
+if __name__ == "__main__":
+    main(get_args())
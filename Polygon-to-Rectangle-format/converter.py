@@ -1,4 +1,10 @@
+import argparse
 import os
+import sys
+from pathlib import Path
+
+# Make the shared annotation_toolkit package importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 """
 converter.py
@@ -10,6 +16,7 @@ Key Features:
 - Filters out very small objects using pixel-based size thresholds
 - Outputs YOLO-compatible normalized bounding boxes
 - Supports batch processing of annotation files
+- Optional NMS / weighted box fusion of overlapping boxes per class
 
 Expected Input Format (per line):
 <class_id> x1 y1 x2 y2 x3 y3 ...
@@ -25,13 +32,49 @@ IMAGE_WIDTH_PX = 1920
 IMAGE_HEIGHT_PX = 1080
 MIN_BOX_SIZE_PX = 15  # minimum allowed edge length in pixels
 
+# ===============================
+# DUPLICATE SUPPRESSION
+# ===============================
+SUPPRESSION = None          # None, "nms" or "wbf"
+SUPPRESSION_IOU_THR = 0.7   # boxes overlapping more than this are merged
+
+# ===============================
+# I/O
+# ===============================
+READ_WORKERS = 8  # annotation files read ahead in parallel
+
+
+def is_small_box(box_width_px, box_height_px, min_size_px=MIN_BOX_SIZE_PX):
+    """
+    Pixel-based size filter: a box is too small when both its short and
+    its long edge are below min_size_px.
+
+    Works on scalars as well as NumPy arrays of edge lengths.
+
+    Args:
+        box_width_px (float | ndarray): Box width in pixels
+        box_height_px (float | ndarray): Box height in pixels
+        min_size_px (float): Minimum allowed edge length in pixels
+
+    Returns:
+        bool | ndarray: True for boxes that should be skipped
+    """
+
+    # short_edge < min and long_edge < min  <=>  both edges < min
+    return (box_width_px < min_size_px) & (box_height_px < min_size_px)
+
 
-def convert_to_yolo(txt_file_path):
+def convert_to_yolo(txt_file_path, suppression=SUPPRESSION, iou_thr=SUPPRESSION_IOU_THR,
+                    class_lut=None):
     """
     Convert a single polygon annotation file to YOLO bounding box format.
 
     Args:
         txt_file_path (str): Path to polygon annotation file
+        suppression (str, optional): "nms" or "wbf" to merge overlapping
+                                     boxes of the same class
+        iou_thr (float): IoU threshold for suppression
+        class_lut (ClassLUT, optional): Class remapping (annotation_toolkit.classmap)
 
     Returns:
         list[dict]: List of YOLO bounding box annotations
@@ -40,11 +83,35 @@ def convert_to_yolo(txt_file_path):
     with open(txt_file_path, "r") as file:
         lines = file.readlines()
 
+    return convert_lines_to_yolo(lines, suppression, iou_thr, class_lut)
+
+
+def convert_lines_to_yolo(lines, suppression=SUPPRESSION, iou_thr=SUPPRESSION_IOU_THR,
+                          class_lut=None):
+    """
+    Convert the lines of a polygon annotation file to YOLO bounding boxes.
+
+    Args:
+        lines (list[str]): Polygon annotation lines
+        suppression (str, optional): "nms" or "wbf"
+        iou_thr (float): IoU threshold for suppression
+        class_lut (ClassLUT, optional): Remaps, merges or drops classes
+
+    Returns:
+        list[dict]: List of YOLO bounding box annotations
+    """
+
     converted_annotations = []
 
-    for line in lines:
-        parts = line.strip().split(" ")
-        class_id = int(parts[0])
+    rows = [line.strip().split(" ") for line in lines]
+    class_ids = [int(parts[0]) for parts in rows]
+    if class_lut is not None:
+        class_ids = class_lut.map(class_ids).tolist()
+
+    for parts, class_id in zip(rows, class_ids):
+        # Dropped by the class map
+        if class_lut is not None and class_id < 0:
+            continue
 
         # Separate x and y coordinates
         x_coords = [float(parts[i]) for i in range(1, len(parts), 2)]
@@ -62,11 +129,8 @@ def convert_to_yolo(txt_file_path):
         box_width_px = width * IMAGE_WIDTH_PX
         box_height_px = height * IMAGE_HEIGHT_PX
 
-        short_edge = min(box_width_px, box_height_px)
-        long_edge = max(box_width_px, box_height_px)
-
         # Skip very small objects
-        if short_edge < MIN_BOX_SIZE_PX and long_edge < MIN_BOX_SIZE_PX:
+        if is_small_box(box_width_px, box_height_px):
             continue
         # ===============================
 
@@ -82,9 +146,87 @@ def convert_to_yolo(txt_file_path):
             "height": height,
         })
 
+    if suppression is not None:
+        converted_annotations = suppress_annotations(
+            converted_annotations, suppression, iou_thr
+        )
+
     return converted_annotations
 
 
+def suppress_annotations(annotations, method, iou_thr):
+    """
+    Merge overlapping same-class boxes (larger boxes take precedence).
+
+    Args:
+        annotations (list[dict]): YOLO bounding box annotations
+        method (str): "nms" or "wbf"
+        iou_thr (float): IoU threshold
+
+    Returns:
+        list[dict]: Remaining YOLO bounding box annotations
+    """
+
+    if len(annotations) < 2:
+        return annotations
+
+    import numpy as np
+
+    from annotation_toolkit.boxes import cxcywh_to_xyxy, xyxy_to_cxcywh
+    from annotation_toolkit.suppression import suppress_boxes
+
+    classes = [item["class"] for item in annotations]
+    leader_boxes = cxcywh_to_xyxy([
+        [item["x_center"], item["y_center"], item["width"], item["height"]]
+        for item in annotations
+    ])
+
+    boxes, classes, _, keep = suppress_boxes(leader_boxes, classes, method=method, iou_thr=iou_thr)
+
+    if method == "nms":
+        return [annotations[i] for i in keep]
+
+    fused_annotations = []
+    for i, class_id, fused_box, (x_center, y_center, width, height) in zip(
+        keep, classes, boxes, xyxy_to_cxcywh(boxes).tolist()
+    ):
+        # Boxes that absorbed nothing are kept unchanged
+        if np.array_equal(fused_box, leader_boxes[i]):
+            fused_annotations.append(annotations[i])
+            continue
+
+        fused_annotations.append({
+            "class": int(class_id),
+            "x_center": x_center,
+            "y_center": y_center,
+            "width": width,
+            "height": height,
+        })
+
+    return fused_annotations
+
+
+def format_yolo_txt(data):
+    """
+    Format YOLO bounding box annotations as label file contents.
+
+    Args:
+        data (list[dict]): YOLO annotations
+
+    Returns:
+        str: One line per annotation
+    """
+
+    return "".join(
+        f"{item['class']} "
+        f"{item['x_center']} "
+        f"{item['y_center']} "
+        f"{item['width']} "
+        f"{item['height']}\n"
+        for item in data
+    )
+
+
 def write_to_yolo_txt(data, output_file_path):
     """
     Write YOLO bounding box annotations to a .txt file.
@@ -95,43 +237,158 @@ def write_to_yolo_txt(data, output_file_path):
     """
 
     with open(output_file_path, "w") as file:
-        for item in data:
-            line = (
-                f"{item['class']} "
-                f"{item['x_center']} "
-                f"{item['y_center']} "
-                f"{item['width']} "
-                f"{item['height']}\n"
-            )
-            file.write(line)
+        file.write(format_yolo_txt(data))
 
 
-def convert_all_txt_files(input_folder, output_folder):
+def convert_all_txt_files(input_folder, output_folder,
+                          suppression=SUPPRESSION, iou_thr=SUPPRESSION_IOU_THR,
+                          workers=READ_WORKERS, class_map=None):
     """
     Convert all polygon annotation files in a folder to YOLO format.
 
     Args:
         input_folder (str): Folder containing polygon .txt files
         output_folder (str): Output folder for YOLO annotations
+        suppression (str, optional): "nms" or "wbf"
+        iou_thr (float): IoU threshold for suppression
+        workers (int): Number of files read ahead in parallel
+        class_map (ClassMap, optional): Class mapping config; polygon files
+                                        have no class names, so it must use
+                                        integer class ids
     """
 
+    from annotation_toolkit.prefetch import prefetch, read_lines
+    from annotation_toolkit.profiling import count, stage
+
+    def read(path):
+        with stage("read"):
+            return read_lines(path)
+
+    class_lut = None if class_map is None else class_map.compile()
+
     os.makedirs(output_folder, exist_ok=True)
 
-    txt_files = [f for f in os.listdir(input_folder) if f.endswith(".txt")]
+    with stage("discover"):
+        txt_files = [f for f in os.listdir(input_folder) if f.endswith(".txt")]
+    input_paths = [os.path.join(input_folder, txt_file) for txt_file in txt_files]
+
+    # Reads overlap with conversion (slow network / FUSE storage)
+    for input_path, lines in prefetch(input_paths, read, workers):
+        output_path = os.path.join(output_folder, os.path.basename(input_path))
+
+        with stage("transform"):
+            yolo_data = convert_lines_to_yolo(lines, suppression, iou_thr, class_lut)
+        count("files")
+        count("objects", len(yolo_data))
+
+        with stage("serialize"):
+            text = format_yolo_txt(yolo_data)
+        with stage("write"), open(output_path, "w") as file:
+            file.write(text)
+
+
+def convert_shards(input_shards, output_pattern,
+                   suppression=SUPPRESSION, iou_thr=SUPPRESSION_IOU_THR, class_map=None):
+    """
+    Convert polygon annotations stored in tar / zip shards.
+
+    Members are streamed without extraction; other sample files (e.g.
+    images) are skipped. Converted labels are written as new shards.
+
+    Args:
+        input_shards (str | list): Shard file, directory or glob pattern
+        output_pattern (str): Output shard pattern, e.g. "out/labels-%06d.tar"
+        suppression (str, optional): "nms" or "wbf"
+        iou_thr (float): IoU threshold for suppression
+        class_map (ClassMap, optional): Class mapping config (integer class ids)
+
+    Returns:
+        list[Path]: Written shards
+    """
+
+    from annotation_toolkit.profiling import count, stage
+    from annotation_toolkit.shards import ShardWriter, decode_text, iter_samples
+
+    class_lut = None if class_map is None else class_map.compile()
+
+    with ShardWriter(output_pattern) as writer:
+        for key, sample in iter_samples(input_shards, extensions={"txt"}):
+            lines = decode_text(sample["txt"]).splitlines(keepends=True)
+
+            with stage("transform"):
+                yolo_data = convert_lines_to_yolo(lines, suppression, iou_thr, class_lut)
+            count("files")
+            count("objects", len(yolo_data))
 
-    for txt_file in txt_files:
-        input_path = os.path.join(input_folder, txt_file)
-        output_path = os.path.join(output_folder, txt_file)
+            with stage("serialize"):
+                text = format_yolo_txt(yolo_data)
+            with stage("write"):
+                writer.write(key, {"txt": text})
 
-        yolo_data = convert_to_yolo(input_path)
-        write_to_yolo_txt(yolo_data, output_path)
+    return writer.shards
 
 
 # ===============================
-# EXAMPLE USAGE
+# COMMAND LINE
 # ===============================
-if __name__ == "__main__":
-    INPUT_FOLDER = "data"
-    OUTPUT_FOLDER = "converter"
+INPUT_FOLDER = "data"
+OUTPUT_FOLDER = "converter"
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Convert polygon annotations to YOLO bounding boxes"
+    )
+    parser.add_argument("--input", default=INPUT_FOLDER,
+                        help="Folder with polygon .txt files, or tar / zip shards (file or glob pattern).")
+    parser.add_argument("--output", default=OUTPUT_FOLDER,
+                        help="Output folder for YOLO labels, or a shard pattern (e.g. out/labels-%%06d.tar).")
+    parser.add_argument("--suppression", choices=["nms", "wbf"], default=SUPPRESSION)
+    parser.add_argument("--iou-thr", type=float, default=SUPPRESSION_IOU_THR)
+    parser.add_argument("--workers", type=int, default=READ_WORKERS)
+    parser.add_argument("--class-map", default=None,
+                        help="Class mapping JSON with integer class ids (annotation_toolkit/classmap.py).")
+    parser.add_argument("--profile", default=None,
+                        help="Write per-stage timings and counters to this JSON file.")
+    parser.add_argument("--profile-capture", default=None,
+                        help="With --profile, also write a cProfile (.prof) or pyinstrument (.html) capture.")
 
-    convert_all_txt_files(INPUT_FOLDER, OUTPUT_FOLDER)
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.profile:
+        from annotation_toolkit.profiling import profiling
+
+        with profiling(opt.profile, opt.profile_capture):
+            run(opt)
+    else:
+        run(opt)
+
+
+def run(opt):
+    class_map = None
+    if opt.class_map:
+        from annotation_toolkit.classmap import load_class_map
+
+        class_map = load_class_map(opt.class_map)
+
+    from annotation_toolkit.shards import is_shard
+
+    if is_shard(opt.input) != is_shard(opt.output):
+        raise SystemExit("Shard input needs a shard --output pattern and vice versa")
+
+    if is_shard(opt.input):
+        convert_shards(opt.input, opt.output, opt.suppression, opt.iou_thr, class_map)
+    else:
+        convert_all_txt_files(
+            opt.input, opt.output, opt.suppression, opt.iou_thr, opt.workers, class_map
+        )
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -1,6 +1,5 @@
 import cv2
 import os
-import matplotlib.pyplot as plt
 
 """
 visualizer.py
@@ -92,6 +91,8 @@ print(f"Saved visualization to: {OUTPUT_PATH}")
 # ===============================
 # DISPLAY IMAGE (RGB for matplotlib)
 # ===============================
+import matplotlib.pyplot as plt  # deferred: only needed for display
+
 image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 plt.imshow(image_rgb)
 plt.axis("off")
@@ -1,7 +1,16 @@
+import argparse
 import os
+import sys
+from pathlib import Path
+
 import cv2
 import numpy as np
 
+# Make the shared annotation_toolkit package importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from annotation_toolkit.profiling import count, stage
+
 
 """
 converter.py
@@ -10,7 +19,8 @@ Converts RGB segmentation masks into YOLO segmentation (.txt) annotations.
 
 Pipeline:
 1. Read RGB segmentation masks
-2. Extract regions matching predefined RGB colors
+2. Run-length encode each row and find the regions matching predefined
+   RGB colors (presence, area, bounding box)
 3. Convert each region into polygon contours
 4. Normalize polygon coordinates
 5. Save annotations in YOLO segmentation format
@@ -24,7 +34,9 @@ INPUT_DIR = "data/masks"
 
 # Output directory for YOLO segmentation annotations
 OUTPUT_DIR = "data/txt_data"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Mask member read from tar / zip shards (lossless, so colors stay exact)
+MASK_EXTENSION = "png"
 
 # RGB color -> class_id mapping
 COLOR_TO_CLASS = {
@@ -34,53 +46,337 @@ COLOR_TO_CLASS = {
     (255, 160,   1): 3,
 }
 
-for filename in os.listdir(INPUT_DIR):
-    image_path = os.path.join(INPUT_DIR, filename)
+# 0xRRGGBB code -> class_id, in COLOR_TO_CLASS order
+CODE_TO_CLASS = {
+    (r << 16) | (g << 8) | b: class_id
+    for (r, g, b), class_id in COLOR_TO_CLASS.items()
+}
+
+# Classes with fewer pixels cannot form a contour with area > 1
+MIN_CLASS_PIXELS = 4
+
+
+def pack_colors(image_bgr):
+    """
+    Pack a BGR image into one 0xRRGGBB integer per pixel.
+
+    Args:
+        image_bgr (ndarray): H x W x 3 uint8 image
+
+    Returns:
+        ndarray: H x W uint32 color codes
+    """
+
+    height, width, _ = image_bgr.shape
+
+    # B, G, R, 0 bytes read as a little-endian integer are 0x00RRGGBB
+    padded = np.zeros((height, width, 4), dtype=np.uint8)
+    padded[:, :, :3] = image_bgr
+    return padded.view("<u4")[:, :, 0]
+
+
+def encode_runs(codes):
+    """
+    Row-wise run-length encoding of a label image.
+
+    Every row starts a new run, so runs never cross rows.
+
+    Args:
+        codes (ndarray): H x W label image
+
+    Returns:
+        tuple: (rows, starts, ends, values) arrays, one entry per run;
+               ends are exclusive
+    """
+
+    height, width = codes.shape
+
+    change = np.empty((height, width), dtype=bool)
+    change[:, 0] = True
+    np.not_equal(codes[:, 1:], codes[:, :-1], out=change[:, 1:])
+
+    # A run ends where the next one starts; the last run of a row ends
+    # at the first pixel of the next row
+    flat_starts = np.flatnonzero(change)
+    flat_ends = np.append(flat_starts[1:], height * width)
+
+    rows = flat_starts // width
+    row_offsets = rows * width
+
+    return rows, flat_starts - row_offsets, flat_ends - row_offsets, codes.ravel()[flat_starts]
+
+
+def class_groups(class_lut=None):
+    """
+    Color codes traced together for each output class.
+
+    Args:
+        class_lut (ClassLUT, optional): Class remapping (annotation_toolkit.classmap);
+                                        merged colors form one group, dropped
+                                        colors are left out
+
+    Returns:
+        list[tuple]: (class_id, [codes]) in COLOR_TO_CLASS order
+    """
+
+    if class_lut is None:
+        return [(class_id, [code]) for code, class_id in CODE_TO_CLASS.items()]
+
+    groups = {}
+    for code, class_id in zip(CODE_TO_CLASS, class_lut.map(list(CODE_TO_CLASS.values())).tolist()):
+        if class_id >= 0:
+            groups.setdefault(class_id, []).append(code)
+    return list(groups.items())
+
+
+def class_regions(runs, groups):
+    """
+    Per-class pixel area and bounding box from row runs.
+
+    Args:
+        runs (tuple): Output of encode_runs() on packed colors
+        groups (list[tuple]): Output of class_groups()
+
+    Returns:
+        list[tuple]: (class_id, codes, area, (x0, y0, x1, y1)) for every
+                     class present, in group order; x1 / y1 are exclusive
+    """
+
+    rows, starts, ends, values = runs
+
+    regions = []
+    for class_id, codes in groups:
+        selected = values == codes[0] if len(codes) == 1 else np.isin(values, codes)
+        if not selected.any():
+            continue
+
+        class_rows = rows[selected]
+        class_starts = starts[selected]
+        class_ends = ends[selected]
+
+        area = int((class_ends - class_starts).sum())
+        # Runs are in raster order, so the rows are sorted
+        bbox = (
+            int(class_starts.min()),
+            int(class_rows[0]),
+            int(class_ends.max()),
+            int(class_rows[-1]) + 1,
+        )
+        regions.append((class_id, codes, area, bbox))
+
+    return regions
+
+
+def mask_to_yolo_txt(image_bgr, class_lut=None):
+    """
+    Convert a decoded RGB segmentation mask to YOLO segmentation lines.
+
+    The mask is run-length encoded once per row; class presence, area and
+    bounding box come from the runs, and contours are traced only inside
+    each class's bounding box instead of over the full image.
+
+    Args:
+        image_bgr (ndarray): Mask image as loaded by OpenCV (BGR)
+        class_lut (ClassLUT, optional): Remaps, merges or drops classes
+
+    Returns:
+        str: Label file contents
+    """
+
+    height, width, _ = image_bgr.shape
+
+    codes = pack_colors(image_bgr)
+    regions = class_regions(encode_runs(codes), class_groups(class_lut))
+
+    lines = []
+
+    # Process each class (one color, or several merged colors) separately
+    for class_id, class_codes, area, (x0, y0, x1, y1) in regions:
+        if area < MIN_CLASS_PIXELS:
+            continue
+
+        # Binary mask of the bounding box with a 1 pixel empty border, so
+        # contours match those traced on the full image
+        binary_mask = np.zeros((y1 - y0 + 2, x1 - x0 + 2), dtype=np.uint8)
+        crop = codes[y0:y1, x0:x1]
+        if len(class_codes) == 1:
+            np.equal(crop, class_codes[0], out=binary_mask[1:-1, 1:-1], casting="unsafe")
+        else:
+            binary_mask[1:-1, 1:-1] = np.isin(crop, class_codes)
+
+        # Extract contours in full-image coordinates
+        contours, _ = cv2.findContours(
+            binary_mask,
+            cv2.RETR_EXTERNAL,
+            cv2.CHAIN_APPROX_SIMPLE,
+            offset=(x0 - 1, y0 - 1),
+        )
+
+        for contour in contours:
+            if cv2.contourArea(contour) <= 1:
+                continue
+
+            # Convert contour points to normalized polygon coordinates
+            polygon = (contour.reshape(-1, 2) / (width, height)).ravel().tolist()
+
+            # YOLO segmentation line
+            lines.append(str(class_id) + " " + " ".join(map(str, polygon)) + "\n")
+
+    return "".join(lines)
+
+
+def convert_mask(image_path, txt_path, class_lut=None):
+    """
+    Convert a single RGB segmentation mask to YOLO segmentation format.
+
+    Args:
+        image_path (str): Path to the RGB mask image
+        txt_path (str): Output YOLO segmentation .txt path
+        class_lut (ClassLUT, optional): Class remapping
+
+    Returns:
+        bool: False if the image could not be read
+    """
 
     # Load image
-    image_bgr = cv2.imread(image_path)
+    with stage("read"):
+        image_bgr = cv2.imread(image_path)
     if image_bgr is None:
-        continue
+        return False
+
+    with stage("transform"):
+        text = mask_to_yolo_txt(image_bgr, class_lut)
+    count("masks")
+
+    with stage("write"), open(txt_path, "w") as file:
+        file.write(text)
+
+    return True
+
+
+def compile_class_map(class_map):
+    """
+    Compile a class mapping config against the mask classes.
+
+    Masks have no class names, so the config uses the class ids of
+    COLOR_TO_CLASS.
+    """
+    if class_map is None:
+        return None
+    return class_map.compile({class_id: None for class_id in COLOR_TO_CLASS.values()})
+
+
+def convert_all_masks(input_dir, output_dir, class_map=None):
+    """
+    Convert all RGB segmentation masks in a folder to YOLO format.
+
+    Args:
+        input_dir (str): Folder containing RGB mask images
+        output_dir (str): Output folder for YOLO segmentation annotations
+        class_map (ClassMap, optional): Class mapping config (annotation_toolkit.classmap)
+    """
+
+    class_lut = compile_class_map(class_map)
 
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-    height, width, _ = image_rgb.shape
+    os.makedirs(output_dir, exist_ok=True)
 
-    txt_path = os.path.join(OUTPUT_DIR, filename.rsplit(".", 1)[0] + ".txt")
+    with stage("discover"):
+        filenames = os.listdir(input_dir)
 
-    with open(txt_path, "w") as file:
+    for filename in filenames:
+        image_path = os.path.join(input_dir, filename)
+        txt_path = os.path.join(output_dir, filename.rsplit(".", 1)[0] + ".txt")
 
-        # Process each color as a separate class
-        for rgb_color, class_id in COLOR_TO_CLASS.items():
+        convert_mask(image_path, txt_path, class_lut)
 
-            # Create binary mask for the given RGB color
-            binary_mask = (
-                np.all(image_rgb == rgb_color, axis=2)
-                .astype(np.uint8)
-                * 255
-            )
 
-            if cv2.countNonZero(binary_mask) == 0:
+def convert_mask_shards(input_shards, output_pattern, class_map=None, mask_extension=MASK_EXTENSION):
+    """
+    Convert RGB masks stored in tar / zip shards without extracting them.
+
+    Args:
+        input_shards (str | list): Shard file, directory or glob pattern
+        output_pattern (str): Output shard pattern, e.g. "out/labels-%06d.tar"
+        class_map (ClassMap, optional): Class mapping config
+        mask_extension (str): Extension of the mask member of each sample;
+                              other members (e.g. the photo) are skipped
+
+    Returns:
+        list[Path]: Written shards
+    """
+
+    from annotation_toolkit.shards import ShardWriter, iter_samples
+
+    class_lut = compile_class_map(class_map)
+    mask_extension = mask_extension.lstrip(".").lower()
+
+    with ShardWriter(output_pattern) as writer:
+        for key, sample in iter_samples(input_shards, extensions={mask_extension}):
+            with stage("parse"):
+                data = np.frombuffer(sample[mask_extension], np.uint8)
+                image_bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if image_bgr is None:
                 continue
 
-            # Extract contours
-            contours, _ = cv2.findContours(
-                binary_mask,
-                cv2.RETR_EXTERNAL,
-                cv2.CHAIN_APPROX_SIMPLE,
-            )
-
-            for contour in contours:
-                if cv2.contourArea(contour) <= 1:
-                    continue
-
-                # Convert contour points to normalized polygon coordinates
-                polygon = []
-                for point in contour:
-                    x, y = point[0]
-                    polygon.append(x / width)
-                    polygon.append(y / height)
-
-                # Write YOLO segmentation line
-                file.write(str(class_id) + " ")
-                file.write(" ".join(map(str, polygon)))
-                file.write("\n")
+            with stage("transform"):
+                text = mask_to_yolo_txt(image_bgr, class_lut)
+            count("masks")
+
+            with stage("write"):
+                writer.write(key, {"txt": text})
+
+    return writer.shards
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Convert RGB segmentation masks to YOLO segmentation labels"
+    )
+    parser.add_argument("--input", default=INPUT_DIR,
+                        help="Folder with RGB mask images, or tar / zip shards (file or glob pattern).")
+    parser.add_argument("--output", default=OUTPUT_DIR,
+                        help="Output folder for YOLO labels, or a shard pattern (e.g. out/labels-%%06d.tar).")
+    parser.add_argument("--class-map", default=None,
+                        help="Class mapping JSON with COLOR_TO_CLASS ids (annotation_toolkit/classmap.py).")
+    parser.add_argument("--profile", default=None,
+                        help="Write per-stage timings and counters to this JSON file.")
+    parser.add_argument("--profile-capture", default=None,
+                        help="With --profile, also write a cProfile (.prof) or pyinstrument (.html) capture.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.profile:
+        from annotation_toolkit.profiling import profiling
+
+        with profiling(opt.profile, opt.profile_capture):
+            run(opt)
+    else:
+        run(opt)
+
+
+def run(opt):
+    class_map = None
+    if opt.class_map:
+        from annotation_toolkit.classmap import load_class_map
+
+        class_map = load_class_map(opt.class_map)
+
+    from annotation_toolkit.shards import is_shard
+
+    if is_shard(opt.input) != is_shard(opt.output):
+        raise SystemExit("Shard input needs a shard --output pattern and vice versa")
+
+    if is_shard(opt.input):
+        convert_mask_shards(opt.input, opt.output, class_map)
+    else:
+        convert_all_masks(opt.input, opt.output, class_map)
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -50,21 +50,6 @@ def create_annotation_from_yolo_format(
     }
 
 
-def create_annotation_from_yolo_results_format(
-    min_x, min_y, width, height,
-    image_id, category_id, confidence
-):
-    """
-    Convert YOLO inference results into COCO results format.
-    """
-    return [{
-        "image_id": image_id,
-        "category_id": category_id,
-        "bbox": [float(min_x), float(min_y), float(width), float(height)],
-        "score": confidence,
-    }]
-
-
 # COCO base template
 coco_format = {
     "images": [],
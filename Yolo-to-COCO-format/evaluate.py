@@ -0,0 +1,559 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+
+import numpy as np
+
+from results_exporter import load_columnar_results
+
+"""
+evaluate.py
+
+Vectorized COCO bounding-box evaluation (AP / AR) for converted datasets.
+
+Ground truth is a COCO JSON file (e.g. generated by main.py) and detections
+are a COCO results file or a columnar results directory (main.py --results).
+Both are loaded into flat NumPy columns; no per-annotation dictionaries
+are built.
+
+The evaluation follows the pycocotools COCOeval bbox protocol:
+- IoU thresholds 0.50:0.05:0.95, 101 recall thresholds
+- Area ranges all / small / medium / large, maxDets 1 / 10 / 100
+- Crowd ground truth is ignored and may match several detections
+
+Per category, images are processed in padded batches: IoU matrices are
+computed with broadcasting and greedy matching runs over the detection rank
+only, for all images, IoU thresholds and ground truths at once.
+Categories are sharded over worker processes.
+"""
+
+# --------------------------------------------------
+# Evaluation Parameters (pycocotools defaults)
+# --------------------------------------------------
+
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, int(np.round((0.95 - 0.5) / 0.05)) + 1, endpoint=True)
+RECALL_THRESHOLDS = np.linspace(0.0, 1.00, int(np.round((1.00 - 0.0) / 0.01)) + 1, endpoint=True)
+MAX_DETS = [1, 10, 100]
+AREA_RANGES = [
+    [0 ** 2, 1e5 ** 2],
+    [0 ** 2, 32 ** 2],
+    [32 ** 2, 96 ** 2],
+    [96 ** 2, 1e5 ** 2],
+]
+AREA_LABELS = ["all", "small", "medium", "large"]
+
+# Number of images matched together in one padded batch
+IMAGES_PER_BATCH = 256
+
+
+# --------------------------------------------------
+# Loading
+# --------------------------------------------------
+
+def load_ground_truth(json_file):
+    """
+    Load COCO ground truth into columnar arrays.
+
+    Args:
+        json_file (str | Path): COCO annotation file
+
+    Returns:
+        dict: "image_ids", "category_ids" (sorted) and annotation columns
+              "image_id", "category_id", "bbox" (N x 4), "area", "iscrowd"
+    """
+
+    with open(json_file, "r") as f:
+        coco = json.load(f)
+
+    annotations = coco.get("annotations", [])
+
+    return {
+        "image_ids": np.unique([img["id"] for img in coco.get("images", [])]).astype(np.int64),
+        "category_ids": np.unique([cat["id"] for cat in coco.get("categories", [])]).astype(np.int64),
+        "image_id": np.array([a["image_id"] for a in annotations], dtype=np.int64),
+        "category_id": np.array([a["category_id"] for a in annotations], dtype=np.int64),
+        "bbox": np.array([a["bbox"] for a in annotations], dtype=np.float64).reshape(-1, 4),
+        "area": np.array([a["area"] for a in annotations], dtype=np.float64),
+        "iscrowd": np.array([a.get("iscrowd", 0) for a in annotations], dtype=bool),
+    }
+
+
+def load_detections(results_path):
+    """
+    Load detections from a COCO results JSON or a columnar results directory.
+
+    Args:
+        results_path (str | Path): .json file or directory written by
+                                   results_exporter.py
+
+    Returns:
+        dict: Columns "image_id", "category_id", "bbox" (N x 4), "score", "area"
+    """
+
+    results_path = Path(results_path)
+
+    if results_path.is_dir():
+        columns = load_columnar_results(results_path)
+        detections = {
+            "image_id": np.asarray(columns["image_id"], dtype=np.int64),
+            "category_id": np.asarray(columns["category_id"], dtype=np.int64),
+            "bbox": np.asarray(columns["bbox"], dtype=np.float64),
+            "score": np.asarray(columns["score"], dtype=np.float64),
+        }
+    else:
+        with open(results_path, "r") as f:
+            results = json.load(f)
+
+        detections = {
+            "image_id": np.array([r["image_id"] for r in results], dtype=np.int64),
+            "category_id": np.array([r["category_id"] for r in results], dtype=np.int64),
+            "bbox": np.array([r["bbox"] for r in results], dtype=np.float64).reshape(-1, 4),
+            "score": np.array([r["score"] for r in results], dtype=np.float64),
+        }
+
+    detections["area"] = detections["bbox"][:, 2] * detections["bbox"][:, 3]
+    return detections
+
+
+# --------------------------------------------------
+# Vectorized Matching
+# --------------------------------------------------
+
+def box_iou(dt_boxes, gt_boxes, iscrowd):
+    """
+    Batched IoU between COCO boxes, matching pycocotools semantics.
+
+    Args:
+        dt_boxes (ndarray): (..., D, 4) detection boxes [x, y, w, h]
+        gt_boxes (ndarray): (..., G, 4) ground-truth boxes [x, y, w, h]
+        iscrowd (ndarray): (..., G) crowd flags; for crowd boxes the
+                           union is replaced by the detection area
+
+    Returns:
+        ndarray: (..., D, G) IoU matrix
+    """
+
+    d = dt_boxes[..., :, None, :]
+    g = gt_boxes[..., None, :, :]
+
+    iw = np.minimum(d[..., 0] + d[..., 2], g[..., 0] + g[..., 2]) - np.maximum(d[..., 0], g[..., 0])
+    ih = np.minimum(d[..., 1] + d[..., 3], g[..., 1] + g[..., 3]) - np.maximum(d[..., 1], g[..., 1])
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+
+    d_area = d[..., 2] * d[..., 3]
+    g_area = g[..., 2] * g[..., 3]
+    union = np.where(iscrowd[..., None, :], d_area, d_area + g_area - inter)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        iou = np.where(union > 0, inter / union, 0.0)
+    return iou
+
+
+def _last_argmax(values):
+    """
+    Index of the last maximum along the last axis.
+    """
+    n = values.shape[-1]
+    return n - 1 - np.argmax(values[..., ::-1], axis=-1)
+
+
+def match_batch(ious, dt_valid, gt_valid, gt_ignore, iscrowd):
+    """
+    Greedy COCO matching for a padded batch of images.
+
+    Detections must be sorted by descending score along the D axis.
+    The loop runs over detection rank only; all images, IoU thresholds
+    and ground truths are handled with array operations.
+
+    Args:
+        ious (ndarray): (I, D, G) IoU matrices
+        dt_valid (ndarray): (I, D) padding mask for detections
+        gt_valid (ndarray): (I, G) padding mask for ground truths
+        gt_ignore (ndarray): (I, G) ignore flags for this area range
+        iscrowd (ndarray): (I, G) crowd flags
+
+    Returns:
+        tuple: (dt_matched, dt_ignore), each (I, T, D) bool
+    """
+
+    num_images, num_dets, num_gts = ious.shape
+    num_thrs = len(IOU_THRESHOLDS)
+
+    thresholds = np.minimum(IOU_THRESHOLDS, 1 - 1e-10)[None, :, None]
+    gt_matched = np.zeros((num_images, num_thrs, num_gts), dtype=bool)
+    dt_matched = np.zeros((num_images, num_thrs, num_dets), dtype=bool)
+    dt_ignore = np.zeros((num_images, num_thrs, num_dets), dtype=bool)
+
+    if num_gts == 0:
+        return dt_matched, dt_ignore
+
+    image_index = np.arange(num_images)[:, None]
+    gt_ignore_t = gt_ignore[:, None, :]
+
+    for d in range(num_dets):
+        iou = ious[:, d, None, :]
+
+        candidate = (
+            (~gt_matched | iscrowd[:, None, :])
+            & gt_valid[:, None, :]
+            & (iou >= thresholds)
+            & dt_valid[:, d, None, None]
+        )
+
+        # Non-ignored ground truths are always preferred; ties resolve
+        # to the last candidate like the reference implementation.
+        regular = candidate & ~gt_ignore_t
+        ignored = candidate & gt_ignore_t
+        has_regular = regular.any(axis=-1)
+        has_ignored = ignored.any(axis=-1)
+
+        best_regular = _last_argmax(np.where(regular, iou, -1.0))
+        best_ignored = _last_argmax(np.where(ignored, iou, -1.0))
+        best = np.where(has_regular, best_regular, best_ignored)
+        matched = has_regular | has_ignored
+
+        images, thrs = np.nonzero(matched)
+        gt_matched[images, thrs, best[images, thrs]] = True
+
+        dt_matched[:, :, d] = matched
+        dt_ignore[:, :, d] = matched & gt_ignore[image_index, best]
+
+    return dt_matched, dt_ignore
+
+
+def _pad(values, image_pos, rank, num_images, width, fill):
+    """
+    Scatter per-object values into an (I, width, ...) padded array.
+    """
+    out = np.full((num_images, width) + values.shape[1:], fill, dtype=values.dtype)
+    out[image_pos, rank] = values
+    return out
+
+
+def _rank_within_groups(groups):
+    """
+    Position of each element inside its run of equal (sorted) group values.
+    """
+    if len(groups) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.r_[0, np.flatnonzero(np.diff(groups)) + 1]
+    counts = np.diff(np.r_[starts, len(groups)])
+    return np.arange(len(groups)) - np.repeat(starts, counts)
+
+
+def evaluate_category(gt, dt):
+    """
+    Evaluate a single category.
+
+    Args:
+        gt (dict): "image", "bbox", "area", "iscrowd" columns; "image" holds
+                   the image position in the sorted image id list
+        dt (dict): "image", "bbox", "area", "score" columns
+
+    Returns:
+        tuple: precision (T, R, A, M) and recall (T, A, M), -1 when the
+               category has no non-ignored ground truth for an area range
+    """
+
+    num_thrs = len(IOU_THRESHOLDS)
+    num_areas = len(AREA_RANGES)
+    max_det = MAX_DETS[-1]
+
+    # Ground truth keeps annotation order within an image
+    g_order = np.argsort(gt["image"], kind="stable")
+    g_image = gt["image"][g_order]
+    g_rank = _rank_within_groups(g_image)
+
+    # Detections sorted by descending score within an image, ties keep
+    # input order, then truncated to the largest maxDets
+    d_order = np.lexsort((np.arange(len(dt["score"])), -dt["score"], dt["image"]))
+    d_image = dt["image"][d_order]
+    d_rank = _rank_within_groups(d_image)
+    keep = d_rank < max_det
+    d_order, d_image, d_rank = d_order[keep], d_image[keep], d_rank[keep]
+
+    images = np.union1d(g_image, d_image)
+
+    # Per area range: flattened per-detection results in (image, rank) order
+    scores, ranks = [], []
+    dt_matched = [[] for _ in range(num_areas)]
+    dt_ignored = [[] for _ in range(num_areas)]
+    num_positive = np.zeros(num_areas, dtype=np.int64)
+
+    for start in range(0, len(images), IMAGES_PER_BATCH):
+        batch = images[start:start + IMAGES_PER_BATCH]
+        num_images = len(batch)
+
+        g_sel = slice(np.searchsorted(g_image, batch[0], side="left"),
+                      np.searchsorted(g_image, batch[-1], side="right"))
+        d_sel = slice(np.searchsorted(d_image, batch[0], side="left"),
+                      np.searchsorted(d_image, batch[-1], side="right"))
+
+        g_pos = np.searchsorted(batch, g_image[g_sel])
+        d_pos = np.searchsorted(batch, d_image[d_sel])
+        g_idx = g_order[g_sel]
+        d_idx = d_order[d_sel]
+
+        num_gts = int(g_rank[g_sel].max()) + 1 if len(g_idx) else 0
+        num_dets = int(d_rank[d_sel].max()) + 1 if len(d_idx) else 0
+
+        gt_boxes = _pad(gt["bbox"][g_idx], g_pos, g_rank[g_sel], num_images, num_gts, 0.0)
+        gt_area = _pad(gt["area"][g_idx], g_pos, g_rank[g_sel], num_images, num_gts, 0.0)
+        iscrowd = _pad(gt["iscrowd"][g_idx], g_pos, g_rank[g_sel], num_images, num_gts, False)
+        gt_valid = _pad(np.ones(len(g_idx), dtype=bool), g_pos, g_rank[g_sel], num_images, num_gts, False)
+
+        dt_boxes = _pad(dt["bbox"][d_idx], d_pos, d_rank[d_sel], num_images, num_dets, 0.0)
+        dt_area = _pad(dt["area"][d_idx], d_pos, d_rank[d_sel], num_images, num_dets, 0.0)
+        dt_valid = _pad(np.ones(len(d_idx), dtype=bool), d_pos, d_rank[d_sel], num_images, num_dets, False)
+
+        ious = box_iou(dt_boxes, gt_boxes, iscrowd)
+
+        scores.append(dt["score"][d_idx])
+        ranks.append(d_rank[d_sel])
+
+        for a, (lo, hi) in enumerate(AREA_RANGES):
+            gt_ignore = iscrowd | (gt_area < lo) | (gt_area > hi)
+            num_positive[a] += np.count_nonzero(gt_valid & ~gt_ignore)
+
+            matched, ignored = match_batch(ious, dt_valid, gt_valid, gt_ignore, iscrowd)
+
+            # Unmatched detections outside the area range are ignored
+            out_of_range = (dt_area < lo) | (dt_area > hi)
+            ignored |= ~matched & out_of_range[:, None, :]
+
+            # (I, T, D) -> (T, n) in image-then-rank order
+            flat_valid = dt_valid.reshape(-1)
+            dt_matched[a].append(matched.transpose(1, 0, 2).reshape(num_thrs, -1)[:, flat_valid])
+            dt_ignored[a].append(ignored.transpose(1, 0, 2).reshape(num_thrs, -1)[:, flat_valid])
+
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    ranks = np.concatenate(ranks) if ranks else np.zeros(0, dtype=np.int64)
+
+    precision = -np.ones((num_thrs, len(RECALL_THRESHOLDS), num_areas, len(MAX_DETS)))
+    recall = -np.ones((num_thrs, num_areas, len(MAX_DETS)))
+
+    for a in range(num_areas):
+        if num_positive[a] == 0:
+            continue
+
+        matched_all = np.concatenate(dt_matched[a], axis=1) if scores.size else np.zeros((num_thrs, 0), bool)
+        ignored_all = np.concatenate(dt_ignored[a], axis=1) if scores.size else np.zeros((num_thrs, 0), bool)
+
+        for m, max_dets in enumerate(MAX_DETS):
+            sel = ranks < max_dets
+            order = np.argsort(-scores[sel], kind="mergesort")
+            matched = matched_all[:, sel][:, order]
+            ignored = ignored_all[:, sel][:, order]
+
+            tp_sum = np.cumsum(matched & ~ignored, axis=1).astype(dtype=float)
+            fp_sum = np.cumsum(~matched & ~ignored, axis=1).astype(dtype=float)
+            precision[:, :, a, m], recall[:, a, m] = _precision_recall(
+                tp_sum, fp_sum, num_positive[a]
+            )
+
+    return precision, recall
+
+
+def _precision_recall(tp_sum, fp_sum, num_positive):
+    """
+    Interpolated precision at the recall thresholds and final recall.
+    """
+
+    num_thrs, num_dets = tp_sum.shape
+    precision = np.zeros((num_thrs, len(RECALL_THRESHOLDS)))
+
+    if num_dets == 0:
+        return precision, np.zeros(num_thrs)
+
+    rc = tp_sum / num_positive
+    pr = tp_sum / (fp_sum + tp_sum + np.spacing(1))
+
+    # Make precision monotonically decreasing
+    pr = np.maximum.accumulate(pr[:, ::-1], axis=1)[:, ::-1]
+
+    for t in range(num_thrs):
+        inds = np.searchsorted(rc[t], RECALL_THRESHOLDS, side="left")
+        valid = inds < num_dets
+        precision[t, valid] = pr[t, inds[valid]]
+
+    return precision, rc[:, -1]
+
+
+# --------------------------------------------------
+# Evaluation
+# --------------------------------------------------
+
+def _evaluate_category_job(job):
+    return evaluate_category(*job)
+
+
+def evaluate(gt, dt, workers=1):
+    """
+    Run COCO bbox evaluation over columnar ground truth and detections.
+
+    Args:
+        gt (dict): Output of load_ground_truth()
+        dt (dict): Output of load_detections()
+        workers (int): Number of processes; categories are sharded across them
+
+    Returns:
+        dict: "precision" (T, R, K, A, M), "recall" (T, K, A, M) and the
+              twelve COCO summary "stats"
+    """
+
+    image_ids = gt["image_ids"]
+
+    unknown = ~np.isin(dt["image_id"], image_ids)
+    if unknown.any():
+        raise ValueError(
+            f"Results contain {int(unknown.sum())} detections for images "
+            f"that are not in the ground truth."
+        )
+
+    gt_known = np.isin(gt["image_id"], image_ids)
+    gt_image = np.searchsorted(image_ids, gt["image_id"])
+    dt_image = np.searchsorted(image_ids, dt["image_id"])
+
+    jobs = []
+    for cat_id in gt["category_ids"]:
+        g = (gt["category_id"] == cat_id) & gt_known
+        d = dt["category_id"] == cat_id
+        jobs.append((
+            {
+                "image": gt_image[g],
+                "bbox": gt["bbox"][g],
+                "area": gt["area"][g],
+                "iscrowd": gt["iscrowd"][g],
+            },
+            {
+                "image": dt_image[d],
+                "bbox": dt["bbox"][d],
+                "area": dt["area"][d],
+                "score": dt["score"][d],
+            },
+        ))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_evaluate_category_job, jobs))
+    else:
+        outputs = [_evaluate_category_job(job) for job in jobs]
+
+    num_cats = len(jobs)
+    precision = -np.ones((len(IOU_THRESHOLDS), len(RECALL_THRESHOLDS), num_cats,
+                          len(AREA_RANGES), len(MAX_DETS)))
+    recall = -np.ones((len(IOU_THRESHOLDS), num_cats, len(AREA_RANGES), len(MAX_DETS)))
+
+    for k, (cat_precision, cat_recall) in enumerate(outputs):
+        precision[:, :, k] = cat_precision
+        recall[:, k] = cat_recall
+
+    return {
+        "precision": precision,
+        "recall": recall,
+        "stats": summarize(precision, recall),
+    }
+
+
+def _mean_valid(values):
+    valid = values[values > -1]
+    return float(np.mean(valid)) if len(valid) else -1.0
+
+
+def summarize(precision, recall):
+    """
+    Compute the twelve standard COCO summary metrics.
+    """
+
+    def ap(iou=None, area="all", max_dets=100):
+        s = precision[..., AREA_LABELS.index(area), MAX_DETS.index(max_dets)]
+        if iou is not None:
+            s = s[np.flatnonzero(np.isclose(IOU_THRESHOLDS, iou))]
+        return _mean_valid(s)
+
+    def ar(area="all", max_dets=100):
+        return _mean_valid(recall[:, :, AREA_LABELS.index(area), MAX_DETS.index(max_dets)])
+
+    return np.array([
+        ap(),
+        ap(iou=0.5),
+        ap(iou=0.75),
+        ap(area="small"),
+        ap(area="medium"),
+        ap(area="large"),
+        ar(max_dets=1),
+        ar(max_dets=10),
+        ar(),
+        ar(area="small"),
+        ar(area="medium"),
+        ar(area="large"),
+    ])
+
+
+STAT_NAMES = [
+    ("Average Precision", "0.50:0.95", "all", 100),
+    ("Average Precision", "0.50", "all", 100),
+    ("Average Precision", "0.75", "all", 100),
+    ("Average Precision", "0.50:0.95", "small", 100),
+    ("Average Precision", "0.50:0.95", "medium", 100),
+    ("Average Precision", "0.50:0.95", "large", 100),
+    ("Average Recall", "0.50:0.95", "all", 1),
+    ("Average Recall", "0.50:0.95", "all", 10),
+    ("Average Recall", "0.50:0.95", "all", 100),
+    ("Average Recall", "0.50:0.95", "small", 100),
+    ("Average Recall", "0.50:0.95", "medium", 100),
+    ("Average Recall", "0.50:0.95", "large", 100),
+]
+
+
+def print_stats(stats):
+    """
+    Print the summary in the familiar pycocotools layout.
+    """
+    for value, (title, iou, area, max_dets) in zip(stats, STAT_NAMES):
+        kind = "(AP)" if title == "Average Precision" else "(AR)"
+        print(
+            f" {title:<18} {kind} @[ IoU={iou:<9} | area={area:>6} | "
+            f"maxDets={max_dets:>3} ] = {value:0.3f}"
+        )
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Evaluate COCO detection results against COCO ground truth"
+    )
+
+    parser.add_argument(
+        "--gt",
+        type=str,
+        default="output/dataset_coco.json",
+        help="COCO ground-truth annotation file."
+    )
+    parser.add_argument(
+        "--results",
+        type=str,
+        required=True,
+        help="COCO results JSON or columnar results directory."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes (categories are sharded across them)."
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    metrics = evaluate(load_ground_truth(opt.gt), load_detections(opt.results), opt.workers)
+    print_stats(metrics["stats"])
+
+
+if __name__ == "__main__":
+    main(get_args())
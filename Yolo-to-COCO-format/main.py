@@ -1,17 +1,22 @@
 from pathlib import Path
 import argparse
+import io
 import json
-import cv2
-import numpy as np
-import imagesize
+import sys
 
 from create_annotations import (
     create_image_annotation,
     create_annotation_from_yolo_format,
-    create_annotation_from_yolo_results_format,
     coco_format,
 )
 
+# Make the shared annotation_toolkit package importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from annotation_toolkit.prefetch import prefetch, read_lines
+from annotation_toolkit.profiling import count, profiling, stage
+from annotation_toolkit.shards import decode_text, expand_shards, is_shard, iter_samples
+
 """
 main.py
 
@@ -20,6 +25,7 @@ Converts YOLO-format annotations into COCO dataset format.
 Supported input:
 - A directory containing images (.jpg / .png)
 - A text file listing absolute image paths (train.txt / test.txt)
+- WebDataset-style tar / zip shards with images and labels
 
 Supported output:
 - COCO detection annotations
@@ -33,6 +39,12 @@ Supported output:
 
 YOLO_DARKNET_SUB_DIR = "YOLO_darknet"
 
+# Print the progress counter every N images
+PROGRESS_EVERY = 100
+
+# Image members recognized in tar / zip shards
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png")
+
 # IMPORTANT:
 # Update class names according to your dataset
 # Do NOT change the variable name "classes"
@@ -44,25 +56,18 @@ classes = [
 ]
 
 
-def get_images_info_and_annotations(opt):
+def get_image_paths(path):
     """
-    Parse images and corresponding YOLO annotations,
-    then convert them into COCO-compatible structures.
+    Resolve image file paths from a directory or a train/test txt file.
     """
 
-    if opt.path is None:
+    if path is None:
         raise ValueError("No input path provided.")
 
-    path = Path(opt.path)
+    path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Provided path does not exist: {path}")
 
-    images_annotations = []
-    annotations = []
-
-    # --------------------------------------------------
-    # Resolve image file paths
-    # --------------------------------------------------
     if path.is_dir():
         image_paths = []
         image_paths += sorted(path.rglob("*.jpg"))
@@ -72,17 +77,90 @@ def get_images_info_and_annotations(opt):
         with open(path, "r") as f:
             image_paths = [Path(line.strip()) for line in f.readlines()]
 
+    return image_paths
+
+
+def get_label_path(img_path, yolo_subdir=False):
+    """
+    Locate the YOLO label file belonging to an image.
+    """
+
+    label_name = f"{img_path.stem}.txt"
+
+    if yolo_subdir:
+        return img_path.parent / YOLO_DARKNET_SUB_DIR / label_name
+    return img_path.parent / label_name
+
+
+def iter_image_samples(opt):
+    """
+    Yield (img_path, width, height, label_lines) for every image.
+
+    Loose files are read ahead on a thread pool; tar / zip shards
+    (--path data/train-*.tar) are streamed member by member.
+    """
+
+    import imagesize
+
+    if is_shard(opt.path):
+        for key, sample in iter_samples(opt.path):
+            image_ext = next((ext for ext in IMAGE_EXTENSIONS if ext in sample), None)
+            if image_ext is None:
+                # e.g. "img.v2.jpg" is key "img" with extension "v2.jpg"
+                members = ", ".join(f"{key}.{ext}" for ext in sample)
+                print(f"\nwarning: no image in shard sample {key} ({members}), skipped", file=sys.stderr)
+                continue
+
+            # Get image size from the header bytes without decoding
+            with stage("probe"):
+                width, height = imagesize.get(io.BytesIO(sample[image_ext]))
+            label_text = decode_text(sample.get("txt"))
+            label_lines = None if label_text is None else label_text.splitlines(keepends=True)
+
+            yield Path(f"{key}.{image_ext}"), width, height, label_lines
+        return
+
+    def read_sample(img_path):
+        # Get image size without full decoding
+        with stage("probe"):
+            width, height = imagesize.get(str(img_path))
+        with stage("read"):
+            label_lines = read_lines(get_label_path(img_path, opt.yolo_subdir))
+        return width, height, label_lines
+
+    with stage("discover"):
+        image_paths = get_image_paths(opt.path)
+
+    # Headers and labels are read ahead
+    for img_path, (width, height, label_lines) in prefetch(
+        image_paths, read_sample, opt.workers
+    ):
+        yield img_path, width, height, label_lines
+
+
+def get_images_info_and_annotations(opt, class_lut=None):
+    """
+    Parse images and corresponding YOLO annotations,
+    then convert them into COCO-compatible structures.
+
+    class_lut (annotation_toolkit.classmap.ClassLUT) remaps, merges or
+    drops classes while the labels are read.
+    """
+
+    images_annotations = []
+    annotations = []
+
     image_id = 0
     annotation_id = 1  # COCO annotation IDs must start from 1
 
     # --------------------------------------------------
     # Process each image
     # --------------------------------------------------
-    for img_path in image_paths:
-        print(f"\rProcessing image {image_id}", end="")
-
-        # Get image size without full decoding
-        width, height = imagesize.get(str(img_path))
+    for img_path, width, height, label_lines in iter_image_samples(opt):
+        # Console output is slow; report progress every few images only
+        if image_id % PROGRESS_EVERY == 0:
+            print(f"\rProcessing image {image_id}", end="")
+        count("images")
 
         image_annotation = create_image_annotation(
             file_path=img_path,
@@ -92,65 +170,145 @@ def get_images_info_and_annotations(opt):
         )
         images_annotations.append(image_annotation)
 
-        label_name = f"{img_path.stem}.txt"
-
-        if opt.yolo_subdir:
-            label_path = img_path.parent / YOLO_DARKNET_SUB_DIR / label_name
-        else:
-            label_path = img_path.parent / label_name
-
-        if not label_path.exists():
+        if label_lines is None:
             image_id += 1
             continue
 
         # --------------------------------------------------
-        # Read YOLO labels
+        # Convert YOLO labels
         # --------------------------------------------------
-        with open(label_path, "r") as f:
-            label_lines = f.readlines()
-
-        for line in label_lines:
-            parts = line.strip().split()
-
-            category_id = int(parts[0]) + 1  # COCO category IDs start from 1
-            x_center, y_center, w, h = map(float, parts[1:5])
-
-            # Convert normalized YOLO → pixel space
-            px = x_center * width
-            py = y_center * height
-            pw = w * width
-            ph = h * height
-
-            min_x = int(px - pw / 2)
-            min_y = int(py - ph / 2)
-
-            if opt.results:
-                conf = float(parts[5])
-                annotation = create_annotation_from_yolo_results_format(
-                    min_x, min_y, int(pw), int(ph),
-                    image_id, category_id, conf
-                )
-            else:
-                annotation = create_annotation_from_yolo_format(
-                    min_x, min_y, int(pw), int(ph),
-                    image_id, category_id, annotation_id,
-                    segmentation=opt.box2seg,
-                )
-
-            annotations.append(annotation)
-            annotation_id += 1
+        with stage("transform"):
+            label_annotations = convert_label_lines(
+                label_lines, width, height, image_id, annotation_id, opt.box2seg, class_lut
+            )
 
+        count("objects", len(label_annotations))
+        annotations += label_annotations
+        annotation_id += len(label_annotations)
         image_id += 1
 
+    if image_id and (image_id - 1) % PROGRESS_EVERY:
+        print(f"\rProcessing image {image_id - 1}", end="")
+
     return images_annotations, annotations
 
 
+def convert_label_lines(label_lines, width, height, image_id, annotation_id, box2seg=False,
+                        class_lut=None):
+    """
+    Convert the YOLO label lines of one image into COCO annotations.
+    """
+
+    annotations = []
+
+    rows = [line.strip().split() for line in label_lines]
+    if class_lut is None:
+        category_ids = [int(parts[0]) + 1 for parts in rows]  # COCO category IDs start from 1
+    else:
+        category_ids = class_lut.map([int(parts[0]) for parts in rows], "coco").tolist()
+
+    for parts, category_id in zip(rows, category_ids):
+        # Dropped by the class map
+        if class_lut is not None and category_id < 0:
+            continue
+
+        x_center, y_center, w, h = map(float, parts[1:5])
+
+        # Convert normalized YOLO → pixel space
+        px = x_center * width
+        py = y_center * height
+        pw = w * width
+        ph = h * height
+
+        min_x = int(px - pw / 2)
+        min_y = int(py - ph / 2)
+
+        annotation = create_annotation_from_yolo_format(
+            min_x, min_y, int(pw), int(ph),
+            image_id, category_id, annotation_id,
+            segmentation=box2seg,
+        )
+
+        annotations.append(annotation)
+        annotation_id += 1
+
+    return annotations
+
+
+def get_cache_key(opt):
+    """
+    Key of the dataset cache for this input and these options.
+
+    Covers every image and label file (path, mtime, size), the class names
+    and the options that change the COCO output, so a cache built from
+    other inputs or with other options is never reused.
+    """
+
+    from annotation_toolkit.cache import cache_key
+
+    if is_shard(opt.path):
+        files = [str(shard) for shard in expand_shards(opt.path)]
+    else:
+        image_paths = get_image_paths(opt.path)
+        files = [str(opt.path)]
+        for img_path in image_paths:
+            files += [str(img_path), str(get_label_path(img_path, opt.yolo_subdir))]
+
+    if opt.class_map:
+        files.append(str(opt.class_map))
+
+    options = {
+        "box2seg": opt.box2seg,
+        "yolo_subdir": opt.yolo_subdir,
+        "classes": classes,
+        "class_map": opt.class_map,
+    }
+    return cache_key(opt.path, files, options)
+
+
+def export_results_from_yolo(opt, output_path, class_lut=None):
+    """
+    Stream YOLO inference results into a COCO results file.
+
+    Image ids follow the same order as get_images_info_and_annotations,
+    so the results match a COCO file generated from the same path.
+    """
+
+    from results_exporter import export_results
+
+    with stage("discover"):
+        image_paths = get_image_paths(opt.path)
+
+    def iter_samples():
+        for image_id, img_path in enumerate(image_paths):
+            # Samples are taken batch by batch; report every few images only
+            if image_id % PROGRESS_EVERY == 0:
+                print(f"\rExporting image {image_id}/{len(image_paths)}", end="")
+            yield image_id, img_path, get_label_path(img_path, opt.yolo_subdir)
+
+    num_detections = export_results(
+        iter_samples(),
+        output_path,
+        output_format=opt.results_format,
+        workers=opt.workers,
+        score_thr=opt.score_thr,
+        topk=opt.topk,
+        class_lut=class_lut,
+    )
+
+    print(f"\rExported {num_detections} detections from {len(image_paths)} images")
+
+
 def debug(opt):
     """
     Visual debugging utility for YOLO annotations.
     Draws bounding boxes on images and prints details.
     """
 
+    # OpenCV / NumPy are only needed here; keep them out of normal startup
+    import cv2
+    import numpy as np
+
     color_map = np.random.randint(0, 255, (len(classes), 3)).tolist()
 
     with open(opt.path, "r") as f:
@@ -197,7 +355,7 @@ def debug(opt):
     cv2.destroyAllWindows()
 
 
-def get_args():
+def get_args(argv=None):
     """
     Parse command-line arguments.
     """
@@ -217,11 +375,68 @@ def get_args():
     parser.add_argument("--yolo-subdir", action="store_true")
     parser.add_argument("--box2seg", action="store_true")
     parser.add_argument("--results", action="store_true")
+    parser.add_argument(
+        "--results-format",
+        choices=["json", "columnar"],
+        default="json",
+        help="Output format for --results (compact JSON or binary columns)."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of threads reading image headers and label files ahead."
+    )
+    parser.add_argument(
+        "--topk",
+        type=int,
+        default=None,
+        help="Keep only the k highest scoring detections per image."
+    )
+    parser.add_argument(
+        "--score-thr",
+        type=float,
+        default=0.0,
+        help="Drop detections with a lower confidence."
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        help="Binary dataset cache directory: reused when it was built from the same "
+             "files and options, (re)built otherwise."
+    )
+    parser.add_argument(
+        "--class-map",
+        type=str,
+        default=None,
+        help="Class mapping JSON (rename / merge / drop / reindex), see annotation_toolkit/classmap.py."
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Write per-stage timings and counters to this JSON file."
+    )
+    parser.add_argument(
+        "--profile-capture",
+        type=str,
+        default=None,
+        help="With --profile, also write a cProfile (.prof) or pyinstrument (.html) capture."
+    )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def main(opt):
+    if opt.profile:
+        with profiling(opt.profile, opt.profile_capture):
+            run(opt)
+    else:
+        run(opt)
+
+
+def run(opt):
     print("Start!")
 
     if opt.debug:
@@ -229,27 +444,58 @@ def main(opt):
         print("Debug finished.")
         return
 
-    images, anns = get_images_info_and_annotations(opt)
-    coco_format["images"] = images
-    coco_format["annotations"] = anns
-
-    for idx, name in enumerate(classes):
-        coco_format["categories"].append({
-            "id": idx + 1,
-            "name": name,
-            "supercategory": "Defect",
-        })
-
     Path("output").mkdir(exist_ok=True)
     output_path = Path("output") / opt.output
 
+    class_lut = None
+    if opt.class_map:
+        from annotation_toolkit.classmap import load_class_map
+
+        class_lut = load_class_map(opt.class_map).compile(classes)
+
     if opt.results:
-        results = [a[0] for a in coco_format["annotations"]]
-        with open(output_path, "w") as f:
-            json.dump(results, f, indent=4)
+        export_results_from_yolo(opt, output_path, class_lut)
+        print("\nFinished!")
+        return
+
+    cache_key = None
+    if opt.cache:
+        from annotation_toolkit.cache import DatasetCache, cache_matches, export_coco
+
+        cache_key = get_cache_key(opt)
+        if cache_matches(opt.cache, cache_key):
+            export_coco(DatasetCache(opt.cache), output_path)
+            print(f"Loaded dataset cache: {opt.cache}")
+            print("\nFinished!")
+            return
+
+    images, anns = get_images_info_and_annotations(opt, class_lut)
+    coco_format["images"] = images
+    coco_format["annotations"] = anns
+
+    # Rebuilt on every call, so repeated runs in one process (conversion
+    # server workers) do not accumulate categories
+    if class_lut is not None:
+        coco_format["categories"] = class_lut.categories(supercategory="Defect")
     else:
-        with open(output_path, "w") as f:
-            json.dump(coco_format, f, indent=4)
+        coco_format["categories"] = [
+            {
+                "id": idx + 1,
+                "name": name,
+                "supercategory": "Defect",
+            }
+            for idx, name in enumerate(classes)
+        ]
+
+    # Streamed: encoding and writing are one stage, no full JSON string in memory
+    with stage("write"), open(output_path, "w") as f:
+        json.dump(coco_format, f, indent=4)
+
+    if opt.cache:
+        from annotation_toolkit.cache import build_cache_from_coco
+
+        build_cache_from_coco(coco_format, opt.cache, key=cache_key)
+        print(f"Saved dataset cache to: {opt.cache}")
 
     print("\nFinished!")
 
@@ -0,0 +1,366 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+
+import imagesize
+import numpy as np
+
+from annotation_toolkit.profiling import count, stage
+
+"""
+results_exporter.py
+
+Streams YOLO inference results into COCO detection results format.
+
+Unlike the annotation path in main.py, detections are never collected
+into one big Python list. Prediction files are read in parallel, batch
+by batch, and every batch is written to disk before the next one is read.
+
+Input format (per line):
+<class_id> <x_center> <y_center> <width> <height> <confidence>
+
+Supported output:
+- "json":     compact COCO results JSON (list of detections)
+- "columnar": a directory of raw little-endian column files
+              (image_id.bin, category_id.bin, bbox.bin, score.bin)
+              plus meta.json, readable with load_columnar_results()
+"""
+
+# --------------------------------------------------
+# On-disk layout of the columnar results format
+# --------------------------------------------------
+# In memory, columns are kept as int64 / float64 so that the JSON
+# output is identical to the non-streaming converter.
+
+COLUMN_DTYPES = {
+    "image_id": np.dtype("<i8"),
+    "category_id": np.dtype("<i4"),
+    "bbox": np.dtype("<f4"),
+    "score": np.dtype("<f4"),
+}
+
+# Values per detection for each column
+COLUMN_WIDTHS = {
+    "image_id": 1,
+    "category_id": 1,
+    "bbox": 4,
+    "score": 1,
+}
+
+DEFAULT_BATCH_SIZE = 1024
+
+# Values per line of a prediction file
+RESULT_COLUMNS = 6
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+
+def read_yolo_results(img_path, label_path, image_id, score_thr=0.0, topk=None,
+                      class_lut=None):
+    """
+    Read one YOLO prediction file into columnar arrays.
+
+    Boxes are converted to COCO pixel space exactly like main.py does
+    for annotations (integer truncation of min_x, min_y, width, height).
+
+    Args:
+        img_path (Path): Image the predictions belong to
+        label_path (Path): YOLO prediction .txt file
+        image_id (int): COCO image id
+        score_thr (float): Drop detections with a lower confidence
+        topk (int, optional): Keep only the k highest scoring detections
+        class_lut (ClassLUT, optional): Class remapping (annotation_toolkit.classmap);
+                                        dropped classes do not count towards topk
+
+    Returns:
+        dict: Columns "image_id", "category_id", "bbox" (N x 4), "score"
+    """
+
+    if not label_path.exists():
+        return empty_results()
+
+    with open(label_path, "r") as f:
+        lines = [line.split() for line in f]
+
+    # A malformed line would shift every following detection in the reshape
+    for line_number, fields in enumerate(lines, 1):
+        if fields and len(fields) != RESULT_COLUMNS:
+            raise ValueError(
+                f"{label_path}:{line_number}: expected {RESULT_COLUMNS} values "
+                f"(class x y w h confidence), got {len(fields)}"
+            )
+
+    values = list(chain.from_iterable(lines))
+    if not values:
+        return empty_results()
+
+    try:
+        rows = np.array(values, dtype=np.float64).reshape(-1, RESULT_COLUMNS)
+    except ValueError as e:
+        raise ValueError(f"{label_path}: {e}") from None
+
+    # Column 0 holds the COCO category id from here on
+    if class_lut is None:
+        rows[:, 0] = rows[:, 0].astype(np.int64) + 1  # COCO category IDs start from 1
+    else:
+        rows[:, 0] = class_lut.map(rows[:, 0].astype(np.int64), "coco")
+        rows = rows[rows[:, 0] >= 0]
+
+    scores = rows[:, 5]
+    if score_thr > 0:
+        rows = rows[scores >= score_thr]
+        scores = rows[:, 5]
+
+    if topk is not None and len(rows) > topk:
+        order = np.argsort(-scores, kind="stable")[:topk]
+        rows = rows[np.sort(order)]
+        scores = rows[:, 5]
+
+    width, height = imagesize.get(str(img_path))
+
+    # Convert normalized YOLO → pixel space
+    px = rows[:, 1] * width
+    py = rows[:, 2] * height
+    pw = rows[:, 3] * width
+    ph = rows[:, 4] * height
+
+    # Truncate like int(); adding 0.0 turns -0.0 into 0.0
+    bbox = np.trunc(np.stack([px - pw / 2, py - ph / 2, pw, ph], axis=1)) + 0.0
+
+    return {
+        "image_id": np.full(len(rows), image_id, dtype=np.int64),
+        "category_id": rows[:, 0].astype(np.int64),
+        "bbox": bbox,
+        "score": scores,
+    }
+
+
+def empty_results():
+    """
+    Create an empty set of result columns.
+    """
+    return {
+        "image_id": np.empty(0, dtype=np.int64),
+        "category_id": np.empty(0, dtype=np.int64),
+        "bbox": np.empty((0, 4), dtype=np.float64),
+        "score": np.empty(0, dtype=np.float64),
+    }
+
+
+def iter_result_batches(samples, workers=8, batch_size=DEFAULT_BATCH_SIZE,
+                        score_thr=0.0, topk=None, class_lut=None):
+    """
+    Read prediction files in parallel and yield them batch by batch.
+
+    Only one batch of detections is held in memory at a time. Batches
+    are yielded in input order, so output files are deterministic.
+    Every batch is counted as "images" / "objects" (annotation_toolkit
+    profiling), so server jobs see progress and can be cancelled.
+
+    Args:
+        samples (iterable): (image_id, img_path, label_path) tuples
+        workers (int): Number of reader threads
+        batch_size (int): Number of images per batch
+        score_thr (float): Minimum confidence to keep
+        topk (int, optional): Maximum detections per image
+        class_lut (ClassLUT, optional): Class remapping
+
+    Yields:
+        dict: Concatenated result columns for one batch of images
+    """
+
+    samples = iter(samples)
+
+    def read(sample):
+        image_id, img_path, label_path = sample
+        return read_yolo_results(img_path, label_path, image_id, score_thr, topk, class_lut)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(islice(samples, batch_size))
+            if not batch:
+                break
+
+            with stage("read"):
+                parts = list(pool.map(read, batch))
+                columns = {
+                    name: np.concatenate([part[name] for part in parts])
+                    for name in COLUMN_DTYPES
+                }
+            count("images", len(batch))
+            count("objects", len(columns["score"]))
+
+            yield columns
+
+
+# --------------------------------------------------
+# Writers
+# --------------------------------------------------
+
+class JsonResultsWriter:
+    """
+    Incrementally write COCO results as one compact JSON list.
+
+    The list is written to a temporary file next to output_path and only
+    moved into place by close(), so a failed export never leaves a
+    truncated but valid JSON file behind.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        self.file = open(self.tmp_path, "w")
+        self.file.write("[")
+        self.count = 0
+
+    def write(self, columns):
+        entries = [
+            '{"image_id":%d,"category_id":%d,"bbox":[%r,%r,%r,%r],"score":%r}'
+            % (image_id, category_id, x, y, w, h, score)
+            for image_id, category_id, (x, y, w, h), score in zip(
+                columns["image_id"].tolist(),
+                columns["category_id"].tolist(),
+                columns["bbox"].tolist(),
+                columns["score"].tolist(),
+            )
+        ]
+        if not entries:
+            return
+
+        if self.count:
+            self.file.write(",")
+        self.file.write(",".join(entries))
+        self.count += len(entries)
+
+    def close(self):
+        self.file.write("]")
+        self.file.close()
+        os.replace(self.tmp_path, self.output_path)
+
+    def abort(self):
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class ColumnarResultsWriter:
+    """
+    Incrementally write COCO results as raw binary column files.
+
+    meta.json is written last by close(); without it the directory cannot
+    be loaded, so a failed export is never mistaken for a complete one.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / "meta.json").unlink(missing_ok=True)
+        self.files = {
+            name: open(self.output_dir / f"{name}.bin", "wb")
+            for name in COLUMN_DTYPES
+        }
+        self.count = 0
+
+    def write(self, columns):
+        for name, f in self.files.items():
+            np.ascontiguousarray(columns[name], dtype=COLUMN_DTYPES[name]).tofile(f)
+        self.count += len(columns["score"])
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+        meta = {
+            "count": self.count,
+            "columns": {
+                name: {"dtype": dtype.str, "width": COLUMN_WIDTHS[name]}
+                for name, dtype in COLUMN_DTYPES.items()
+            },
+        }
+        with open(self.output_dir / "meta.json", "w") as f:
+            json.dump(meta, f, indent=4)
+
+    def abort(self):
+        for name, f in self.files.items():
+            f.close()
+            (self.output_dir / f"{name}.bin").unlink(missing_ok=True)
+
+
+RESULT_WRITERS = {
+    "json": JsonResultsWriter,
+    "columnar": ColumnarResultsWriter,
+}
+
+
+def load_columnar_results(results_dir):
+    """
+    Memory-map a columnar results directory written by ColumnarResultsWriter.
+
+    Args:
+        results_dir (str | Path): Directory containing meta.json and *.bin
+
+    Returns:
+        dict: Columns "image_id", "category_id", "bbox" (N x 4), "score"
+    """
+
+    results_dir = Path(results_dir)
+    with open(results_dir / "meta.json", "r") as f:
+        meta = json.load(f)
+
+    count = meta["count"]
+    columns = {}
+    for name, info in meta["columns"].items():
+        shape = (count, info["width"]) if info["width"] > 1 else (count,)
+        if count == 0:
+            columns[name] = np.empty(shape, dtype=info["dtype"])
+        else:
+            columns[name] = np.memmap(
+                results_dir / f"{name}.bin", dtype=info["dtype"], mode="r", shape=shape
+            )
+
+    return columns
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+
+def export_results(samples, output_path, output_format="json", workers=8,
+                   batch_size=DEFAULT_BATCH_SIZE, score_thr=0.0, topk=None, class_lut=None):
+    """
+    Stream YOLO prediction files into a COCO results file.
+
+    Args:
+        samples (iterable): (image_id, img_path, label_path) tuples
+        output_path (Path): Output .json file or columnar directory
+        output_format (str): "json" or "columnar"
+        workers (int): Number of reader threads
+        batch_size (int): Number of images per batch
+        score_thr (float): Minimum confidence to keep
+        topk (int, optional): Maximum detections per image
+        class_lut (ClassLUT, optional): Class remapping
+
+    Returns:
+        int: Number of exported detections; if reading fails, the error is
+             raised and no output file / meta.json is left behind
+    """
+
+    if output_format not in RESULT_WRITERS:
+        raise ValueError(f"Unknown results format: {output_format}")
+
+    writer = RESULT_WRITERS[output_format](output_path)
+    try:
+        for columns in iter_result_batches(
+            samples, workers, batch_size, score_thr, topk, class_lut
+        ):
+            with stage("write"):
+                writer.write(columns)
+    except BaseException:
+        writer.abort()
+        raise
+
+    writer.close()
+    return writer.count
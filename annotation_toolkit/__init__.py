@@ -0,0 +1,9 @@
+"""
+annotation_toolkit
+
+Shared dataset utilities used across the converter modules.
+
+The converter directories (COCO-to-Yolo-format, Yolo-to-COCO-format, ...)
+stay self-contained scripts; this package holds the pieces that work on
+more than one of them.
+"""
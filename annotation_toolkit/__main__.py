@@ -0,0 +1,5 @@
+import sys
+
+from annotation_toolkit.cli import main
+
+sys.exit(main())
@@ -0,0 +1,257 @@
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+"""
+benchmark.py
+
+Throughput and peak-memory benchmarks for the converter entry points:
+
+- coco2yolo  COCO-to-Yolo-format   convert_all_coco_to_yolo()
+- yolo2coco  Yolo-to-COCO-format   get_images_info_and_annotations()
+- poly2rect  Polygon-to-Rectangle  convert_all_txt_files()
+- seg2yolo   Seg-to-Yolo-format    convert_all_masks()
+
+Each run executes in a fresh process, so its peak RSS belongs to that
+benchmark alone. Results are appended to a JSON-lines file together with
+the git commit, so runs on different commits can be compared:
+
+    python -m annotation_toolkit.synthetic --out bench_data --images 1000
+    python -m annotation_toolkit.benchmark run --data bench_data --results benchmarks.jsonl
+    python -m annotation_toolkit.benchmark compare --results benchmarks.jsonl
+"""
+
+BENCHMARKS = ("coco2yolo", "yolo2coco", "poly2rect", "seg2yolo")
+
+# Regressions slower than this ratio are flagged by compare
+REGRESSION_RATIO = 1.10
+
+
+def _run_coco2yolo(data_dir, output_dir):
+    converter = _load("coco2yolo")
+    converter.convert_all_coco_to_yolo(data_dir / "coco", data_dir / "yolo", output_dir)
+
+
+def _run_yolo2coco(data_dir, output_dir):
+    converter = _load("yolo2coco")
+    opt = argparse.Namespace(path=str(data_dir / "yolo"), yolo_subdir=False, box2seg=False, workers=8)
+    converter.get_images_info_and_annotations(opt)
+
+
+def _run_poly2rect(data_dir, output_dir):
+    converter = _load("poly2rect")
+    converter.convert_all_txt_files(str(data_dir / "polygons"), str(output_dir))
+
+
+def _run_seg2yolo(data_dir, output_dir):
+    converter = _load("seg2yolo")
+    converter.convert_all_masks(str(data_dir / "masks"), str(output_dir))
+
+
+BENCHMARK_FUNCTIONS = {
+    "coco2yolo": _run_coco2yolo,
+    "yolo2coco": _run_yolo2coco,
+    "poly2rect": _run_poly2rect,
+    "seg2yolo": _run_seg2yolo,
+}
+
+# Dataset format each benchmark reads
+BENCHMARK_FORMATS = {
+    "coco2yolo": ("coco", "yolo"),
+    "yolo2coco": ("yolo",),
+    "poly2rect": ("polygons",),
+    "seg2yolo": ("masks",),
+}
+
+
+def _load(name):
+    from annotation_toolkit.modules import load_converter
+
+    return load_converter(name)
+
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(name, data_dir):
+    """
+    Run one benchmark in the current (fresh) process.
+    """
+
+    # Converters print per file; keep the console out of the measurement
+    with tempfile.TemporaryDirectory() as output_dir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        BENCHMARK_FUNCTIONS[name](Path(data_dir), Path(output_dir))
+        seconds = time.perf_counter() - start
+
+    return seconds, _peak_rss_mb()
+
+
+def run_benchmark(name, data_dir, repeat=3):
+    """
+    Time one entry point over a synthetic dataset.
+
+    Args:
+        name (str): Key of BENCHMARK_FUNCTIONS
+        data_dir (str | Path): Output of annotation_toolkit.synthetic
+        repeat (int): Number of runs, each in a new process
+
+    Returns:
+        dict: Best time, throughput and peak RSS
+    """
+
+    with open(Path(data_dir) / "meta.json", "r") as f:
+        meta = json.load(f)
+
+    missing = [fmt for fmt in BENCHMARK_FORMATS[name] if fmt not in meta["formats"]]
+    if missing:
+        raise ValueError(f"Dataset has no {', '.join(missing)} data for {name}")
+
+    # spawn: no memory inherited from this process
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for _ in range(repeat):
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(_measure, (name, str(data_dir))))
+
+    seconds = min(run[0] for run in runs)
+    images = meta["images"]
+    objects = images * meta["boxes_per_image"]
+
+    return {
+        "seconds": seconds,
+        "runs": [run[0] for run in runs],
+        "images_per_s": images / seconds,
+        "objects_per_s": objects / seconds,
+        "peak_rss_mb": max(run[1] for run in runs),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(data_dir, results_path, names=BENCHMARKS, repeat=3):
+    """
+    Run benchmarks and append one record to a JSON-lines results file.
+
+    Returns:
+        dict: The appended record
+    """
+
+    with open(Path(data_dir) / "meta.json", "r") as f:
+        dataset = json.load(f)
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, data_dir, repeat)
+        print(
+            f"{name:<10} {results[name]['seconds']:8.3f}s  "
+            f"{results[name]['images_per_s']:10.1f} img/s  "
+            f"{results[name]['objects_per_s']:12.1f} obj/s  "
+            f"{results[name]['peak_rss_mb']:8.1f} MB"
+        )
+
+    record = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "dataset": dataset,
+        "results": results,
+    }
+    with open(results_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    return record
+
+
+def compare_records(baseline, current):
+    """
+    Print time and memory ratios of two result records.
+
+    Returns:
+        list[str]: Benchmarks that got slower than REGRESSION_RATIO
+    """
+
+    print(f"baseline {baseline['commit']} ({baseline['timestamp']})")
+    print(f"current  {current['commit']} ({current['timestamp']})")
+    if baseline["dataset"] != current["dataset"]:
+        print("warning: the records used different datasets")
+
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        base = baseline["results"][name]
+        time_ratio = result["seconds"] / base["seconds"]
+        rss_ratio = result["peak_rss_mb"] / base["peak_rss_mb"]
+        flag = "  REGRESSION" if time_ratio > REGRESSION_RATIO else ""
+        print(f"{name:<10} time x{time_ratio:5.2f}  peak RSS x{rss_ratio:5.2f}{flag}")
+        if flag:
+            regressions.append(name)
+
+    return regressions
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the converter entry points")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run benchmarks on a synthetic dataset")
+    run.add_argument("--data", required=True, help="Dataset from annotation_toolkit.synthetic.")
+    run.add_argument("--results", default="benchmarks.jsonl", help="JSON-lines results file.")
+    run.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    run.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (best time is kept).")
+
+    compare = subparsers.add_parser("compare", help="Compare two recorded runs")
+    compare.add_argument("--results", default="benchmarks.jsonl")
+    compare.add_argument("--baseline", type=int, default=-2, help="Record index (default: second to last).")
+    compare.add_argument("--current", type=int, default=-1, help="Record index (default: last).")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "run":
+        run_suite(opt.data, opt.results, opt.only, opt.repeat)
+        print(f"Appended results to: {opt.results}")
+        return
+
+    with open(opt.results, "r") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if len(records) < 2:
+        raise SystemExit("Need at least two recorded runs to compare.")
+
+    regressions = compare_records(records[opt.baseline], records[opt.current])
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main(get_args())
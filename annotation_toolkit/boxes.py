@@ -0,0 +1,103 @@
+import numpy as np
+
+"""
+boxes.py
+
+Vectorized bounding-box helpers shared by the dataset tools.
+
+All functions work on NumPy arrays with one box per row.
+
+Box layouts:
+- "xyxy":  [x_min, y_min, x_max, y_max]
+- "xywh":  [x_min, y_min, width, height]        (COCO)
+- "cxcywh": [x_center, y_center, width, height] (YOLO)
+"""
+
+
+def cxcywh_to_xyxy(boxes):
+    """
+    Convert YOLO center boxes to corner boxes.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    half = boxes[:, 2:] / 2
+    return np.concatenate([boxes[:, :2] - half, boxes[:, :2] + half], axis=1)
+
+
+def xyxy_to_cxcywh(boxes):
+    """
+    Convert corner boxes to YOLO center boxes.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    size = boxes[:, 2:] - boxes[:, :2]
+    return np.concatenate([boxes[:, :2] + size / 2, size], axis=1)
+
+
+def xywh_to_xyxy(boxes):
+    """
+    Convert COCO boxes to corner boxes.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1)
+
+
+def box_area(boxes):
+    """
+    Area of corner boxes; degenerate boxes have zero area.
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def pairwise_iou(boxes_a, boxes_b):
+    """
+    IoU between every box in boxes_a and every box in boxes_b.
+
+    Args:
+        boxes_a (ndarray): (N, 4) corner boxes
+        boxes_b (ndarray): (M, 4) corner boxes
+
+    Returns:
+        ndarray: (N, M) IoU matrix
+    """
+
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    wh = np.clip(bottom_right - top_left, 0, None)
+    inter = wh[..., 0] * wh[..., 1]
+
+    union = box_area(boxes_a)[:, None] + box_area(boxes_b)[None, :] - inter
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(union > 0, inter / union, 0.0)
+
+
+def duplicate_pairs(boxes, classes, iou_thr):
+    """
+    Find pairs of same-class boxes that overlap at least iou_thr.
+
+    Uses the sorted sweep of annotation_toolkit.suppression, so only
+    boxes whose x ranges overlap get an IoU (no N x N matrix per class).
+
+    Args:
+        boxes (ndarray): (N, 4) corner boxes
+        classes (ndarray): (N,) class ids
+        iou_thr (float): Minimum IoU for a pair to count as duplicate
+
+    Returns:
+        ndarray: (P, 2) index pairs (i, j) with i < j
+    """
+
+    from annotation_toolkit.suppression import overlap_pairs
+
+    classes = np.asarray(classes)
+    first, second, _ = overlap_pairs(boxes, iou_thr, classes)
+
+    i = np.minimum(first, second)
+    j = np.maximum(first, second)
+
+    # Grouped by class, then by index
+    order = np.lexsort((j, i, classes[i])) if len(i) else np.zeros(0, dtype=np.int64)
+    return np.stack([i[order], j[order]], axis=1).astype(np.int64)
@@ -0,0 +1,580 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+"""
+cache.py
+
+Binary columnar dataset cache.
+
+A parsed dataset (images, boxes, polygons, categories) is stored as a
+directory of plain .npy arrays. Loading memory-maps every array, so even
+datasets with millions of boxes reload without parsing any text or JSON,
+and can be exported straight to COCO JSON or YOLO labels.
+
+Layout:
+- image_ids.npy         (I,)     COCO image ids
+- image_sizes.npy       (I, 2)   width, height
+- file_names.npy        (B,)     UTF-8 bytes of all file names
+- file_name_offsets.npy (I + 1,)
+- ann_ids.npy           (N,)     annotations grouped by image
+- ann_image.npy         (N,)     image row of every annotation
+- category_ids.npy      (N,)
+- bboxes.npy            (N, 4)   COCO [xmin, ymin, width, height] in pixels
+- areas.npy             (N,)
+- iscrowd.npy           (N,)
+- box_offsets.npy       (I + 1,) annotations of image i
+- ann_poly_offsets.npy  (N + 1,) polygons of annotation n
+- poly_offsets.npy      (P + 1,) vertices of polygon p
+- poly_coords.npy       (V, 2)   polygon vertices in pixels
+- category_table.npy    (K,)     category ids
+- meta.json             category names / supercategories, counts and the
+                        cache key (input, file signature, options)
+
+A cache built by a converter stores a key of its input: the input path,
+a digest of every input file's path, mtime and size, and the conversion
+options. The converter reuses the cache only when the key of the
+current run matches (see cache_key() / cache_matches()) and rebuilds it
+otherwise.
+"""
+
+CACHE_ARRAYS = (
+    "image_ids",
+    "image_sizes",
+    "file_names",
+    "file_name_offsets",
+    "ann_ids",
+    "ann_image",
+    "category_ids",
+    "bboxes",
+    "areas",
+    "iscrowd",
+    "box_offsets",
+    "ann_poly_offsets",
+    "poly_offsets",
+    "poly_coords",
+    "category_table",
+)
+
+
+def _offsets(lengths):
+    return np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]).astype(np.int64)
+
+
+def _numeric(values, columns=None):
+    """
+    Integer values stay int64 (so exports reproduce e.g. "area": 53631),
+    everything else becomes float64.
+    """
+    array = np.asarray(values)
+    dtype = np.int64 if array.dtype.kind in "iub" else np.float64
+    array = array.astype(dtype)
+    return array if columns is None else array.reshape(-1, columns)
+
+
+def _encode_strings(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, _offsets([len(e) for e in encoded])
+
+
+# --------------------------------------------------
+# Cache Key
+# --------------------------------------------------
+
+def cache_key(input_path, files, options):
+    """
+    Key identifying the input a cache was built from.
+
+    Args:
+        input_path (str): Input path / pattern as given on the command line
+        files (iterable): Every file the conversion reads (missing files
+                          are part of the key too)
+        options (dict): JSON-serializable conversion options
+
+    Returns:
+        dict: Key stored in meta.json
+    """
+
+    digest = hashlib.sha256()
+    num_files = 0
+    for path in files:
+        try:
+            stat = os.stat(path)
+            signature = f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n"
+        except FileNotFoundError:
+            signature = f"{path}\0missing\n"
+        digest.update(signature.encode("utf-8"))
+        num_files += 1
+
+    # Round trip through JSON so the key compares equal to the stored one
+    return json.loads(json.dumps({
+        "input": str(input_path),
+        "files": digest.hexdigest(),
+        "num_files": num_files,
+        "options": options,
+    }))
+
+
+def cache_matches(cache_dir, key):
+    """
+    True when cache_dir holds a complete cache built with this key.
+    """
+
+    meta_path = Path(cache_dir) / "meta.json"
+    if not meta_path.exists():
+        return False
+    with open(meta_path, "r") as f:
+        return json.load(f).get("key") == key
+
+
+# --------------------------------------------------
+# Writing
+# --------------------------------------------------
+
+def save_cache(cache_dir, images, annotations, polygons, categories, key=None):
+    """
+    Write a dataset cache.
+
+    Args:
+        cache_dir (str | Path): Output directory
+        images (dict): "ids", "sizes" (I, 2), "file_names" (list[str])
+        annotations (dict): "ids", "image" (row into images, grouped),
+                            "category_ids", "bboxes" (N, 4), "areas", "iscrowd"
+        polygons (tuple): (ann_poly_offsets, poly_offsets, poly_coords)
+        categories (list[dict]): COCO categories
+        key (dict, optional): cache_key() of the input
+
+    Returns:
+        Path: The cache directory
+    """
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # meta.json is written last; without it a half-written cache is never reused
+    (cache_dir / "meta.json").unlink(missing_ok=True)
+
+    file_names, file_name_offsets = _encode_strings(images["file_names"])
+    ann_poly_offsets, poly_offsets, poly_coords = polygons
+    num_images = len(images["ids"])
+
+    arrays = {
+        "image_ids": np.asarray(images["ids"], dtype=np.int64),
+        "image_sizes": np.asarray(images["sizes"], dtype=np.int64).reshape(-1, 2),
+        "file_names": file_names,
+        "file_name_offsets": file_name_offsets,
+        "ann_ids": np.asarray(annotations["ids"], dtype=np.int64),
+        "ann_image": np.asarray(annotations["image"], dtype=np.int64),
+        "category_ids": np.asarray(annotations["category_ids"], dtype=np.int64),
+        "bboxes": np.asarray(annotations["bboxes"], dtype=np.float64).reshape(-1, 4),
+        "areas": _numeric(annotations["areas"]),
+        "iscrowd": np.asarray(annotations["iscrowd"], dtype=np.uint8),
+        "box_offsets": np.searchsorted(
+            np.asarray(annotations["image"], dtype=np.int64), np.arange(num_images + 1)
+        ).astype(np.int64),
+        "ann_poly_offsets": np.asarray(ann_poly_offsets, dtype=np.int64),
+        "poly_offsets": np.asarray(poly_offsets, dtype=np.int64),
+        "poly_coords": _numeric(poly_coords, 2),
+        "category_table": np.array([c["id"] for c in categories], dtype=np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(cache_dir / f"{name}.npy", array)
+
+    meta = {
+        "images": num_images,
+        "annotations": len(arrays["ann_ids"]),
+        "polygons": len(arrays["poly_offsets"]) - 1,
+        "categories": categories,
+        "key": key,
+    }
+    with open(cache_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=4)
+
+    return cache_dir
+
+
+def build_cache_from_coco(coco, cache_dir, class_map=None, key=None):
+    """
+    Cache a parsed COCO dictionary (read_json() output or main.py's coco_format).
+
+    Args:
+        coco (dict): COCO dataset
+        cache_dir (str | Path): Output directory
+        class_map (ClassMap, optional): Class mapping config applied to the
+                                        category ids (annotation_toolkit.classmap)
+        key (dict, optional): cache_key() of the input
+
+    Returns:
+        Path: The cache directory
+    """
+
+    images = coco.get("images", [])
+    annotations = coco.get("annotations", [])
+    categories = coco.get("categories", [])
+
+    image_ids = np.array([img["id"] for img in images], dtype=np.int64)
+    row_of = {image_id: row for row, image_id in enumerate(image_ids.tolist())}
+
+    rows = np.array([row_of.get(a["image_id"], -1) for a in annotations], dtype=np.int64)
+    category_ids = np.array([a["category_id"] for a in annotations], dtype=np.int64)
+    keep = rows >= 0
+
+    if class_map is not None:
+        class_lut = class_map.compile({c["id"]: c["name"] for c in categories}, id_space="coco")
+        category_ids = class_lut.map(category_ids, "coco")
+        keep &= category_ids >= 0
+        categories = class_lut.categories()
+
+    # Group annotations by image row, keeping their order within an image
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(rows[order], kind="stable")]
+    anns = [annotations[i] for i in order]
+
+    # Polygon segmentations (RLE / empty segmentations have no polygons)
+    polys = [a.get("segmentation") if isinstance(a.get("segmentation"), list) else [] for a in anns]
+    poly_lengths = [len(p) // 2 for seg in polys for p in seg]
+    coords = [v for seg in polys for p in seg for v in p[:len(p) // 2 * 2]]
+
+    return save_cache(
+        cache_dir,
+        images={
+            "ids": image_ids,
+            "sizes": [[img["width"], img["height"]] for img in images],
+            "file_names": [img["file_name"] for img in images],
+        },
+        annotations={
+            "ids": [a.get("id", 0) for a in anns],
+            "image": rows[order],
+            "category_ids": category_ids[order],
+            "bboxes": [a["bbox"] for a in anns],
+            "areas": [a.get("area", a["bbox"][2] * a["bbox"][3]) for a in anns],
+            "iscrowd": [a.get("iscrowd", 0) for a in anns],
+        },
+        polygons=(
+            _offsets([len(seg) for seg in polys]),
+            _offsets(poly_lengths),
+            np.array(coords).reshape(-1, 2),
+        ),
+        categories=categories,
+        key=key,
+    )
+
+
+def build_cache_from_yolo(images_dir, cache_dir, class_names, labels_dir=None,
+                          yolo_subdir=False, workers=8, class_map=None):
+    """
+    Cache a YOLO bbox / polygon dataset.
+
+    Boxes are stored in pixels with COCO category ids (class id + 1),
+    like Yolo-to-COCO-format/main.py. Polygon lines keep their vertices.
+
+    Args:
+        images_dir (str): Image root directory
+        cache_dir (str | Path): Output directory
+        class_names (list[str]): Class names
+        labels_dir (str, optional): Label root mirroring images_dir
+        yolo_subdir (bool): Labels are in a YOLO_darknet/ subdirectory
+        workers (int): Number of reader threads
+        class_map (ClassMap, optional): Class mapping config, compiled
+                                        against class_names
+
+    Returns:
+        Path: The cache directory
+    """
+
+    import imagesize
+
+    from annotation_toolkit.validate import find_images, get_yolo_label_path, parse_yolo_text
+
+    images_dir = Path(images_dir)
+    image_paths = find_images(images_dir)
+
+    def read(img_path):
+        width, height = imagesize.get(str(img_path))
+        label_path = get_yolo_label_path(img_path, images_dir, labels_dir, yolo_subdir)
+        if not label_path.exists():
+            return width, height, None
+        with open(label_path, "r") as f:
+            return width, height, parse_yolo_text(f.read())
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parsed = list(pool.map(read, image_paths))
+
+    class_lut = None if class_map is None else class_map.compile(class_names)
+
+    sizes, ann_image, category_ids, bboxes = [], [], [], []
+    ann_poly_counts, poly_lengths, coords = [], [], []
+
+    for row, (width, height, labels) in enumerate(parsed):
+        sizes.append([width, height])
+        if labels is None:
+            continue
+
+        values, starts, lengths, _ = labels
+
+        # Class column of the whole file -> COCO category ids in one lookup
+        classes = values[starts].astype(np.int64)
+        if class_lut is None:
+            file_category_ids = classes + 1  # COCO category IDs start from 1
+        else:
+            file_category_ids = class_lut.map(classes, "coco")
+
+        for start, length, category_id in zip(
+            starts.tolist(), lengths.tolist(), file_category_ids.tolist()
+        ):
+            # Dropped by the class map
+            if class_lut is not None and category_id < 0:
+                continue
+
+            row_values = values[start:start + length]
+
+            if length == 5:
+                cx, cy, w, h = row_values[1:] * [width, height, width, height]
+                bboxes.append([cx - w / 2, cy - h / 2, w, h])
+                ann_poly_counts.append(0)
+            elif length >= 7 and length % 2 == 1:
+                points = row_values[1:].reshape(-1, 2) * [width, height]
+                x_min, y_min = points.min(axis=0)
+                x_max, y_max = points.max(axis=0)
+                bboxes.append([x_min, y_min, x_max - x_min, y_max - y_min])
+                ann_poly_counts.append(1)
+                poly_lengths.append(len(points))
+                coords.append(points)
+            else:
+                continue
+
+            ann_image.append(row)
+            category_ids.append(category_id)
+
+    bboxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+
+    return save_cache(
+        cache_dir,
+        images={
+            "ids": np.arange(len(image_paths)),
+            "sizes": sizes,
+            "file_names": [p.name for p in image_paths],
+        },
+        annotations={
+            "ids": np.arange(1, len(bboxes) + 1),  # COCO annotation IDs must start from 1
+            "image": ann_image,
+            "category_ids": category_ids,
+            "bboxes": bboxes,
+            "areas": bboxes[:, 2] * bboxes[:, 3],
+            "iscrowd": np.zeros(len(bboxes)),
+        },
+        polygons=(
+            _offsets(ann_poly_counts),
+            _offsets(poly_lengths),
+            np.concatenate(coords) if coords else np.zeros((0, 2)),
+        ),
+        categories=class_lut.categories() if class_lut is not None else [
+            {"id": idx + 1, "name": name, "supercategory": "Defect"}
+            for idx, name in enumerate(class_names)
+        ],
+    )
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+
+class DatasetCache:
+    """
+    Memory-mapped view of a dataset cache.
+    """
+
+    def __init__(self, cache_dir):
+        cache_dir = Path(cache_dir)
+        with open(cache_dir / "meta.json", "r") as f:
+            self.meta = json.load(f)
+
+        self.categories = self.meta["categories"]
+        for name in CACHE_ARRAYS:
+            setattr(self, name, np.load(cache_dir / f"{name}.npy", mmap_mode="r"))
+
+    @property
+    def num_images(self):
+        return len(self.image_ids)
+
+    def file_name(self, row):
+        start, end = self.file_name_offsets[row], self.file_name_offsets[row + 1]
+        return bytes(self.file_names[start:end]).decode("utf-8")
+
+    def polygons(self, ann):
+        """
+        Polygons of one annotation as a list of (P, 2) pixel arrays.
+        """
+        first, last = self.ann_poly_offsets[ann], self.ann_poly_offsets[ann + 1]
+        return [
+            self.poly_coords[self.poly_offsets[p]:self.poly_offsets[p + 1]]
+            for p in range(first, last)
+        ]
+
+
+# --------------------------------------------------
+# Export
+# --------------------------------------------------
+
+def export_coco(cache, output_path, indent=4):
+    """
+    Write a cached dataset as COCO JSON.
+    """
+
+    images = [
+        {
+            "file_name": cache.file_name(row),
+            "width": int(width),
+            "height": int(height),
+            "id": int(image_id),
+        }
+        for row, (image_id, (width, height)) in enumerate(
+            zip(cache.image_ids.tolist(), cache.image_sizes.tolist())
+        )
+    ]
+
+    image_ids = cache.image_ids.tolist()
+    annotations = [
+        {
+            "id": ann_id,
+            "image_id": image_ids[row],
+            "category_id": category_id,
+            "bbox": bbox,
+            "area": area,
+            "iscrowd": iscrowd,
+            "segmentation": [poly.reshape(-1).tolist() for poly in cache.polygons(n)],
+        }
+        for n, (ann_id, row, category_id, bbox, area, iscrowd) in enumerate(zip(
+            cache.ann_ids.tolist(),
+            cache.ann_image.tolist(),
+            cache.category_ids.tolist(),
+            cache.bboxes.tolist(),
+            cache.areas.tolist(),
+            cache.iscrowd.tolist(),
+        ))
+    ]
+
+    with open(output_path, "w") as f:
+        json.dump(
+            {"images": images, "annotations": annotations, "categories": cache.categories},
+            f, indent=indent,
+        )
+
+
+def export_yolo(cache, output_dir, segmentation=False):
+    """
+    Write a cached dataset as YOLO labels, one .txt per image.
+
+    Box lines match COCO-to-Yolo-format/converter.py (class = category_id - 1,
+    values rounded to 6 decimals). With segmentation=True, annotations with a
+    polygon are written as YOLO segmentation lines instead.
+    """
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    sizes = np.asarray(cache.image_sizes, dtype=np.float64)
+    bboxes = np.asarray(cache.bboxes)
+    row_sizes = sizes[np.asarray(cache.ann_image)]
+
+    # Vectorized COCO bbox -> normalized YOLO center box
+    yolo = np.stack([
+        (bboxes[:, 0] + bboxes[:, 2] / 2) / row_sizes[:, 0],
+        (bboxes[:, 1] + bboxes[:, 3] / 2) / row_sizes[:, 1],
+        bboxes[:, 2] / row_sizes[:, 0],
+        bboxes[:, 3] / row_sizes[:, 1],
+    ], axis=1).tolist()
+    classes = (np.asarray(cache.category_ids) - 1).tolist()  # COCO → YOLO index
+    has_polygon = np.diff(np.asarray(cache.ann_poly_offsets)) > 0
+
+    box_offsets = cache.box_offsets.tolist()
+    for row in range(cache.num_images):
+        lines = []
+        for n in range(box_offsets[row], box_offsets[row + 1]):
+            if segmentation and has_polygon[n]:
+                width, height = sizes[row]
+                for poly in cache.polygons(n):
+                    coords = (np.asarray(poly) / [width, height]).reshape(-1)
+                    lines.append(f"{classes[n]} " + " ".join(map(str, coords.tolist())))
+                continue
+
+            x, y, w, h = (round(v, 6) for v in yolo[n])
+            lines.append(f"{classes[n]} {x} {y} {w} {h}")
+
+        with open(output_dir / (Path(cache.file_name(row)).stem + ".txt"), "w") as f:
+            f.write("\n".join(lines))
+
+
+# --------------------------------------------------
+# Command Line
+# --------------------------------------------------
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Build a binary dataset cache or export it to COCO / YOLO"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Build a cache from COCO JSON or YOLO labels")
+    build.add_argument("--out", required=True, help="Cache directory.")
+    source = build.add_mutually_exclusive_group(required=True)
+    source.add_argument("--json", help="COCO annotation file.")
+    source.add_argument("--images", help="YOLO image root directory.")
+    build.add_argument("--labels", default=None, help="YOLO label root (default: next to images).")
+    build.add_argument("--yolo-subdir", action="store_true")
+    build.add_argument("--classes", default=None, help="Class names file (obj.names).")
+    build.add_argument("--class-map", default=None, help="Class mapping JSON (classmap.py).")
+    build.add_argument("--workers", type=int, default=8)
+
+    export = subparsers.add_parser("export", help="Export a cache")
+    export.add_argument("--cache", required=True, help="Cache directory.")
+    export.add_argument("--format", choices=["coco", "yolo", "yolo-seg"], required=True)
+    export.add_argument("--out", required=True, help="Output JSON file or label directory.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "build":
+        class_map = None
+        if opt.class_map:
+            from annotation_toolkit.classmap import load_class_map
+
+            class_map = load_class_map(opt.class_map)
+
+        if opt.json:
+            from annotation_toolkit.modules import load_converter
+
+            coco = load_converter("coco2yolo").read_json(opt.json)
+            build_cache_from_coco(coco, opt.out, class_map)
+        else:
+            from annotation_toolkit.validate import read_class_names
+
+            class_names = read_class_names(opt.classes) if opt.classes else []
+            build_cache_from_yolo(
+                opt.images, opt.out, class_names, opt.labels, opt.yolo_subdir, opt.workers,
+                class_map,
+            )
+        print(f"Saved dataset cache to: {opt.out}")
+        return
+
+    cache = DatasetCache(opt.cache)
+    if opt.format == "coco":
+        export_coco(cache, opt.out)
+    else:
+        export_yolo(cache, opt.out, segmentation=opt.format == "yolo-seg")
+    print(f"Exported {cache.num_images} images to: {opt.out}")
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,268 @@
+import argparse
+import json
+
+import numpy as np
+
+"""
+classmap.py
+
+Declarative class remapping applied while reading annotations.
+
+A JSON config describes the output classes. Each converter compiles it
+against the classes of its input (YOLO indices or COCO category ids)
+into a lookup table and maps the class column of every file with one
+array index, so renaming, merging, dropping or reindexing classes needs
+no separate rewrite pass.
+
+Example config:
+
+    {
+        "source": "yolo",
+        "classes": [
+            {"name": "defect", "from": ["crack", "hole"]},
+            {"name": "stain", "from": [3], "id": 10},
+            {"name": "scratch"}
+        ],
+        "drop": ["background"],
+        "unmapped": "error"
+    }
+
+Keys:
+- classes:  output classes in order; the YOLO index is the position, the
+            COCO category id is "id" (default: position + 1). "from" lists
+            the input classes merged into it, by name or integer id
+            (default: the class with the same name)
+- rename:   without "classes", keep every input class in id order and
+            rename some of them ({"old": "new"}); renaming several classes
+            to the same name merges them. This also turns non-contiguous
+            COCO category ids into contiguous YOLO indices
+- drop:     input classes removed from the output
+- unmapped: "drop" (default) or "error" for input classes that are not
+            listed in "classes" or "drop"
+- source:   meaning of integer ids in the config, "yolo" (0-based
+            indices, default) or "coco" (category ids); converted with
+            category_id = index + 1 like the converters
+
+Usage:
+    python -m annotation_toolkit classmap --config map.json --names obj.names
+    python -m annotation_toolkit classmap --config map.json --coco annotations.json
+"""
+
+CONFIG_KEYS = {"classes", "rename", "drop", "unmapped", "source"}
+CLASS_KEYS = {"name", "from", "id"}
+
+ID_SPACES = ("yolo", "coco")
+
+# Lookup table values for input classes without an output class
+DROPPED = -1
+UNMAPPED = -2
+
+
+class ClassMap:
+    """
+    Parsed class-mapping config; compile() it for a concrete input.
+    """
+
+    def __init__(self, config):
+        unknown = set(config) - CONFIG_KEYS
+        if unknown:
+            raise ValueError(f"Unknown class map keys: {', '.join(sorted(unknown))}")
+
+        self.classes = config.get("classes")
+        self.rename = config.get("rename", {})
+        self.drop = config.get("drop", [])
+        self.unmapped = config.get("unmapped", "drop")
+        self.source = config.get("source", "yolo")
+
+        if self.unmapped not in ("drop", "error"):
+            raise ValueError(f"unmapped must be 'drop' or 'error', got {self.unmapped!r}")
+        if self.source not in ID_SPACES:
+            raise ValueError(f"source must be 'yolo' or 'coco', got {self.source!r}")
+        if self.classes is not None and self.rename:
+            raise ValueError("Use either 'classes' or 'rename', not both")
+
+        for entry in self.classes or []:
+            unknown = set(entry) - CLASS_KEYS
+            if "name" not in entry or unknown:
+                raise ValueError(f"Invalid class entry (keys: name, from, id): {entry}")
+
+    def compile(self, source_classes=None, id_space="yolo"):
+        """
+        Build the lookup table for one input.
+
+        Args:
+            source_classes (list | dict, optional): Input class names by
+                                                    index (list) or by id (dict);
+                                                    None when unknown
+            id_space (str): "yolo" when the input has class indices,
+                            "coco" when it has category ids
+
+        Returns:
+            ClassLUT: Compiled mapping
+        """
+
+        if isinstance(source_classes, (list, tuple)):
+            source_classes = dict(enumerate(source_classes))
+        source_classes = source_classes or {}
+        ids_by_name = {name: class_id for class_id, name in source_classes.items() if name is not None}
+
+        # Integer ids of the config -> ids of this input
+        offset = ID_SPACES.index(id_space) - ID_SPACES.index(self.source)
+
+        def resolve(ref):
+            if isinstance(ref, bool) or not isinstance(ref, (int, str)):
+                raise ValueError(f"Class reference must be a name or an integer id: {ref!r}")
+            if isinstance(ref, int):
+                return ref + offset
+            if ref not in ids_by_name:
+                raise ValueError(f"Unknown input class: {ref!r}")
+            return ids_by_name[ref]
+
+        # Output name -> (input ids, COCO id)
+        outputs = {}
+        if self.classes is not None:
+            coco_ids = set()
+            for position, entry in enumerate(self.classes):
+                if entry["name"] in outputs:
+                    raise ValueError(f"Output class listed twice: {entry['name']!r}")
+                coco_id = entry.get("id", position + 1)
+                if coco_id in coco_ids:
+                    raise ValueError(f"COCO id {coco_id} is used by two output classes")
+                coco_ids.add(coco_id)
+
+                inputs = [resolve(ref) for ref in entry.get("from", [entry["name"]])]
+                outputs[entry["name"]] = (inputs, coco_id)
+        else:
+            if not source_classes:
+                raise ValueError("A class map without 'classes' needs the input class list")
+            dropped = {resolve(ref) for ref in self.drop}
+            for class_id in sorted(source_classes):
+                if class_id in dropped:
+                    continue
+                name = source_classes[class_id]
+                name = self.rename.get(name, name) if name is not None else str(class_id)
+                inputs, _ = outputs.setdefault(name, ([], len(outputs) + 1))
+                inputs.append(class_id)
+
+        assigned = {}
+        for index, (inputs, _) in enumerate(outputs.values()):
+            for class_id in inputs:
+                if class_id in assigned:
+                    raise ValueError(f"Input class {class_id} is mapped twice")
+                assigned[class_id] = index
+        dropped = [resolve(ref) for ref in self.drop]
+
+        known = list(assigned) + dropped + list(source_classes)
+        if min(known, default=0) < 0:
+            raise ValueError(f"Negative class id in class map: {min(known)}")
+
+        fill = DROPPED if self.unmapped == "drop" else UNMAPPED
+        table = np.full(max(known, default=0) + 1, fill, dtype=np.int64)
+        table[dropped] = DROPPED
+        table[list(assigned)] = list(assigned.values())
+
+        return ClassLUT(
+            table,
+            names=list(outputs),
+            coco_ids=[coco_id for _, coco_id in outputs.values()],
+            strict=self.unmapped == "error",
+        )
+
+
+class ClassLUT:
+    """
+    Compiled class mapping: input class id -> output class index.
+    """
+
+    def __init__(self, table, names, coco_ids, strict=False):
+        self.table = table
+        self.names = names
+        self.coco_ids = np.asarray(coco_ids, dtype=np.int64)
+        self.strict = strict
+
+    def map(self, ids, output="yolo"):
+        """
+        Map input class ids with one table lookup.
+
+        Args:
+            ids (array-like): Input class indices / category ids
+            output (str): "yolo" for output indices, "coco" for category ids
+
+        Returns:
+            ndarray: Mapped ids; -1 for dropped classes
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        inside = (ids >= 0) & (ids < len(self.table))
+        mapped = np.where(inside, self.table[np.where(inside, ids, 0)], UNMAPPED if self.strict else DROPPED)
+
+        if self.strict and (mapped == UNMAPPED).any():
+            missing = sorted(set(ids[mapped == UNMAPPED].tolist()))
+            raise ValueError(f"Class ids not covered by the class map: {missing}")
+
+        if output == "coco":
+            return np.where(mapped >= 0, self.coco_ids[np.maximum(mapped, 0)], DROPPED)
+        return mapped
+
+    def categories(self, supercategory="Defect"):
+        """
+        COCO categories of the output classes.
+        """
+        return [
+            {"id": coco_id, "name": name, "supercategory": supercategory}
+            for coco_id, name in zip(self.coco_ids.tolist(), self.names)
+        ]
+
+
+def load_class_map(path):
+    """
+    Read a class-mapping config (JSON).
+
+    Returns:
+        ClassMap: Parsed config
+    """
+    with open(path, "r") as f:
+        return ClassMap(json.load(f))
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Show how a class map compiles for an input")
+    parser.add_argument("--config", required=True, help="Class map JSON.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--names", default=None, help="YOLO class names file (obj.names).")
+    source.add_argument("--coco", default=None, help="COCO JSON whose categories are the input.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    class_map = load_class_map(opt.config)
+
+    if opt.coco:
+        with open(opt.coco, "r") as f:
+            categories = json.load(f).get("categories", [])
+        source_classes = {c["id"]: c["name"] for c in categories}
+        lut = class_map.compile(source_classes, "coco")
+    else:
+        from annotation_toolkit.validate import read_class_names
+
+        source_classes = dict(enumerate(read_class_names(opt.names))) if opt.names else {}
+        lut = class_map.compile(source_classes, "yolo")
+
+    for source_id in sorted(set(source_classes) | set(range(len(lut.table)))):
+        index = int(lut.table[source_id]) if source_id < len(lut.table) else DROPPED
+        if index == DROPPED:
+            target = "dropped"
+        elif index == UNMAPPED:
+            target = "unmapped (error)"
+        else:
+            target = f"{index} {lut.names[index]} (COCO id {lut.coco_ids[index]})"
+        print(f"{source_id:>5} {source_classes.get(source_id, ''):<20} -> {target}")
+
+
+if __name__ == "__main__":
+    main(get_args())
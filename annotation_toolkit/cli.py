@@ -0,0 +1,107 @@
+import importlib
+import os
+import sys
+
+"""
+cli.py
+
+Single command-line entry point for all converters and dataset tools:
+
+    python -m annotation_toolkit <command> [options]
+    python -m annotation_toolkit <command> --help
+
+Only the selected command is imported, so starting a short conversion
+never loads OpenCV, matplotlib or the code of the other commands. The
+command table below is plain data; nothing heavy is imported to list it.
+"""
+
+# Command -> (kind, target, help)
+#   converter: script loaded with modules.load_converter(), get_args(argv) / main(opt)
+#   module:    annotation_toolkit module with get_args(argv) / main(opt)
+#   script:    stand-alone script run in its own directory (visualizers)
+COMMANDS = {
+    "yolo2coco": ("converter", "yolo2coco", "YOLO labels -> COCO JSON (Yolo-to-COCO-format/main.py)"),
+    "coco2yolo": ("converter", "coco2yolo", "COCO JSON -> YOLO labels"),
+    "poly2rect": ("converter", "poly2rect", "Polygon labels -> YOLO boxes"),
+    "seg2yolo": ("converter", "seg2yolo", "RGB masks -> YOLO segmentation labels"),
+    "evaluate": ("converter", "evaluate", "COCO AP / AR of detection results"),
+    "validate": ("module", "annotation_toolkit.validate", "Validate a dataset and collect statistics"),
+    "cache": ("module", "annotation_toolkit.cache", "Build / export a binary dataset cache"),
+    "classmap": ("module", "annotation_toolkit.classmap", "Show how a class mapping config compiles"),
+    "shards": ("module", "annotation_toolkit.shards", "Pack / unpack tar and zip shards"),
+    "tiling": ("module", "annotation_toolkit.tiling", "Slice images into tiles / stitch predictions"),
+    "spatial-index": ("module", "annotation_toolkit.spatial_index", "Build / query a spatial index"),
+    "profile": ("module", "annotation_toolkit.profiling", "Run a converter script with profiling"),
+    "benchmark": ("module", "annotation_toolkit.benchmark", "Converter throughput benchmarks"),
+    "synthetic": ("module", "annotation_toolkit.synthetic", "Generate a synthetic dataset"),
+    "prefetch-demo": ("module", "annotation_toolkit.prefetch", "Prefetching reader on a slow file system"),
+    "server": ("module", "annotation_toolkit.server", "Conversion server with warm workers / job client"),
+    "import-budget": ("module", "annotation_toolkit.import_budget", "Check startup import times"),
+    "visualize-coco2yolo": ("script", "COCO-to-Yolo-format/visualizer.py", "Draw YOLO boxes (COCO-to-Yolo example)"),
+    "visualize-poly2rect": ("script", "Polygon-to-Rectangle-format/visualizer.py", "Draw YOLO boxes (Polygon example)"),
+    "visualize-seg2yolo": ("script", "Seg-to-Yolo-format/visualizer.py", "Draw YOLO polygons (Seg example)"),
+}
+
+
+def print_commands(file=sys.stdout):
+    print("usage: python -m annotation_toolkit <command> [options]\n", file=file)
+    print("commands:", file=file)
+    for name, (_, _, help_text) in COMMANDS.items():
+        print(f"  {name:<21} {help_text}", file=file)
+
+
+def load_command(name):
+    """
+    Import the module implementing a command.
+
+    Returns:
+        module: Module with get_args(argv) and main(opt)
+    """
+
+    kind, target, _ = COMMANDS[name]
+    if kind == "converter":
+        from annotation_toolkit.modules import load_converter
+
+        return load_converter(target)
+    return importlib.import_module(target)
+
+
+def run_script(path, argv):
+    """
+    Run a stand-alone script from its own directory (its paths are relative).
+    """
+
+    import runpy
+
+    from annotation_toolkit.modules import REPO_ROOT
+
+    script = REPO_ROOT / path
+    os.chdir(script.parent)
+    sys.path.insert(0, str(script.parent))
+    sys.argv = [str(script)] + argv
+    runpy.run_path(str(script), run_name="__main__")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    if not argv or argv[0] in ("-h", "--help"):
+        print_commands()
+        return 0
+
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n", file=sys.stderr)
+        print_commands(file=sys.stderr)
+        return 2
+
+    kind, target, _ = COMMANDS[name]
+    if kind == "script":
+        run_script(target, rest)
+        return 0
+
+    # argparse shows "annotation_toolkit <command>" in usage lines
+    sys.argv[0] = f"annotation_toolkit {name}"
+    module = load_command(name)
+    # Keep the command's own exit code (e.g. validate returns 1 on errors)
+    return module.main(module.get_args(rest)) or 0
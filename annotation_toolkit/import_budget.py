@@ -0,0 +1,173 @@
+from pathlib import Path
+import argparse
+import subprocess
+import sys
+
+"""
+import_budget.py
+
+Startup import-time budget for the CLI commands.
+
+Thousands of short conversions each start a fresh interpreter, so the
+time spent importing before any work starts matters. For every command
+this check loads the command module in a fresh interpreter with
+`python -X importtime`, sums the import time of everything that is not
+already imported by a bare interpreter, and compares it with a budget.
+It also fails when a command loads a module that must stay deferred
+(OpenCV, matplotlib) at startup.
+
+Budgets are generous multiples of the measured times, so the check only
+fires on real regressions such as a new top-level `import cv2`:
+
+    python -m annotation_toolkit import-budget
+    python -m annotation_toolkit import-budget --only yolo2coco coco2yolo
+"""
+
+# Command -> maximum import time in milliseconds (None = the CLI itself)
+IMPORT_BUDGET_MS = {
+    None: 30,
+    "yolo2coco": 80,
+    "coco2yolo": 60,
+    "poly2rect": 60,
+    "seg2yolo": 300,
+    "evaluate": 300,
+    "validate": 250,
+    "cache": 250,
+    "classmap": 250,
+    "shards": 80,
+    "tiling": 250,
+    "spatial-index": 250,
+    "profile": 60,
+    "benchmark": 100,
+    "synthetic": 250,
+    "prefetch-demo": 80,
+    "server": 60,
+}
+
+# Modules that must not be imported before a command does real work
+DEFERRED_MODULES = ("cv2", "matplotlib")
+
+# Commands that need a deferred module for their core work
+DEFERRED_EXCEPTIONS = {
+    "seg2yolo": ("cv2",),
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `python -X importtime` output.
+
+    Returns:
+        dict: Top-level module name -> cumulative import time in microseconds
+              (nested imports are included in their parent)
+        set: Names of all imported modules
+    """
+
+    top_level = {}
+    imported = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        imported.add(module)
+        # Nesting is shown by indentation; top-level imports have one space
+        if len(name) - len(name.lstrip()) == 1:
+            top_level[module] = int(cumulative)
+
+    return top_level, imported
+
+
+def _importtime(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_command(command=None, repeat=5):
+    """
+    Import time of one CLI command in fresh interpreters.
+
+    Args:
+        command (str, optional): CLI command; None measures the CLI module
+        repeat (int): Number of interpreters; the fastest run is kept
+
+    Returns:
+        tuple: (milliseconds, set of imported module names)
+    """
+
+    baseline, _ = _importtime("pass")
+
+    code = "import annotation_toolkit.cli"
+    if command is not None:
+        code += f"\nannotation_toolkit.cli.load_command({command!r})"
+
+    best, modules = None, set()
+    for _ in range(repeat):
+        top_level, imported = _importtime(code)
+        micros = sum(t for name, t in top_level.items() if name not in baseline)
+        if best is None or micros < best:
+            best, modules = micros, imported
+
+    return best / 1000, modules
+
+
+def check_budgets(commands=None, repeat=5):
+    """
+    Measure commands and compare them with IMPORT_BUDGET_MS.
+
+    Returns:
+        list[str]: Failure messages (empty when every command is in budget)
+    """
+
+    commands = list(IMPORT_BUDGET_MS) if commands is None else commands
+    failures = []
+
+    for command in commands:
+        millis, modules = measure_command(command, repeat)
+        budget = IMPORT_BUDGET_MS[command]
+        allowed = DEFERRED_EXCEPTIONS.get(command, ())
+        eager = sorted(
+            m for m in DEFERRED_MODULES
+            if m not in allowed and any(n == m or n.startswith(m + ".") for n in modules)
+        )
+
+        label = command or "(cli)"
+        status = "ok" if millis <= budget and not eager else "FAIL"
+        print(f"{label:<16} {millis:7.1f} ms / {budget:4d} ms  {status}"
+              + (f"  eager: {', '.join(eager)}" if eager else ""))
+
+        if millis > budget:
+            failures.append(f"{label}: {millis:.1f} ms exceeds the {budget} ms budget")
+        if eager:
+            failures.append(f"{label}: imports {', '.join(eager)} at startup")
+
+    return failures
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Check CLI startup import times against budgets")
+    parser.add_argument("--only", nargs="+", default=None,
+                        choices=[c for c in IMPORT_BUDGET_MS if c is not None])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per command.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    failures = check_budgets(opt.only, opt.repeat)
+    if failures:
+        print("\n" + "\n".join(failures))
+        sys.exit(1)
+    print("\nAll commands within their import budget.")
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,74 @@
+import importlib.util
+import sys
+import threading
+from pathlib import Path
+
+"""
+modules.py
+
+Loads the converter scripts as Python modules.
+
+The converter directories use hyphenated names and several of them contain
+a file called converter.py, so they cannot be imported as packages.
+Each script is loaded from its file path under a unique module name.
+Loading is serialized with a lock: the module is registered in sys.modules
+before it has finished executing, and another thread must not pick it up
+half-initialised.
+"""
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Converter name -> script path relative to the repository root
+CONVERTER_SCRIPTS = {
+    "coco2yolo": "COCO-to-Yolo-format/converter.py",
+    "yolo2coco": "Yolo-to-COCO-format/main.py",
+    "poly2rect": "Polygon-to-Rectangle-format/converter.py",
+    "seg2yolo": "Seg-to-Yolo-format/converter.py",
+    "evaluate": "Yolo-to-COCO-format/evaluate.py",
+}
+
+# Reentrant: a converter may load another converter while it executes
+_load_lock = threading.RLock()
+
+
+def load_converter(name):
+    """
+    Import a converter script by its short name.
+
+    The script's directory is added to sys.path so that sibling imports
+    (e.g. create_annotations in Yolo-to-COCO-format) keep working.
+
+    Args:
+        name (str): Key of CONVERTER_SCRIPTS
+
+    Returns:
+        module: The loaded converter module (cached after the first call)
+    """
+
+    if name not in CONVERTER_SCRIPTS:
+        raise ValueError(f"Unknown converter: {name}")
+
+    with _load_lock:
+        return _load_converter(name)
+
+
+def _load_converter(name):
+    module_name = f"_converter_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    script_path = REPO_ROOT / CONVERTER_SCRIPTS[name]
+    script_dir = str(script_path.parent)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+
+    return module
@@ -0,0 +1,186 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import time
+
+"""
+prefetch.py
+
+Prefetching reader for many small files on high-latency storage.
+
+On network / object-store (FUSE) mounts every open() can take tens of
+milliseconds, so reading label files one by one leaves the CPU idle.
+prefetch() keeps a window of reads in flight on a bounded thread pool while
+the caller parses the results (producer / consumer):
+
+- At most `concurrency` reads run at the same time
+- At most `window` results are buffered; new reads are only submitted when
+  the consumer takes a result (backpressure, bounded memory)
+- Results are yielded in input order, so ids and outputs stay deterministic
+
+Run `python -m annotation_toolkit.prefetch` to see the latency hiding on a
+simulated slow file system.
+"""
+
+DEFAULT_CONCURRENCY = 32
+
+
+def read_text(path):
+    """
+    Read a text file; None if it does not exist.
+    """
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_lines(path):
+    """
+    Read a text file as a list of lines; None if it does not exist.
+    """
+    try:
+        with open(path, "r") as f:
+            return f.readlines()
+    except FileNotFoundError:
+        return None
+
+
+def prefetch(items, read=read_text, concurrency=DEFAULT_CONCURRENCY, window=None):
+    """
+    Read items ahead of the consumer on a bounded thread pool.
+
+    Args:
+        items (iterable): Paths (or any argument for read), consumed lazily
+        read (callable): Blocking reader, called as read(item)
+        concurrency (int): Maximum number of reads in flight
+        window (int, optional): Maximum number of buffered results
+                                (default: 4 * concurrency)
+
+    Yields:
+        tuple: (item, read(item)) in input order; exceptions raised by read
+               are re-raised when their item is reached
+    """
+
+    if concurrency <= 1:
+        for item in items:
+            yield item, read(item)
+        return
+
+    window = max(window or 4 * concurrency, concurrency)
+    items = iter(items)
+    pending = deque()
+    done = object()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        try:
+            for item in items:
+                pending.append((item, pool.submit(read, item)))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                item, future = pending.popleft()
+
+                # Refill one slot per consumed result
+                next_item = next(items, done)
+                if next_item is not done:
+                    pending.append((next_item, pool.submit(read, next_item)))
+
+                yield item, future.result()
+        finally:
+            # Consumer stopped early (break / exception): drop queued reads
+            for _, future in pending:
+                future.cancel()
+
+
+# --------------------------------------------------
+# Slow file system demo
+# --------------------------------------------------
+
+class SlowFileSystem:
+    """
+    Local directory that adds a fixed latency to every open(),
+    like an object-store FUSE mount.
+    """
+
+    def __init__(self, latency=0.03):
+        self.latency = latency
+
+    def read_text(self, path):
+        time.sleep(self.latency)
+        return read_text(path)
+
+
+def run_demo(num_files=400, latency=0.03, concurrency=DEFAULT_CONCURRENCY, boxes_per_file=20):
+    """
+    Parse the same synthetic YOLO labels sequentially and with prefetch().
+
+    Returns:
+        dict: Wall time in seconds of both runs
+    """
+
+    import tempfile
+
+    import numpy as np
+
+    from annotation_toolkit.validate import parse_yolo_text
+
+    rng = np.random.default_rng(0)
+    fs = SlowFileSystem(latency)
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        for i in range(num_files):
+            path = Path(root) / f"{i:06d}.txt"
+            boxes = rng.random((boxes_per_file, 4))
+            path.write_text("\n".join(
+                f"{i % 4} " + " ".join(f"{v:.6f}" for v in box) for box in boxes
+            ))
+            paths.append(path)
+
+        start = time.perf_counter()
+        sequential = sum(len(parse_yolo_text(fs.read_text(p))[1]) for p in paths)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        prefetched = sum(
+            len(parse_yolo_text(text)[1])
+            for _, text in prefetch(paths, fs.read_text, concurrency)
+        )
+        prefetch_time = time.perf_counter() - start
+
+    if not sequential == prefetched == num_files * boxes_per_file:
+        raise RuntimeError(
+            f"Prefetched read parsed {prefetched} boxes, sequential read {sequential}, "
+            f"expected {num_files * boxes_per_file}"
+        )
+    return {"sequential": sequential_time, "prefetch": prefetch_time}
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Compare sequential and prefetched label reading on a simulated slow file system"
+    )
+    parser.add_argument("--files", type=int, default=400, help="Number of label files.")
+    parser.add_argument("--latency", type=float, default=0.03, help="Seconds added to every open().")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    times = run_demo(opt.files, opt.latency, opt.concurrency)
+    print(f"Sequential: {times['sequential']:.2f}s")
+    print(f"Prefetch ({opt.concurrency} in flight): {times['prefetch']:.2f}s")
+    print(f"Speedup: {times['sequential'] / times['prefetch']:.1f}x")
+
+
+if __name__ == "__main__":
+    main(get_args())
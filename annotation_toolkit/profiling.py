@@ -0,0 +1,274 @@
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+import argparse
+import json
+import os
+import runpy
+import sys
+import threading
+
+"""
+profiling.py
+
+Per-stage timers and counters for the converters.
+
+Converters wrap their work in named stages:
+
+    with stage("read"):
+        text = f.read()
+    count("objects", len(lines))
+
+Stages used across the converters: discover, probe, read, parse,
+transform, serialize, write. Stages that run in reader threads are
+summed over all threads, so their seconds can exceed the wall time.
+
+While no profiling() block is active, stage() returns a shared no-op
+context manager and count() returns immediately, so instrumented code
+runs at full speed.
+
+Any converter script can be profiled without changes to its code:
+
+    python -m annotation_toolkit.profiling --report report.json COCO-to-Yolo-format/converter.py
+"""
+
+STAGES = ("discover", "probe", "read", "parse", "transform", "serialize", "write")
+
+# Profiler of the running profiling() block (None when disabled)
+_active = None
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """
+    Context manager timing one stage (no-op while profiling is disabled).
+    """
+    profiler = _active
+    if profiler is None:
+        return NULL_STAGE
+    return _Stage(profiler, name)
+
+
+def count(name, n=1):
+    """
+    Increase a counter (no-op while profiling is disabled).
+    """
+    profiler = _active
+    if profiler is not None:
+        profiler.add_count(name, n)
+
+
+def is_enabled():
+    return _active is not None
+
+
+class Profiler:
+    """
+    Thread-safe accumulator of stage times and counters.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.counters = {}
+        self.start = perf_counter()
+        self.wall_seconds = None
+        self._lock = threading.Lock()
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def add_count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def stop(self):
+        self.wall_seconds = perf_counter() - self.start
+
+    def report(self):
+        """
+        Profiling results as a JSON-serializable dictionary.
+        """
+
+        wall = self.wall_seconds if self.wall_seconds is not None else perf_counter() - self.start
+        names = [s for s in STAGES if s in self.seconds]
+        names += sorted(s for s in self.seconds if s not in STAGES)
+
+        return {
+            "wall_seconds": wall,
+            "stages": {
+                name: {
+                    "seconds": self.seconds[name],
+                    "calls": self.calls[name],
+                    "share": self.seconds[name] / wall if wall > 0 else 0.0,
+                }
+                for name in names
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=4)
+
+    def print_summary(self, file=sys.stderr):
+        report = self.report()
+        print(f"\nProfile: {report['wall_seconds']:.3f}s wall", file=file)
+        for name, entry in report["stages"].items():
+            print(
+                f"  {name:<10} {entry['seconds']:9.3f}s  {entry['share'] * 100:6.1f}%  "
+                f"{entry['calls']} calls",
+                file=file,
+            )
+        for name, value in report["counters"].items():
+            print(f"  {name:<10} {value}", file=file)
+
+
+# --------------------------------------------------
+# Function-level capture
+# --------------------------------------------------
+
+def _start_capture(capture_path):
+    if capture_path is None:
+        return None
+
+    if str(capture_path).endswith(".html"):
+        try:
+            from pyinstrument import Profiler as SamplingProfiler
+        except ImportError:
+            raise ImportError("HTML capture requires pyinstrument: pip install pyinstrument")
+        sampler = SamplingProfiler()
+        sampler.start()
+        return sampler
+
+    import cProfile
+
+    capture = cProfile.Profile()
+    capture.enable()
+    return capture
+
+
+def _stop_capture(capture, capture_path):
+    if capture is None:
+        return
+
+    if str(capture_path).endswith(".html"):
+        capture.stop()
+        with open(capture_path, "w") as f:
+            f.write(capture.output_html())
+        return
+
+    capture.disable()
+    capture.dump_stats(str(capture_path))
+
+
+@contextmanager
+def profiling(report_path=None, capture_path=None, summary=True, profiler=None):
+    """
+    Enable stage timers for the duration of a block.
+
+    Args:
+        report_path (str, optional): Write the JSON report here
+        capture_path (str, optional): Also capture a function-level profile:
+                                      .html uses pyinstrument, anything else
+                                      writes cProfile stats (view with
+                                      `python -m pstats` or snakeviz)
+        summary (bool): Print the stage table to stderr at the end
+        profiler (Profiler, optional): Use this (e.g. a subclass that reports
+                                       progress) instead of a new Profiler
+
+    Yields:
+        Profiler: The active profiler
+    """
+
+    global _active
+
+    profiler = Profiler() if profiler is None else profiler
+    previous, _active = _active, profiler
+    capture = _start_capture(capture_path)
+
+    try:
+        yield profiler
+    finally:
+        _stop_capture(capture, capture_path)
+        _active = previous
+        profiler.stop()
+
+        if report_path is not None:
+            profiler.dump(report_path)
+        if summary:
+            profiler.print_summary()
+
+
+# --------------------------------------------------
+# Command Line
+# --------------------------------------------------
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Run a converter script with per-stage profiling"
+    )
+    parser.add_argument("--report", default="profile.json", help="JSON report path.")
+    parser.add_argument("--capture", default=None,
+                        help="Also write a cProfile (.prof) or pyinstrument (.html) capture.")
+    parser.add_argument("script", help="Converter script, e.g. COCO-to-Yolo-format/converter.py")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the script.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    # Converters import annotation_toolkit.profiling, not this __main__ module
+    from annotation_toolkit.profiling import profiling as converter_profiling
+
+    report_path = Path(opt.report).resolve()
+    capture_path = Path(opt.capture).resolve() if opt.capture else None
+    script = Path(opt.script).resolve()
+
+    # The converters use paths relative to their own directory
+    os.chdir(script.parent)
+    sys.path.insert(0, str(script.parent))
+    sys.argv = [str(script)] + opt.args
+
+    with converter_profiling(report_path, capture_path):
+        runpy.run_path(str(script), run_name="__main__")
+
+    print(f"Saved profile report to: {report_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(get_args())
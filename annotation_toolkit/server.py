@@ -0,0 +1,527 @@
+from collections import deque
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+
+from annotation_toolkit.profiling import Profiler, profiling
+
+"""
+server.py
+
+Local conversion server with a pool of warm worker processes.
+
+Every worker imports all converters once at startup (OpenCV, NumPy, the
+class and color tables), so a job only pays for its own work. Jobs run
+the converters' own command lines (get_args / main), so per-job options
+are exactly the converter CLI options.
+
+HTTP API (JSON, bound to 127.0.0.1 by default):
+
+    POST   /jobs        {"converter": "coco2yolo", "args": ["--json-dir", "..."]}
+                        or {"converter": ..., "options": {"json_dir": "..."}}
+    GET    /jobs        all jobs
+    GET    /jobs/<id>   status, progress, result / error
+    DELETE /jobs/<id>   cancel a queued or running job
+    GET    /health      worker count and queue length
+
+Progress comes from the converters' profiling counters (images, files,
+masks); a running job is cancelled at its next counter update. Files the
+converter already wrote are kept: the output of a cancelled job is
+incomplete and should be deleted or rewritten by a new job. Only the last
+MAX_FINISHED_JOBS finished jobs are remembered. The process pool and HTTP
+modules are imported only by `serve`, so the client commands start quickly.
+
+Usage:
+    python -m annotation_toolkit server serve --workers 4
+    python -m annotation_toolkit server submit --wait coco2yolo -- --json-dir DIR --img-dir DIR --output DIR
+    python -m annotation_toolkit server status 1
+    python -m annotation_toolkit server cancel 1
+"""
+
+CONVERTERS = ("coco2yolo", "yolo2coco", "poly2rect", "seg2yolo")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Counters that mark one processed item per converter
+PROGRESS_COUNTERS = ("images", "files", "masks")
+
+# Seconds between progress updates sent from a worker
+PROGRESS_INTERVAL = 0.2
+
+# Characters of captured converter output kept per job
+LOG_TAIL = 4000
+
+# Finished jobs kept for status queries; older ones are forgotten
+MAX_FINISHED_JOBS = 1000
+
+# Per-job keys of the shared (Manager) dict
+SHARED_KEYS = ("progress", "cancel", "started")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# --------------------------------------------------
+# Worker side
+# --------------------------------------------------
+
+# Shared job state (Manager dict) of this worker process
+_shared = None
+
+
+def _ignore_interrupt():
+    # Ctrl+C reaches the whole process group; the server shuts workers down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _init_worker(shared):
+    """
+    Warm a worker: import every converter and build its tables once.
+    """
+
+    global _shared
+    _shared = shared
+    _ignore_interrupt()
+
+    from annotation_toolkit.modules import load_converter
+
+    for name in CONVERTERS:
+        load_converter(name)
+
+
+class JobProgress(Profiler):
+    """
+    Profiler that publishes item counts and checks for cancellation.
+    """
+
+    def __init__(self, job_id):
+        super().__init__()
+        self.job_id = job_id
+        self.items = 0
+        self._last_update = 0.0
+
+    def add_count(self, name, n=1):
+        super().add_count(name, n)
+        if name not in PROGRESS_COUNTERS:
+            return
+
+        self.items += n
+        now = time.perf_counter()
+        if now - self._last_update >= PROGRESS_INTERVAL:
+            self._last_update = now
+            _shared[f"{self.job_id}:progress"] = self.items
+            if _shared.get(f"{self.job_id}:cancel"):
+                raise JobCancelled(f"Job {self.job_id} cancelled")
+
+
+def _run_job(job_id, converter, argv):
+    """
+    Run one converter command line in a warm worker.
+    """
+
+    from annotation_toolkit.modules import load_converter
+
+    if _shared.get(f"{job_id}:cancel"):
+        raise JobCancelled(f"Job {job_id} cancelled")
+    _shared[f"{job_id}:started"] = time.time()
+
+    module = load_converter(converter)
+    # argparse shows "annotation_toolkit <converter>" in usage errors
+    sys.argv[0] = f"annotation_toolkit {converter}"
+    progress = JobProgress(job_id)
+    log = io.StringIO()
+
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            opt = module.get_args(argv)
+        except SystemExit:
+            raise ValueError(f"Invalid arguments for {converter}: {log.getvalue().strip()}")
+
+        with profiling(summary=False, profiler=progress):
+            module.main(opt)
+
+    _shared[f"{job_id}:progress"] = progress.items
+    report = progress.report()
+
+    return {
+        "items": progress.items,
+        "seconds": report["wall_seconds"],
+        "stages": report["stages"],
+        "counters": report["counters"],
+        "log": log.getvalue()[-LOG_TAIL:],
+    }
+
+
+# --------------------------------------------------
+# Server side
+# --------------------------------------------------
+
+def options_to_argv(options):
+    """
+    Turn {"json_dir": "x", "box2seg": True} into ["--json-dir", "x", "--box2seg"].
+    """
+
+    argv = []
+    for key, value in options.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, (list, tuple)):
+            argv += [flag] + [str(v) for v in value]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+class ConversionServer:
+    """
+    Job queue on top of a warm process pool.
+    """
+
+    def __init__(self, workers=4, max_finished=MAX_FINISHED_JOBS):
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing.managers import SyncManager
+
+        if max_finished < 1:
+            raise ValueError(f"max_finished must be at least 1, got {max_finished}")
+
+        context = multiprocessing.get_context("spawn")
+        self._manager = SyncManager(ctx=context)
+        self._manager.start(_ignore_interrupt)
+        self._shared = self._manager.dict()
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._shared,),
+        )
+        self.workers = workers
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._finished = deque()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, converter, argv=()):
+        """
+        Queue a job.
+
+        Returns:
+            int: Job id
+        """
+
+        if converter not in CONVERTERS:
+            raise ValueError(f"Unknown converter: {converter} (choose from {', '.join(CONVERTERS)})")
+
+        job_id = next(self._ids)
+        job = {
+            "id": job_id,
+            "converter": converter,
+            "args": list(argv),
+            "status": "queued",
+            "progress": 0,
+            "submitted": time.time(),
+            "result": None,
+            "error": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+
+        future = self._pool.submit(_run_job, job_id, converter, list(argv))
+        job["future"] = future
+        future.add_done_callback(lambda f, job=job: self._finish(job, f))
+        return job_id
+
+    def _finish(self, job, future):
+        from concurrent.futures import CancelledError
+
+        job_id = job["id"]
+        started = f"{job_id}:started" in self._shared
+        progress = self._shared.get(f"{job_id}:progress", 0)
+
+        with self._lock:
+            job["finished"] = time.time()
+            job["progress"] = progress
+            try:
+                job["result"] = future.result()
+                job["status"] = "done"
+            except (CancelledError, JobCancelled):
+                job["status"] = "cancelled"
+                if started:
+                    job["error"] = f"Cancelled after {progress} items; the files written so far were kept"
+            except Exception as exc:
+                job["status"] = "failed"
+                job["error"] = f"{type(exc).__name__}: {exc}"
+
+            # The job state now lives in self._jobs only
+            for key in SHARED_KEYS:
+                self._shared.pop(f"{job_id}:{key}", None)
+
+            # Forget the oldest finished jobs
+            self._finished.append(job_id)
+            while len(self._finished) > self.max_finished:
+                self._jobs.pop(self._finished.popleft(), None)
+
+    def status(self, job_id):
+        """
+        Job state as a JSON-serializable dictionary.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            info = {k: v for k, v in job.items() if k != "future"}
+
+        if info["status"] == "queued":
+            if f"{job_id}:started" in self._shared:
+                info["status"] = "running"
+            if self._shared.get(f"{job_id}:cancel"):
+                info["status"] = "cancelling"
+            info["progress"] = self._shared.get(f"{job_id}:progress", 0)
+        return info
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.status(job_id) for job_id in job_ids]
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: queued jobs are dropped, running jobs stop at
+        their next progress update. Output files a running job already
+        wrote are not removed.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            # Under the lock, so _finish() cannot have cleared the shared keys yet
+            active = job["status"] == "queued"
+            if active:
+                self._shared[f"{job_id}:cancel"] = True
+
+        # Outside the lock: a dropped job runs _finish() right here
+        if active:
+            job["future"].cancel()
+        return self.status(job_id)
+
+    def health(self):
+        states = [job["status"] for job in self.list()]
+        return {
+            "workers": self.workers,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "jobs": len(states),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
+
+
+def make_handler(server):
+    """
+    HTTP request handler bound to a ConversionServer.
+    """
+
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_id(self):
+            try:
+                return int(self.path.rstrip("/").rsplit("/", 1)[1])
+            except ValueError:
+                return None
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, server.health())
+            elif self.path.rstrip("/") == "/jobs":
+                self._send(200, server.list())
+            elif self.path.startswith("/jobs/") and self._job_id() is not None:
+                try:
+                    self._send(200, server.status(self._job_id()))
+                except KeyError:
+                    self._send(404, {"error": "unknown job"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path.rstrip("/") != "/jobs":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                argv = request.get("args") or options_to_argv(request.get("options", {}))
+                job_id = server.submit(request.get("converter"), argv)
+            except (ValueError, TypeError, AttributeError) as exc:
+                self._send(400, {"error": str(exc)})
+                return
+            self._send(202, {"id": job_id})
+
+        def do_DELETE(self):
+            if not self.path.startswith("/jobs/") or self._job_id() is None:
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                self._send(200, server.cancel(self._job_id()))
+            except KeyError:
+                self._send(404, {"error": "unknown job"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, max_finished=MAX_FINISHED_JOBS):
+    """
+    Run the HTTP server until interrupted.
+    """
+
+    from http.server import ThreadingHTTPServer
+
+    server = ConversionServer(workers, max_finished)
+    httpd = ThreadingHTTPServer((host, port), make_handler(server))
+    print(f"Conversion server on http://{host}:{port} with {workers} warm workers")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        server.shutdown()
+
+
+# --------------------------------------------------
+# Client
+# --------------------------------------------------
+
+class ConversionClient:
+    """
+    Minimal client for the HTTP API.
+    """
+
+    def __init__(self, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"):
+        self.url = url.rstrip("/")
+
+    def _request(self, method, path, payload=None):
+        import urllib.error
+        import urllib.request
+
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(
+            self.url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            raise RuntimeError(json.loads(exc.read()).get("error", str(exc)))
+
+    def submit(self, converter, args=None, options=None):
+        payload = {"converter": converter, "args": list(args or []), "options": options or {}}
+        return self._request("POST", "/jobs", payload)["id"]
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def jobs(self):
+        return self._request("GET", "/jobs")
+
+    def cancel(self, job_id):
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def wait(self, job_id, poll=0.2, timeout=None):
+        """
+        Poll until the job is done, failed or cancelled.
+        """
+
+        start = time.time()
+        while True:
+            info = self.status(job_id)
+            if info["status"] in ("done", "failed", "cancelled"):
+                return info
+            if timeout is not None and time.time() - start > timeout:
+                raise TimeoutError(f"Job {job_id} still {info['status']}")
+            time.sleep(poll)
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Local conversion server with warm workers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start the server")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--workers", type=int, default=4)
+    serve_parser.add_argument("--keep-jobs", type=int, default=MAX_FINISHED_JOBS,
+                              help="Finished jobs kept for status queries.")
+
+    url = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+    submit = subparsers.add_parser("submit", help="Submit a conversion job")
+    submit.add_argument("--url", default=url)
+    submit.add_argument("--wait", action="store_true", help="Wait and print the result.")
+    submit.add_argument("converter", choices=CONVERTERS)
+    submit.add_argument("args", nargs=argparse.REMAINDER, help="Converter options (after --).")
+
+    for name, help_text in (("status", "Show a job"), ("cancel", "Cancel a job")):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("--url", default=url)
+        command.add_argument("job_id", type=int)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "serve":
+        serve(opt.host, opt.port, opt.workers, opt.keep_jobs)
+        return
+
+    client = ConversionClient(opt.url)
+    if opt.command == "submit":
+        args = opt.args[1:] if opt.args[:1] == ["--"] else opt.args
+        job_id = client.submit(opt.converter, args)
+        info = client.wait(job_id) if opt.wait else client.status(job_id)
+    elif opt.command == "status":
+        info = client.status(opt.job_id)
+    else:
+        info = client.cancel(opt.job_id)
+
+    json.dump(info, sys.stdout, indent=4)
+    print()
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,332 @@
+from pathlib import Path
+import argparse
+import glob
+import io
+import posixpath
+import stat
+import tarfile
+import zipfile
+
+"""
+shards.py
+
+WebDataset-style tar / zip shards for small-file-heavy datasets.
+
+A shard is a plain .tar (optionally compressed) or .zip archive. Files
+that belong to one sample share a key and are stored next to each other:
+
+    000123.jpg
+    000123.txt
+    000124.jpg
+    000124.txt
+
+The key is the directory of a member plus its base name up to the first
+".", the rest is the extension ("train/000123.jpg" -> key "train/000123",
+extension "jpg"). This is the WebDataset rule, so dots inside file names
+end up in the extension: "img.v2.jpg" is key "img" with extension "v2.jpg"
+and is not recognized as an image. Rename such files before packing.
+
+Only regular files are read; directories, symlinks and devices are
+skipped. unpack_shards() refuses members that would land outside the
+output directory (absolute paths, "..").
+
+Shards are read member by member in archive order, without extracting
+anything, and written sequentially with a fixed number of samples per
+shard. Millions of tiny label files become a few large sequential reads
+and writes.
+"""
+
+SHARD_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+
+DEFAULT_MAX_COUNT = 10000  # samples per output shard
+
+
+def is_shard(path):
+    """
+    True for tar / zip archive paths.
+    """
+    return str(path).lower().endswith(SHARD_SUFFIXES)
+
+
+def expand_shards(spec):
+    """
+    Resolve a shard specification into a sorted list of shard paths.
+
+    Args:
+        spec (str | Path | list): Shard file, directory of shards,
+                                  glob pattern or list of those
+
+    Returns:
+        list[Path]: Shard paths
+    """
+
+    if isinstance(spec, (list, tuple)):
+        return [shard for item in spec for shard in expand_shards(item)]
+
+    path = Path(spec)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if is_shard(p))
+    if path.exists():
+        return [path]
+
+    shards = sorted(Path(p) for p in glob.glob(str(spec)) if is_shard(p))
+    if not shards:
+        raise FileNotFoundError(f"No shards found: {spec}")
+    return shards
+
+
+def split_key(name):
+    """
+    Split a member name into (key, extension) WebDataset style.
+
+    The key is the directory plus the base name up to its first ".":
+    "a/img.v2.jpg" -> ("a/img", "v2.jpg").
+    """
+    directory, base = posixpath.split(name)
+    stem, _, extension = base.partition(".")
+    return posixpath.join(directory, stem), extension.lower()
+
+
+# --------------------------------------------------
+# Reading
+# --------------------------------------------------
+
+def iter_members(shard, extensions=None):
+    """
+    Stream the files of one shard in archive order.
+
+    Args:
+        shard (str | Path): .tar / .tar.gz / .tgz / .zip file
+        extensions (set[str], optional): Only read members with these
+                                         extensions; others are skipped unread
+
+    Yields:
+        tuple: (member name, bytes)
+    """
+
+    shard = str(shard)
+
+    if shard.lower().endswith(".zip"):
+        with zipfile.ZipFile(shard, "r") as archive:
+            for info in archive.infolist():
+                # Unix file type bits; 0 for archives written without them
+                file_type = stat.S_IFMT(info.external_attr >> 16)
+                if info.is_dir() or file_type not in (0, stat.S_IFREG):
+                    continue
+                if extensions is not None and split_key(info.filename)[1] not in extensions:
+                    continue
+                yield info.filename, archive.read(info)
+        return
+
+    # "r|*": pure streaming, no seeking, transparent decompression
+    with tarfile.open(shard, "r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            if extensions is not None and split_key(member.name)[1] not in extensions:
+                continue
+            yield member.name, archive.extractfile(member).read()
+
+
+def iter_samples(shards, extensions=None):
+    """
+    Group consecutive shard members into samples.
+
+    Args:
+        shards (str | Path | list): Shard specification (see expand_shards)
+        extensions (set[str], optional): Only load these extensions
+
+    Yields:
+        tuple: (key, {extension: bytes})
+    """
+
+    extensions = None if extensions is None else {e.lstrip(".").lower() for e in extensions}
+
+    for shard in expand_shards(shards):
+        key, sample = None, {}
+        for name, data in iter_members(shard, extensions):
+            member_key, extension = split_key(name)
+            if member_key != key and sample:
+                yield key, sample
+                sample = {}
+            key = member_key
+            sample[extension] = data
+
+        if sample:
+            yield key, sample
+
+
+def decode_text(data):
+    """
+    Decode a text member; None stays None.
+    """
+    return None if data is None else data.decode("utf-8")
+
+
+# --------------------------------------------------
+# Writing
+# --------------------------------------------------
+
+class ShardWriter:
+    """
+    Write samples into numbered shards, starting a new shard every
+    max_count samples.
+
+    Example:
+        with ShardWriter("labels/train-%06d.tar") as writer:
+            writer.write("000123", {"txt": "0 0.5 0.5 0.1 0.1"})
+    """
+
+    def __init__(self, pattern, max_count=DEFAULT_MAX_COUNT):
+        if "%" not in pattern:
+            stem, dot, suffix = Path(pattern).name.partition(".")
+            pattern = str(Path(pattern).with_name(f"{stem}-%06d{dot}{suffix}"))
+        if not is_shard(pattern):
+            raise ValueError(f"Shard pattern must end with one of {SHARD_SUFFIXES}: {pattern}")
+
+        self.pattern = pattern
+        self.max_count = max_count
+        self.shards = []
+        self.count = 0
+        self._archive = None
+
+    def _open_next(self):
+        self.close()
+        path = Path(self.pattern % len(self.shards))
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if path.suffix.lower() == ".zip":
+            self._archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        else:
+            mode = "w:gz" if str(path).lower().endswith((".tar.gz", ".tgz")) else "w"
+            self._archive = tarfile.open(path, mode)
+
+        self.shards.append(path)
+        self.count = 0
+
+    def write(self, key, sample):
+        """
+        Append one sample.
+
+        Args:
+            key (str): Sample key (file name without extension)
+            sample (dict): {extension: bytes | str}
+        """
+
+        if self._archive is None or self.count >= self.max_count:
+            self._open_next()
+
+        for extension, data in sample.items():
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            name = f"{key}.{extension}"
+
+            if isinstance(self._archive, zipfile.ZipFile):
+                # Fixed timestamp keeps shards reproducible
+                self._archive.writestr(zipfile.ZipInfo(name, (1980, 1, 1, 0, 0, 0)), data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = 0o644
+                self._archive.addfile(info, io.BytesIO(data))
+
+        self.count += 1
+
+    def close(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------------------------------------------
+# Packing loose files
+# --------------------------------------------------
+
+def pack_directory(src_dir, pattern, extensions=None, max_count=DEFAULT_MAX_COUNT):
+    """
+    Pack a directory of loose files into shards (files grouped by key).
+
+    Returns:
+        list[Path]: Written shards
+    """
+
+    src_dir = Path(src_dir)
+    extensions = None if extensions is None else {e.lstrip(".").lower() for e in extensions}
+
+    samples = {}
+    for path in sorted(p for p in src_dir.rglob("*") if p.is_file()):
+        key, extension = split_key(path.relative_to(src_dir).as_posix())
+        if extensions is None or extension in extensions:
+            samples.setdefault(key, []).append((extension, path))
+
+    with ShardWriter(pattern, max_count) as writer:
+        for key, files in samples.items():
+            writer.write(key, {extension: path.read_bytes() for extension, path in files})
+
+    return writer.shards
+
+
+def unpack_shards(shards, output_dir, extensions=None):
+    """
+    Extract shards into loose files. Members that would be written
+    outside output_dir raise ValueError.
+
+    Returns:
+        int: Number of samples written
+    """
+
+    output_dir = Path(output_dir).resolve()
+    count = 0
+    for key, sample in iter_samples(shards, extensions):
+        for extension, data in sample.items():
+            path = (output_dir / f"{key}.{extension}").resolve()
+            if output_dir not in path.parents:
+                raise ValueError(f"Shard member escapes the output directory: {key}.{extension}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        count += 1
+    return count
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Pack loose dataset files into tar / zip shards or unpack them"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack = subparsers.add_parser("pack", help="Pack a directory into shards")
+    pack.add_argument("--src", required=True, help="Directory with images / labels.")
+    pack.add_argument("--out", required=True, help="Shard pattern, e.g. shards/train-%%06d.tar")
+    pack.add_argument("--ext", nargs="*", default=None, help="Only pack these extensions.")
+    pack.add_argument("--max-count", type=int, default=DEFAULT_MAX_COUNT, help="Samples per shard.")
+
+    unpack = subparsers.add_parser("unpack", help="Extract shards into a directory")
+    unpack.add_argument("--shards", required=True, help="Shard file, directory or glob pattern.")
+    unpack.add_argument("--out", required=True, help="Output directory.")
+    unpack.add_argument("--ext", nargs="*", default=None, help="Only extract these extensions.")
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "pack":
+        shards = pack_directory(opt.src, opt.out, opt.ext, opt.max_count)
+        print(f"Wrote {len(shards)} shards")
+        return
+
+    count = unpack_shards(opt.shards, opt.out, opt.ext)
+    print(f"Extracted {count} samples to: {opt.out}")
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,346 @@
+from pathlib import Path
+import argparse
+import json
+
+import numpy as np
+
+from annotation_toolkit.cache import cache_key, cache_matches
+
+"""
+spatial_index.py
+
+Persistent per-image uniform-grid index over COCO annotations for region
+and crop queries ("all boxes of class c intersecting window W in image I").
+
+The index is a directory of plain .npy arrays stored next to the dataset
+(default: <annotations>.index/). Queries memory-map the arrays, so the COCO
+JSON never has to be loaded again.
+
+Layout:
+- image_ids.npy      (I,)   sorted image ids
+- image_sizes.npy    (I, 2) width, height
+- boxes.npy          (N, 4) corner boxes in pixels, grouped by image
+- ann_ids.npy        (N,)   annotation id per box
+- category_ids.npy   (N,)   category id per box
+- box_offsets.npy    (I + 1,) boxes of image i are box_offsets[i]:box_offsets[i + 1]
+- cell_offsets.npy   (I * G * G + 1,) CSR offsets of every grid cell
+- cell_entries.npy   (E,)   box indices stored in the cells
+- meta.json          grid size, counts and the source key (JSON path,
+                     mtime and size); written last, so a partial build
+                     is never loaded
+
+Every image is split into G x G cells; a box is stored in every cell it
+touches. Cells of one grid row are contiguous, so a window query reads
+one slice per row and then filters the candidates exactly.
+
+An index whose source JSON changed since the build is stale:
+load_spatial_index() rebuilds it, SpatialIndex() refuses to open it.
+"""
+
+DEFAULT_GRID_CELLS = 16
+
+INDEX_ARRAYS = (
+    "image_ids",
+    "image_sizes",
+    "boxes",
+    "ann_ids",
+    "category_ids",
+    "box_offsets",
+    "cell_offsets",
+    "cell_entries",
+)
+
+
+def default_index_dir(json_file):
+    """
+    Index directory stored next to the annotation file.
+    """
+    json_file = Path(json_file)
+    return json_file.with_name(json_file.name + ".index")
+
+
+def index_key(json_file, grid_cells=DEFAULT_GRID_CELLS):
+    """
+    cache_key() of the annotation file an index is built from.
+    """
+    json_file = Path(json_file).resolve()
+    return cache_key(json_file, [json_file], {"grid_cells": grid_cells})
+
+
+def index_is_stale(meta):
+    """
+    True when the source JSON recorded in meta.json changed since the build.
+
+    Indexes without a key, or whose source is gone (e.g. the index was
+    copied without the JSON), cannot be checked and are not stale.
+    """
+
+    key = meta.get("key")
+    if key is None or not Path(key["input"]).exists():
+        return False
+    return index_key(key["input"], meta["grid_cells"]) != key
+
+
+def _cell_range(lo, hi, size, grid_cells):
+    """
+    First and last grid cell covered by [lo, hi] along one axis.
+    """
+    cell = size / grid_cells
+    first = np.clip(np.floor(lo / cell), 0, grid_cells - 1).astype(np.int64)
+    last = np.clip(np.floor(hi / cell), 0, grid_cells - 1).astype(np.int64)
+    return first, last
+
+
+def build_spatial_index(coco, index_dir, grid_cells=DEFAULT_GRID_CELLS, key=None):
+    """
+    Build and save a grid index from a parsed COCO dictionary.
+
+    Args:
+        coco (dict): Parsed COCO annotations (e.g. read_json() of the
+                     COCO-to-Yolo converter or main.py's coco_format)
+        index_dir (str | Path): Output directory
+        grid_cells (int): Grid cells per image side
+        key (dict, optional): index_key() of the source JSON
+
+    Returns:
+        Path: The index directory
+    """
+
+    images = sorted(coco.get("images", []), key=lambda img: img["id"])
+    empty = [img["id"] for img in images if not (img["width"] > 0 and img["height"] > 0)]
+    if empty:
+        # The grid divides by the image size
+        raise ValueError(f"Images without a positive width / height: {empty[:10]}")
+
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    (index_dir / "meta.json").unlink(missing_ok=True)
+
+    annotations = coco.get("annotations", [])
+
+    image_ids = np.array([img["id"] for img in images], dtype=np.int64)
+    image_sizes = np.array([[img["width"], img["height"]] for img in images], dtype=np.float64).reshape(-1, 2)
+
+    ann_image = np.array([a["image_id"] for a in annotations], dtype=np.int64)
+    bbox = np.array([a["bbox"] for a in annotations], dtype=np.float64).reshape(-1, 4)
+
+    # Keep annotations of known images, grouped by image
+    pos = np.searchsorted(image_ids, ann_image)
+    pos_clipped = np.clip(pos, 0, max(len(image_ids) - 1, 0))
+    known = (image_ids[pos_clipped] == ann_image) if len(image_ids) else np.zeros(len(ann_image), bool)
+    order = np.flatnonzero(known)[np.argsort(pos[known], kind="stable")]
+
+    image_pos = pos[order]
+    boxes = np.concatenate([bbox[order, :2], bbox[order, :2] + bbox[order, 2:]], axis=1)
+    ann_ids = np.array([annotations[i].get("id", i) for i in order], dtype=np.int64)
+    category_ids = np.array([annotations[i]["category_id"] for i in order], dtype=np.int64)
+    box_offsets = np.searchsorted(image_pos, np.arange(len(image_ids) + 1))
+
+    # Cells touched by every box
+    widths = image_sizes[image_pos, 0]
+    heights = image_sizes[image_pos, 1]
+    col0, col1 = _cell_range(boxes[:, 0], boxes[:, 2], widths, grid_cells)
+    row0, row1 = _cell_range(boxes[:, 1], boxes[:, 3], heights, grid_cells)
+
+    num_cols = col1 - col0 + 1
+    num_rows = row1 - row0 + 1
+    per_box = num_cols * num_rows
+
+    box_index = np.repeat(np.arange(len(boxes)), per_box)
+    local = np.arange(int(per_box.sum())) - np.repeat(np.cumsum(per_box) - per_box, per_box)
+    rows = np.repeat(row0, per_box) + local // np.repeat(num_cols, per_box)
+    cols = np.repeat(col0, per_box) + local % np.repeat(num_cols, per_box)
+    cells = (image_pos[box_index] * grid_cells + rows) * grid_cells + cols
+
+    cell_order = np.argsort(cells, kind="stable")
+    cell_entries = box_index[cell_order]
+    cell_offsets = np.searchsorted(cells[cell_order], np.arange(len(image_ids) * grid_cells ** 2 + 1))
+
+    arrays = {
+        "image_ids": image_ids,
+        "image_sizes": image_sizes,
+        "boxes": boxes,
+        "ann_ids": ann_ids,
+        "category_ids": category_ids,
+        "box_offsets": box_offsets.astype(np.int64),
+        "cell_offsets": cell_offsets.astype(np.int64),
+        "cell_entries": cell_entries.astype(np.int64),
+    }
+    for name, array in arrays.items():
+        np.save(index_dir / f"{name}.npy", array)
+
+    meta = {
+        "grid_cells": grid_cells,
+        "images": len(image_ids),
+        "boxes": len(boxes),
+        "entries": len(cell_entries),
+        "key": key,
+    }
+    with open(index_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=4)
+
+    return index_dir
+
+
+def load_spatial_index(json_file, index_dir=None, grid_cells=DEFAULT_GRID_CELLS):
+    """
+    Open the index of a COCO JSON file, (re)building it when missing or stale.
+
+    Args:
+        json_file (str | Path): COCO annotation file
+        index_dir (str | Path, optional): Index directory
+                                          (default: <json>.index)
+        grid_cells (int): Grid cells per image side
+
+    Returns:
+        SpatialIndex: The opened index
+    """
+
+    index_dir = index_dir or default_index_dir(json_file)
+    key = index_key(json_file, grid_cells)
+    if not cache_matches(index_dir, key):
+        from annotation_toolkit.modules import load_converter
+
+        coco = load_converter("coco2yolo").read_json(json_file)
+        build_spatial_index(coco, index_dir, grid_cells, key)
+
+    return SpatialIndex(index_dir)
+
+
+class SpatialIndex:
+    """
+    Memory-mapped grid index written by build_spatial_index().
+    """
+
+    def __init__(self, index_dir):
+        index_dir = Path(index_dir)
+        with open(index_dir / "meta.json", "r") as f:
+            self.meta = json.load(f)
+        if index_is_stale(self.meta):
+            raise ValueError(
+                f"Spatial index {index_dir} is older than {self.meta['key']['input']}; "
+                "rebuild it (or query with --json)"
+            )
+
+        self.grid_cells = self.meta["grid_cells"]
+        for name in INDEX_ARRAYS:
+            setattr(self, name, np.load(index_dir / f"{name}.npy", mmap_mode="r"))
+
+    def query(self, image_id, window, category_id=None):
+        """
+        Indices of the boxes of one image that intersect a window.
+
+        Args:
+            image_id (int): COCO image id
+            window (tuple): (x_min, y_min, x_max, y_max) in pixels
+            category_id (int, optional): Only return this category
+
+        Returns:
+            ndarray: Sorted box indices; use boxes / ann_ids / category_ids
+                     to read the matching annotations
+        """
+
+        pos = int(np.searchsorted(self.image_ids, image_id))
+        if pos >= len(self.image_ids) or self.image_ids[pos] != image_id:
+            raise KeyError(f"Image id not in index: {image_id}")
+
+        x1, y1, x2, y2 = window
+        first_box = int(self.box_offsets[pos])
+        num_boxes = int(self.box_offsets[pos + 1]) - first_box
+        if num_boxes == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        width, height = self.image_sizes[pos]
+        g = self.grid_cells
+        col0, col1 = (int(c) for c in _cell_range(x1, x2, width, g))
+        row0, row1 = (int(r) for r in _cell_range(y1, y2, height, g))
+
+        if (row1 - row0 + 1) * (col1 - col0 + 1) >= num_boxes:
+            # Large windows: scanning the image's boxes is cheaper
+            candidates = np.arange(first_box, first_box + num_boxes)
+        else:
+            base = pos * g * g
+            slices = [
+                self.cell_entries[
+                    self.cell_offsets[base + r * g + col0]:self.cell_offsets[base + r * g + col1 + 1]
+                ]
+                for r in range(row0, row1 + 1)
+            ]
+            candidates = np.unique(np.concatenate(slices))
+
+        boxes = self.boxes[candidates]
+        hit = (
+            (boxes[:, 0] <= x2) & (boxes[:, 2] >= x1)
+            & (boxes[:, 1] <= y2) & (boxes[:, 3] >= y1)
+        )
+        if category_id is not None:
+            hit &= self.category_ids[candidates] == category_id
+
+        return candidates[hit]
+
+    def annotations(self, indices):
+        """
+        Annotation ids, category ids and corner boxes for query results.
+        """
+        return (
+            np.asarray(self.ann_ids[indices]),
+            np.asarray(self.category_ids[indices]),
+            np.asarray(self.boxes[indices]),
+        )
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Build or query a spatial index over COCO annotations"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Index a COCO JSON file")
+    build.add_argument("--json", required=True, help="COCO annotation file.")
+    build.add_argument("--out", default=None, help="Index directory (default: <json>.index).")
+    build.add_argument("--grid", type=int, default=DEFAULT_GRID_CELLS, help="Grid cells per image side.")
+
+    query = subparsers.add_parser("query", help="Find boxes intersecting a window")
+    query.add_argument("--index", default=None, help="Index directory (default: <json>.index).")
+    query.add_argument("--json", default=None,
+                       help="COCO annotation file; the index is rebuilt when missing or stale.")
+    query.add_argument("--grid", type=int, default=DEFAULT_GRID_CELLS,
+                       help="Grid cells per image side when rebuilding.")
+    query.add_argument("--image-id", type=int, required=True)
+    query.add_argument("--window", type=float, nargs=4, required=True,
+                       metavar=("X1", "Y1", "X2", "Y2"))
+    query.add_argument("--category", type=int, default=None)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "build":
+        from annotation_toolkit.modules import load_converter
+
+        coco = load_converter("coco2yolo").read_json(opt.json)
+        index_dir = build_spatial_index(
+            coco, opt.out or default_index_dir(opt.json), opt.grid, index_key(opt.json, opt.grid)
+        )
+        print(f"Saved spatial index to: {index_dir}")
+        return
+
+    if opt.json is not None:
+        index = load_spatial_index(opt.json, opt.index, opt.grid)
+    elif opt.index is not None:
+        index = SpatialIndex(opt.index)
+    else:
+        raise SystemExit("query needs --index or --json")
+    ann_ids, category_ids, boxes = index.annotations(
+        index.query(opt.image_id, opt.window, opt.category)
+    )
+    for ann_id, category_id, box in zip(ann_ids, category_ids, boxes):
+        print(f"{ann_id} {category_id} {' '.join(f'{v:g}' for v in box)}")
+
+
+if __name__ == "__main__":
+    main(get_args())
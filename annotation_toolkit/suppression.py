@@ -0,0 +1,175 @@
+import numpy as np
+
+"""
+suppression.py
+
+Near-duplicate box suppression (NMS) and weighted box fusion (WBF).
+
+Both run per image and per class. Candidate pairs are found with a sorted
+sweep: boxes are sorted by x_min, and box j can only overlap box i (i < j)
+while x_min[j] < x_max[i]. Only those pairs get an IoU, so images with
+10k+ sparse boxes never build an N x N matrix. Classes are separated by
+shifting each class to its own x range, so one sweep serves all classes.
+The sweep only sees pairs whose x ranges overlap, which is exactly the set
+with IoU > 0; thresholds must therefore be positive.
+
+Label files have no confidence; without scores, larger boxes win.
+"""
+
+SUPPRESSION_METHODS = ("nms", "wbf")
+
+# Pairs processed per IoU chunk (bounds peak memory on dense images)
+PAIR_CHUNK = 1 << 20
+
+
+def overlap_pairs(boxes, iou_thr, classes=None):
+    """
+    Find all same-class box pairs with IoU >= iou_thr using a sorted sweep.
+
+    Args:
+        boxes (ndarray): (N, 4) corner boxes
+        iou_thr (float): Minimum IoU, in (0, 1]
+        classes (ndarray, optional): (N,) class ids; pairs never cross classes
+
+    Returns:
+        tuple: (first, second, iou) arrays of the overlapping pairs
+    """
+
+    if not 0 < iou_thr <= 1:
+        # Pairs with disjoint x ranges (IoU 0) never reach the IoU test
+        raise ValueError(f"iou_thr must be in (0, 1], got {iou_thr}")
+
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    num_boxes = len(boxes)
+    empty = np.zeros(0, dtype=np.int64)
+    if num_boxes < 2:
+        return empty, empty, np.zeros(0)
+
+    x1 = boxes[:, 0].copy()
+    x2 = boxes[:, 2].copy()
+    if classes is not None:
+        # Move every class into its own, non-overlapping x range
+        _, class_index = np.unique(classes, return_inverse=True)
+        span = max(x2.max(), x1.max()) - min(x1.min(), x2.min()) + 1
+        x1 += class_index * span
+        x2 += class_index * span
+
+    order = np.argsort(x1, kind="stable")
+    x1_sorted = x1[order]
+    ends = np.searchsorted(x1_sorted, x2[order], side="left")
+
+    # For sorted position i, candidates are i + 1 .. ends[i] - 1
+    counts = np.clip(ends - np.arange(num_boxes) - 1, 0, None)
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty, np.zeros(0)
+
+    area = np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+    firsts, seconds, ious = [], [], []
+    starts = np.cumsum(counts) - counts
+    for lo in range(0, total, PAIR_CHUNK):
+        flat = np.arange(lo, min(lo + PAIR_CHUNK, total))
+        pos = np.searchsorted(starts + counts, flat, side="right")
+        partner = pos + 1 + (flat - starts[pos])
+
+        a = order[pos]
+        b = order[partner]
+
+        wh = np.clip(
+            np.minimum(boxes[a, 2:], boxes[b, 2:]) - np.maximum(boxes[a, :2], boxes[b, :2]),
+            0, None,
+        )
+        inter = wh[:, 0] * wh[:, 1]
+        union = area[a] + area[b] - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            iou = np.where(union > 0, inter / union, 0.0)
+
+        hit = iou >= iou_thr
+        firsts.append(a[hit])
+        seconds.append(b[hit])
+        ious.append(iou[hit])
+
+    return np.concatenate(firsts), np.concatenate(seconds), np.concatenate(ious)
+
+
+def _greedy_clusters(num_boxes, scores, first, second):
+    """
+    Greedy NMS over precomputed overlap pairs.
+
+    Returns:
+        ndarray: (N,) index of the box that absorbed each box
+                 (kept boxes point to themselves)
+    """
+
+    # Symmetric adjacency in CSR form
+    src = np.concatenate([first, second])
+    dst = np.concatenate([second, first])
+    order = np.argsort(src, kind="stable")
+    src, dst = src[order], dst[order]
+    offsets = np.searchsorted(src, np.arange(num_boxes + 1))
+
+    leader = np.full(num_boxes, -1, dtype=np.int64)
+    for i in np.argsort(-scores, kind="stable"):
+        if leader[i] != -1:
+            continue
+        leader[i] = i
+
+        neighbors = dst[offsets[i]:offsets[i + 1]]
+        free = neighbors[leader[neighbors] == -1]
+        leader[free] = i
+
+    return leader
+
+
+def suppress_boxes(boxes, classes, scores=None, method="nms", iou_thr=0.7):
+    """
+    Suppress or fuse near-duplicate boxes of one image.
+
+    Args:
+        boxes (ndarray): (N, 4) corner boxes
+        classes (ndarray): (N,) class ids
+        scores (ndarray, optional): (N,) confidences; defaults to box area
+        method (str): "nms" keeps the best box of every cluster,
+                      "wbf" replaces it by the score-weighted mean box
+        iou_thr (float): Boxes overlapping a kept box at least this much
+                         are merged into it; must be in (0, 1]
+
+    Returns:
+        tuple: (boxes, classes, scores, keep) where keep are the indices of
+               the cluster leaders in input order
+    """
+
+    if method not in SUPPRESSION_METHODS:
+        raise ValueError(f"Unknown suppression method: {method}")
+
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    classes = np.asarray(classes)
+    if scores is None:
+        scores = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    scores = np.asarray(scores, dtype=np.float64)
+
+    first, second, _ = overlap_pairs(boxes, iou_thr, classes)
+    leader = _greedy_clusters(len(boxes), scores, first, second)
+    keep = np.flatnonzero(leader == np.arange(len(boxes)))
+
+    if method == "nms":
+        return boxes[keep], classes[keep], scores[keep], keep
+
+    # Weighted box fusion: score-weighted mean over every cluster
+    cluster = np.searchsorted(keep, leader)
+    weights = np.clip(scores, 1e-12, None)
+
+    weight_sum = np.bincount(cluster, weights=weights, minlength=len(keep))
+    fused = np.stack([
+        np.bincount(cluster, weights=boxes[:, k] * weights, minlength=len(keep))
+        for k in range(4)
+    ], axis=1) / weight_sum[:, None]
+    sizes = np.bincount(cluster, minlength=len(keep))
+    fused_scores = np.bincount(cluster, weights=scores, minlength=len(keep)) / sizes
+
+    # Single-box clusters keep their exact coordinates
+    single = sizes == 1
+    fused[single] = boxes[keep[single]]
+
+    return fused, classes[keep], fused_scores, keep
@@ -0,0 +1,230 @@
+from pathlib import Path
+import argparse
+import json
+
+import numpy as np
+
+"""
+synthetic.py
+
+Reproducible synthetic datasets for benchmarking the converters.
+
+Every object is a random star-shaped polygon; all formats are derived
+from the same objects, so one seed gives matching datasets:
+
+    <out>/yolo/       images + YOLO bbox labels  (Yolo-to-COCO-format input)
+    <out>/coco/       COCO JSON with boxes and polygons (COCO-to-Yolo-format input)
+    <out>/polygons/   YOLO-seg polygon labels (Polygon-to-Rectangle-format input)
+    <out>/masks/      RGB masks in COLOR_TO_CLASS colors (Seg-to-Yolo-format input)
+    <out>/meta.json   generator settings
+
+Images are blank: every image of one resolution reuses the same encoded
+file, so generating large datasets is fast and only headers are real.
+
+Usage:
+    python -m annotation_toolkit.synthetic --out bench_data --images 1000 --boxes 20 --vertices 8
+"""
+
+FORMATS = ("yolo", "coco", "polygons", "masks")
+
+
+def random_polygons(rng, num_objects, num_vertices, width, height,
+                    min_size=0.02, max_size=0.2):
+    """
+    Random star-shaped polygons inside the image.
+
+    Args:
+        rng (Generator): NumPy random generator
+        num_objects (int): Number of polygons
+        num_vertices (int): Vertices per polygon
+        width (int): Image width in pixels
+        height (int): Image height in pixels
+        min_size (float): Minimum radius as a fraction of the short image side
+        max_size (float): Maximum radius as a fraction of the short image side
+
+    Returns:
+        ndarray: (num_objects, num_vertices, 2) pixel coordinates
+    """
+
+    short_side = min(width, height)
+    radius = rng.uniform(min_size, max_size, num_objects) * short_side
+
+    centers = np.stack([
+        rng.uniform(radius, width - radius),
+        rng.uniform(radius, height - radius),
+    ], axis=1)
+
+    # Sorted angles with jittered radii keep the polygon simple
+    angles = np.sort(rng.uniform(0, 2 * np.pi, (num_objects, num_vertices)), axis=1)
+    radii = radius[:, None] * rng.uniform(0.5, 1.0, (num_objects, num_vertices))
+
+    points = centers[:, None, :] + radii[..., None] * np.stack(
+        [np.cos(angles), np.sin(angles)], axis=-1
+    )
+    return np.round(points)
+
+
+def _blank_image(width, height, extension):
+    import cv2
+
+    ok, encoded = cv2.imencode(extension, np.zeros((height, width, 3), np.uint8))
+    if not ok:
+        raise ValueError(f"Cannot encode {extension} image")
+    return encoded.tobytes()
+
+
+def generate_dataset(output_dir, num_images=100, boxes_per_image=20, num_vertices=8,
+                     num_classes=4, resolutions=((1920, 1080),), formats=FORMATS, seed=0):
+    """
+    Write a synthetic dataset in the requested formats.
+
+    Args:
+        output_dir (str | Path): Output root
+        num_images (int): Number of images
+        boxes_per_image (int): Objects per image
+        num_vertices (int): Polygon vertices per object
+        num_classes (int): Number of classes (masks use at most the
+                           classes of COLOR_TO_CLASS)
+        resolutions (list[tuple]): (width, height) choices, cycled over images
+        formats (list[str]): Subset of FORMATS
+        seed (int): Random seed
+
+    Returns:
+        dict: Dataset summary (also written to meta.json)
+    """
+
+    import cv2
+
+    from annotation_toolkit.modules import load_converter
+
+    output_dir = Path(output_dir)
+    rng = np.random.default_rng(seed)
+    formats = set(formats)
+
+    for name in formats:
+        (output_dir / name).mkdir(parents=True, exist_ok=True)
+
+    color_to_class = load_converter("seg2yolo").COLOR_TO_CLASS
+    class_colors = {class_id: color for color, class_id in color_to_class.items()}
+
+    blank_jpgs = {size: _blank_image(*size, ".jpg") for size in resolutions}
+
+    coco = {
+        "images": [],
+        "annotations": [],
+        "categories": [
+            {"id": c + 1, "name": str(c), "supercategory": "Defect"} for c in range(num_classes)
+        ],
+    }
+    annotation_id = 1
+
+    for image_id in range(num_images):
+        width, height = resolutions[image_id % len(resolutions)]
+        stem = f"{image_id:08d}"
+        size = np.array([width, height], dtype=np.float64)
+
+        polygons = random_polygons(rng, boxes_per_image, num_vertices, width, height)
+        classes = rng.integers(0, num_classes, boxes_per_image)
+        mins = polygons.min(axis=1)
+        maxs = polygons.max(axis=1)
+
+        if "yolo" in formats:
+            (output_dir / "yolo" / f"{stem}.jpg").write_bytes(blank_jpgs[(width, height)])
+            centers = (mins + maxs) / 2 / size
+            extents = (maxs - mins) / size
+            lines = [
+                f"{c} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}"
+                for c, (cx, cy), (w, h) in zip(classes.tolist(), centers.tolist(), extents.tolist())
+            ]
+            (output_dir / "yolo" / f"{stem}.txt").write_text("\n".join(lines) + "\n")
+
+        if "polygons" in formats:
+            normalized = (polygons / size).reshape(boxes_per_image, -1)
+            lines = [
+                f"{c} " + " ".join(f"{v:.6f}" for v in coords)
+                for c, coords in zip(classes.tolist(), normalized.tolist())
+            ]
+            (output_dir / "polygons" / f"{stem}.txt").write_text("\n".join(lines) + "\n")
+
+        if "coco" in formats:
+            coco["images"].append({
+                "file_name": f"{stem}.jpg",
+                "width": width,
+                "height": height,
+                "id": image_id,
+            })
+            for c, poly, lo, hi in zip(classes.tolist(), polygons, mins.tolist(), maxs.tolist()):
+                w, h = hi[0] - lo[0], hi[1] - lo[1]
+                coco["annotations"].append({
+                    "id": annotation_id,
+                    "image_id": image_id,
+                    "category_id": c + 1,
+                    "bbox": [lo[0], lo[1], w, h],
+                    "area": w * h,
+                    "iscrowd": 0,
+                    "segmentation": [poly.reshape(-1).tolist()],
+                })
+                annotation_id += 1
+
+        if "masks" in formats:
+            mask = np.zeros((height, width, 3), np.uint8)
+            for c, poly in zip(classes.tolist(), polygons.astype(np.int32)):
+                if c in class_colors:
+                    r, g, b = class_colors[c]
+                    cv2.fillPoly(mask, [poly], (b, g, r))  # OpenCV uses BGR
+            cv2.imwrite(str(output_dir / "masks" / f"{stem}.png"), mask)
+
+    if "coco" in formats:
+        with open(output_dir / "coco" / "annotations.json", "w") as f:
+            json.dump(coco, f)
+
+    meta = {
+        "images": num_images,
+        "boxes_per_image": boxes_per_image,
+        "vertices": num_vertices,
+        "classes": num_classes,
+        "resolutions": [list(size) for size in resolutions],
+        "formats": sorted(formats),
+        "seed": seed,
+    }
+    with open(output_dir / "meta.json", "w") as f:
+        json.dump(meta, f, indent=4)
+
+    return meta
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--out", required=True, help="Output directory.")
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--boxes", type=int, default=20, help="Objects per image.")
+    parser.add_argument("--vertices", type=int, default=8, help="Polygon vertices per object.")
+    parser.add_argument("--classes", type=int, default=4)
+    parser.add_argument("--resolution", type=int, nargs=2, action="append", default=None,
+                        metavar=("WIDTH", "HEIGHT"), help="Image size; repeat for mixed sizes.")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    meta = generate_dataset(
+        opt.out,
+        num_images=opt.images,
+        boxes_per_image=opt.boxes,
+        num_vertices=opt.vertices,
+        num_classes=opt.classes,
+        resolutions=[tuple(r) for r in opt.resolution] if opt.resolution else ((1920, 1080),),
+        formats=opt.formats,
+        seed=opt.seed,
+    )
+    print(f"Generated {meta['images']} images ({', '.join(meta['formats'])}) in: {opt.out}")
+
+
+if __name__ == "__main__":
+    main(get_args())
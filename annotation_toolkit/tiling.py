@@ -0,0 +1,502 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import json
+
+import numpy as np
+
+from annotation_toolkit.boxes import cxcywh_to_xyxy, xyxy_to_cxcywh
+from annotation_toolkit.validate import find_images, get_yolo_label_path, parse_yolo_text
+
+"""
+tiling.py
+
+Slices high-resolution images into overlapping tiles and re-projects
+their YOLO labels (boxes and polygons) into every tile.
+
+Per tile:
+- Boxes are clipped to the tile window and renormalized
+- Polygons are clipped to the tile window (Sutherland-Hodgman)
+- Clipped objects go through the MIN_BOX_SIZE_PX filter of
+  Polygon-to-Rectangle-format/converter.py and an optional
+  minimum visible fraction
+
+Every run writes tiles.json, mapping each tile to its source image and
+pixel window, so tile-level predictions can be stitched back with
+stitch_predictions().
+
+Output layout:
+    <out>/images/<name>_<x>_<y>.<ext>
+    <out>/labels/<name>_<x>_<y>.txt
+    <out>/tiles.json
+
+<name> is the image path relative to --images without its extension,
+with "/" replaced by "__" ("sub/img.jpg" -> "sub__img"), so images with
+the same file name in different folders get different tiles. Images that
+would still share a name (e.g. img.jpg and img.png) are rejected.
+
+Usage:
+    python -m annotation_toolkit.tiling slice --images DIR --out DIR --tile 640 --overlap 0.2
+    python -m annotation_toolkit.tiling stitch --tiles DIR/tiles.json --pred DIR --out DIR
+"""
+
+DEFAULT_TILE_SIZE = 640
+DEFAULT_OVERLAP = 0.2
+
+# Replaces "/" of the relative image path in tile names
+TILE_NAME_SEPARATOR = "__"
+
+
+# --------------------------------------------------
+# Tile Geometry
+# --------------------------------------------------
+
+def tile_starts(size, tile_size, overlap):
+    """
+    Start offsets of overlapping tiles along one axis.
+
+    The last tile is aligned with the image border, so every pixel is
+    covered and all tiles have the full tile size (unless the image is
+    smaller than one tile).
+    """
+
+    if size <= tile_size:
+        return [0]
+
+    step = max(1, int(round(tile_size * (1 - overlap))))
+    starts = list(range(0, size - tile_size + 1, step))
+    if starts[-1] != size - tile_size:
+        starts.append(size - tile_size)
+    return starts
+
+
+def tile_windows(width, height, tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_OVERLAP):
+    """
+    Pixel windows (x, y, w, h) of all tiles of an image.
+    """
+    return [
+        (x, y, min(tile_size, width), min(tile_size, height))
+        for y in tile_starts(height, tile_size, overlap)
+        for x in tile_starts(width, tile_size, overlap)
+    ]
+
+
+def clip_polygon(points, x_min, y_min, x_max, y_max):
+    """
+    Clip a polygon to an axis-aligned rectangle (Sutherland-Hodgman).
+
+    Args:
+        points (ndarray): (P, 2) polygon vertices
+        x_min, y_min, x_max, y_max (float): Clip rectangle
+
+    Returns:
+        ndarray: (Q, 2) clipped polygon, empty if nothing is inside
+    """
+
+    for axis, bound, keep_greater in (
+        (0, x_min, True), (0, x_max, False), (1, y_min, True), (1, y_max, False),
+    ):
+        if len(points) == 0:
+            break
+
+        v = points[:, axis]
+        inside = v >= bound if keep_greater else v <= bound
+        nxt = np.roll(points, -1, axis=0)
+        crossing = inside != np.roll(inside, -1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(crossing, (bound - v) / (nxt[:, axis] - v), 0.0)
+        intersection = points + t[:, None] * (nxt - points)
+
+        # Edge p -> q emits p when p is inside, then the crossing point
+        candidates = np.stack([points, intersection], axis=1).reshape(-1, 2)
+        points = candidates[np.stack([inside, crossing], axis=1).reshape(-1)]
+
+    return points
+
+
+# --------------------------------------------------
+# Label Re-projection
+# --------------------------------------------------
+
+def load_yolo_objects(label_path, width, height):
+    """
+    Read a YOLO label file into pixel-space boxes and polygons.
+
+    Returns:
+        tuple: (box_classes, boxes_xyxy_px, polygons) where polygons is a
+               list of (class_id, (P, 2) pixel vertices)
+    """
+
+    if not label_path.exists():
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4)), []
+
+    with open(label_path, "r") as f:
+        values, starts, lengths, _ = parse_yolo_text(f.read())
+
+    scale = np.array([width, height, width, height], dtype=np.float64)
+
+    is_box = lengths == 5
+    idx = starts[is_box][:, None] + np.arange(5)
+    rows = values[idx].reshape(-1, 5)
+    box_classes = rows[:, 0].astype(np.int64)
+    boxes = cxcywh_to_xyxy(rows[:, 1:]) * scale
+
+    polygons = []
+    for start, length in zip(starts[~is_box], lengths[~is_box]):
+        if length < 7 or length % 2 == 0:
+            continue
+        points = values[start + 1:start + length].reshape(-1, 2) * scale[:2]
+        polygons.append((int(values[start]), points))
+
+    return box_classes, boxes, polygons
+
+
+def reproject_labels(box_classes, boxes, polygons, window, min_size_px, min_visibility=0.0,
+                     is_small_box=None):
+    """
+    Clip pixel-space objects to one tile and renormalize them.
+
+    Args:
+        box_classes (ndarray): (N,) class ids of the boxes
+        boxes (ndarray): (N, 4) corner boxes in source pixels
+        polygons (list): (class_id, (P, 2) vertices) in source pixels
+        window (tuple): Tile (x, y, w, h) in source pixels
+        min_size_px (float): MIN_BOX_SIZE_PX-style filter on clipped boxes
+        min_visibility (float): Minimum clipped / original area fraction
+        is_small_box (callable, optional): Size filter; defaults to
+                                           Polygon-to-Rectangle-format's
+
+    Returns:
+        list[str]: YOLO label lines for the tile
+    """
+
+    if is_small_box is None:
+        from annotation_toolkit.modules import load_converter
+        is_small_box = load_converter("poly2rect").is_small_box
+
+    x, y, w, h = window
+    lines = []
+
+    # Boxes
+    if len(boxes):
+        clipped = np.stack([
+            np.clip(boxes[:, 0], x, x + w),
+            np.clip(boxes[:, 1], y, y + h),
+            np.clip(boxes[:, 2], x, x + w),
+            np.clip(boxes[:, 3], y, y + h),
+        ], axis=1)
+        cw = clipped[:, 2] - clipped[:, 0]
+        ch = clipped[:, 3] - clipped[:, 1]
+        area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            visible = np.where(area > 0, cw * ch / area, 0.0)
+
+        keep = (cw > 0) & (ch > 0) & ~is_small_box(cw, ch, min_size_px) & (visible >= min_visibility)
+
+        local = clipped[keep] - np.array([x, y, x, y], dtype=np.float64)
+        yolo = xyxy_to_cxcywh(local) / np.array([w, h, w, h], dtype=np.float64)
+        for class_id, (cx, cy, bw, bh) in zip(box_classes[keep].tolist(), yolo.tolist()):
+            lines.append(f"{class_id} {cx:.6f} {cy:.6f} {bw:.6f} {bh:.6f}")
+
+    # Polygons
+    for class_id, points in polygons:
+        if points[:, 0].max() <= x or points[:, 0].min() >= x + w \
+                or points[:, 1].max() <= y or points[:, 1].min() >= y + h:
+            continue
+
+        clipped = clip_polygon(points, x, y, x + w, y + h)
+        if len(clipped) < 3:
+            continue
+
+        cw = clipped[:, 0].max() - clipped[:, 0].min()
+        ch = clipped[:, 1].max() - clipped[:, 1].min()
+        if is_small_box(cw, ch, min_size_px):
+            continue
+
+        if min_visibility > 0 and _polygon_area(clipped) < min_visibility * _polygon_area(points):
+            continue
+
+        local = (clipped - [x, y]) / [w, h]
+        lines.append(f"{class_id} " + " ".join(f"{v:.6f}" for v in local.reshape(-1)))
+
+    return lines
+
+
+def _polygon_area(points):
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+# --------------------------------------------------
+# Slicing
+# --------------------------------------------------
+
+def tile_prefix(img_path, images_dir):
+    """
+    Tile name prefix of an image: its path relative to images_dir
+    without the extension, "/" replaced by TILE_NAME_SEPARATOR.
+    """
+    relative = img_path.relative_to(images_dir).with_suffix("")
+    return TILE_NAME_SEPARATOR.join(relative.parts)
+
+
+def slice_image(img_path, label_path, output_dir, tile_size, overlap,
+                min_size_px, min_visibility, skip_empty, prefix=None, is_small_box=None):
+    """
+    Slice one image and its labels into tiles named <prefix>_<x>_<y>
+    (prefix defaults to the image stem).
+
+    Returns:
+        list[dict]: tile -> source mapping entries
+    """
+
+    import cv2
+
+    image = cv2.imread(str(img_path))
+    if image is None:
+        raise FileNotFoundError(f"Image not found: {img_path}")
+
+    height, width = image.shape[:2]
+    box_classes, boxes, polygons = load_yolo_objects(label_path, width, height)
+    prefix = img_path.stem if prefix is None else prefix
+
+    entries = []
+    for window in tile_windows(width, height, tile_size, overlap):
+        lines = reproject_labels(
+            box_classes, boxes, polygons, window, min_size_px, min_visibility, is_small_box
+        )
+        if skip_empty and not lines:
+            continue
+
+        x, y, w, h = window
+        tile_name = f"{prefix}_{x}_{y}"
+
+        cv2.imwrite(str(output_dir / "images" / f"{tile_name}{img_path.suffix}"), image[y:y + h, x:x + w])
+        with open(output_dir / "labels" / f"{tile_name}.txt", "w") as f:
+            f.write("\n".join(lines))
+
+        entries.append({
+            "tile": tile_name,
+            "source": str(img_path),
+            "image": prefix,
+            "x": x,
+            "y": y,
+            "width": w,
+            "height": h,
+            "source_width": width,
+            "source_height": height,
+        })
+
+    return entries
+
+
+def slice_dataset(images_dir, output_dir, labels_dir=None, yolo_subdir=False,
+                  tile_size=DEFAULT_TILE_SIZE, overlap=DEFAULT_OVERLAP,
+                  min_size_px=None, min_visibility=0.0, skip_empty=False, workers=8):
+    """
+    Slice every image of a YOLO dataset into overlapping tiles.
+
+    Args:
+        images_dir (str): Image root directory
+        output_dir (str): Output directory (images/, labels/, tiles.json)
+        labels_dir (str, optional): Label root mirroring images_dir
+        yolo_subdir (bool): Labels are in a YOLO_darknet/ subdirectory
+        tile_size (int): Tile edge length in pixels
+        overlap (float): Overlap between neighbouring tiles (fraction)
+        min_size_px (float, optional): Size filter on clipped objects;
+                                       defaults to MIN_BOX_SIZE_PX
+        min_visibility (float): Minimum visible fraction of a clipped object
+        skip_empty (bool): Do not write tiles without labels
+        workers (int): Number of threads
+
+    Returns:
+        list[dict]: tile -> source mapping (also written to tiles.json)
+    """
+
+    from annotation_toolkit.modules import load_converter
+
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+
+    # Resolved once here; the worker threads only call them
+    poly2rect = load_converter("poly2rect")
+    if min_size_px is None:
+        min_size_px = poly2rect.MIN_BOX_SIZE_PX
+
+    images_dir = Path(images_dir)
+    output_dir = Path(output_dir)
+
+    image_paths = find_images(images_dir)
+    prefixes = {}
+    for img_path in image_paths:
+        prefix = tile_prefix(img_path, images_dir)
+        if prefix in prefixes:
+            raise ValueError(f"Images would share tile names: {prefixes[prefix]} and {img_path}")
+        prefixes[prefix] = img_path
+
+    (output_dir / "images").mkdir(parents=True, exist_ok=True)
+    (output_dir / "labels").mkdir(parents=True, exist_ok=True)
+
+    def run(item):
+        prefix, img_path = item
+        label_path = get_yolo_label_path(img_path, images_dir, labels_dir, yolo_subdir)
+        return slice_image(
+            img_path, label_path, output_dir, tile_size, overlap,
+            min_size_px, min_visibility, skip_empty, prefix, poly2rect.is_small_box,
+        )
+
+    tiles = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entries in pool.map(run, prefixes.items()):
+            tiles.extend(entries)
+
+    with open(output_dir / "tiles.json", "w") as f:
+        json.dump({"tile_size": tile_size, "overlap": overlap, "tiles": tiles}, f, indent=4)
+
+    return tiles
+
+
+# --------------------------------------------------
+# Stitching
+# --------------------------------------------------
+
+def stitch_predictions(tiles_json, pred_dir, output_dir, suppression="nms", iou_thr=0.5):
+    """
+    Map tile-level YOLO predictions back onto their source images.
+
+    Boxes found twice in overlapping tiles are merged with
+    annotation_toolkit.suppression (confidence is used when present).
+
+    Args:
+        tiles_json (str): tiles.json written by slice_dataset()
+        pred_dir (str): Directory with one YOLO .txt per tile
+                        (optionally with a trailing confidence column)
+        output_dir (str): Output directory, one YOLO .txt per source image,
+                          named like the tile prefix ("sub__img.txt")
+        suppression (str, optional): "nms", "wbf" or None
+        iou_thr (float): IoU threshold for suppression
+
+    Returns:
+        int: Number of written source label files
+    """
+
+    from annotation_toolkit.suppression import suppress_boxes
+
+    with open(tiles_json, "r") as f:
+        tiles = json.load(f)["tiles"]
+
+    pred_dir = Path(pred_dir)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    by_source = {}
+    for tile in tiles:
+        pred_path = pred_dir / f"{tile['tile']}.txt"
+        if not pred_path.exists():
+            continue
+
+        with open(pred_path, "r") as f:
+            rows = [line.split() for line in f if line.strip()]
+        rows = [row for row in rows if len(row) in (5, 6)]
+        if not rows:
+            continue
+
+        # Labels without a confidence column count as confidence 1
+        values = np.array([row + ["1"] * (6 - len(row)) for row in rows], dtype=np.float64)
+
+        # Tile-normalized -> source pixels
+        tile_scale = np.array([tile["width"], tile["height"]] * 2, dtype=np.float64)
+        offset = np.array([tile["x"], tile["y"]] * 2, dtype=np.float64)
+        boxes = cxcywh_to_xyxy(values[:, 1:5]) * tile_scale + offset
+
+        entry = by_source.setdefault(tile["source"], {
+            # tiles.json files written before "image" existed
+            "name": tile.get("image", Path(tile["source"]).stem),
+            "size": (tile["source_width"], tile["source_height"]),
+            "classes": [], "boxes": [], "scores": [],
+        })
+        entry["classes"].append(values[:, 0].astype(np.int64))
+        entry["boxes"].append(boxes)
+        entry["scores"].append(values[:, 5])
+
+    names = {}
+    for source, entry in by_source.items():
+        if entry["name"] in names:
+            raise ValueError(f"Source images would share an output file: {names[entry['name']]} and {source}")
+        names[entry["name"]] = source
+
+    for source, entry in by_source.items():
+        classes = np.concatenate(entry["classes"])
+        boxes = np.concatenate(entry["boxes"])
+        scores = np.concatenate(entry["scores"])
+
+        if suppression is not None:
+            boxes, classes, scores, _ = suppress_boxes(boxes, classes, scores, suppression, iou_thr)
+
+        width, height = entry["size"]
+        yolo = xyxy_to_cxcywh(boxes) / np.array([width, height, width, height], dtype=np.float64)
+
+        with open(output_dir / f"{entry['name']}.txt", "w") as f:
+            f.write("\n".join(
+                f"{c} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f} {s:.6f}"
+                for c, (cx, cy, w, h), s in zip(classes.tolist(), yolo.tolist(), scores.tolist())
+            ))
+
+    return len(by_source)
+
+
+# --------------------------------------------------
+# Command Line
+# --------------------------------------------------
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Slice images into overlapping tiles with re-projected YOLO labels"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    slicer = subparsers.add_parser("slice", help="Slice a YOLO dataset into tiles")
+    slicer.add_argument("--images", required=True, help="Image root directory.")
+    slicer.add_argument("--labels", default=None, help="Label root (default: next to images).")
+    slicer.add_argument("--yolo-subdir", action="store_true")
+    slicer.add_argument("--out", required=True, help="Output directory.")
+    slicer.add_argument("--tile", type=int, default=DEFAULT_TILE_SIZE, help="Tile size in pixels.")
+    slicer.add_argument("--overlap", type=float, default=DEFAULT_OVERLAP, help="Tile overlap fraction.")
+    slicer.add_argument("--min-size", type=float, default=None,
+                        help="Minimum clipped edge in pixels (default: MIN_BOX_SIZE_PX).")
+    slicer.add_argument("--min-visibility", type=float, default=0.0,
+                        help="Minimum visible fraction of a clipped object.")
+    slicer.add_argument("--skip-empty", action="store_true", help="Skip tiles without labels.")
+    slicer.add_argument("--workers", type=int, default=8)
+
+    stitch = subparsers.add_parser("stitch", help="Map tile predictions back to source images")
+    stitch.add_argument("--tiles", required=True, help="tiles.json written by slice.")
+    stitch.add_argument("--pred", required=True, help="Tile prediction directory.")
+    stitch.add_argument("--out", required=True, help="Output directory.")
+    stitch.add_argument("--suppression", choices=["nms", "wbf", "none"], default="nms")
+    stitch.add_argument("--iou-thr", type=float, default=0.5)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.command == "slice":
+        tiles = slice_dataset(
+            opt.images, opt.out, opt.labels, opt.yolo_subdir, opt.tile, opt.overlap,
+            opt.min_size, opt.min_visibility, opt.skip_empty, opt.workers,
+        )
+        print(f"Wrote {len(tiles)} tiles to: {opt.out}")
+    else:
+        suppression = None if opt.suppression == "none" else opt.suppression
+        count = stitch_predictions(opt.tiles, opt.pred, opt.out, suppression, opt.iou_thr)
+        print(f"Stitched predictions for {count} images into: {opt.out}")
+
+
+if __name__ == "__main__":
+    main(get_args())
@@ -0,0 +1,794 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from annotation_toolkit.boxes import cxcywh_to_xyxy, duplicate_pairs, xywh_to_xyxy
+
+"""
+validate.py
+
+Validates YOLO, COCO and RGB-mask datasets and collects per-class
+statistics in a single scan.
+
+Checks:
+- malformed_line:  YOLO line that is neither a box nor a polygon
+- unknown_class:   class / category id outside the known classes
+- out_of_range:    coordinates outside [0, 1] (YOLO) or the image (COCO)
+- degenerate:      zero or negative width, height or polygon area
+- duplicate:       same-class boxes in one image with IoU >= --iou-thr
+- missing_label:   image without a label file / mask
+- missing_image:   label file / mask / annotation without an image
+- unknown_image:   COCO annotation referencing an unknown image id
+- duplicate_id:    repeated COCO image or annotation id
+- missing_key:     COCO image / annotation / category without a required key
+- bad_type:        COCO id that is not an integer, or image size that is
+                   not a number (the array checks of that file are skipped)
+- unknown_color:   mask pixels whose color is not in COLOR_TO_CLASS
+- unreadable:      file that cannot be read or parsed
+
+Statistics (per class):
+- object count
+- size histogram over sqrt(area) in pixels
+- aspect ratio histogram over log2(width / height)
+
+Label files and masks are read by a thread pool; every file is parsed into
+NumPy arrays and checked with array operations.
+
+Usage:
+    python -m annotation_toolkit.validate yolo --images DIR [--labels DIR]
+    python -m annotation_toolkit.validate coco --json FILE [--images DIR]
+    python -m annotation_toolkit.validate mask --masks DIR [--images DIR]
+"""
+
+# --------------------------------------------------
+# Check Configuration
+# --------------------------------------------------
+
+CHECK_SEVERITY = {
+    "malformed_line": "error",
+    "unknown_class": "error",
+    "out_of_range": "error",
+    "degenerate": "error",
+    "duplicate": "warning",
+    "missing_label": "warning",
+    "missing_image": "error",
+    "unknown_image": "error",
+    "duplicate_id": "error",
+    "missing_key": "error",
+    "bad_type": "error",
+    "unknown_color": "warning",
+    "unreadable": "error",
+}
+
+# Only the first examples of each check are kept in the report
+MAX_EXAMPLES_PER_CHECK = 100
+
+# Tolerance for normalized / pixel coordinates slightly outside the image
+COORD_EPS = 1e-6
+
+DUPLICATE_IOU_THR = 0.95
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Same label layout as Yolo-to-COCO-format/main.py
+YOLO_DARKNET_SUB_DIR = "YOLO_darknet"
+
+# Keys a COCO entry needs to be checked at all ("file_name" only with --images)
+COCO_REQUIRED_KEYS = {
+    "images": ("id", "width", "height"),
+    "annotations": ("image_id", "category_id"),
+    "categories": ("id",),
+}
+
+# Histogram bin edges (values below the first edge go to bin 0)
+SIZE_BIN_EDGES = np.array([8, 16, 32, 64, 96, 128, 256, 512, 1024])   # sqrt(area) px
+ASPECT_BIN_EDGES = np.array([-3, -2, -1, -0.5, 0.5, 1, 2, 3])         # log2(w / h)
+
+# Background color in RGB masks
+MASK_BACKGROUND = (0, 0, 0)
+
+
+# --------------------------------------------------
+# Report
+# --------------------------------------------------
+
+class ValidationReport:
+    """
+    Accumulates issues and per-class statistics during a scan.
+    """
+
+    def __init__(self, class_names=None):
+        self.class_names = class_names or {}
+        self.issue_counts = {}
+        self.examples = {}
+        self.files = 0
+        self.objects = 0
+
+        self.class_counts = np.zeros(0, dtype=np.int64)
+        self.size_hist = np.zeros((0, len(SIZE_BIN_EDGES) + 1), dtype=np.int64)
+        self.aspect_hist = np.zeros((0, len(ASPECT_BIN_EDGES) + 1), dtype=np.int64)
+
+    def add_issue(self, check, file, message, line=None):
+        self.issue_counts[check] = self.issue_counts.get(check, 0) + 1
+
+        examples = self.examples.setdefault(check, [])
+        if len(examples) < MAX_EXAMPLES_PER_CHECK:
+            examples.append({"file": str(file), "line": line, "message": message})
+
+    def _grow(self, num_classes):
+        if num_classes <= len(self.class_counts):
+            return
+        extra = num_classes - len(self.class_counts)
+        self.class_counts = np.concatenate([self.class_counts, np.zeros(extra, dtype=np.int64)])
+        self.size_hist = np.vstack([self.size_hist, np.zeros((extra, self.size_hist.shape[1]), dtype=np.int64)])
+        self.aspect_hist = np.vstack([self.aspect_hist, np.zeros((extra, self.aspect_hist.shape[1]), dtype=np.int64)])
+
+    def add_objects(self, class_ids, widths_px, heights_px):
+        """
+        Add objects to the statistics.
+
+        Objects with a negative class id are skipped; objects with NaN
+        sizes (unknown image size) are only counted.
+        """
+
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        widths_px = np.asarray(widths_px, dtype=np.float64)
+        heights_px = np.asarray(heights_px, dtype=np.float64)
+
+        keep = class_ids >= 0
+        class_ids, widths_px, heights_px = class_ids[keep], widths_px[keep], heights_px[keep]
+        if len(class_ids) == 0:
+            return
+
+        self._grow(int(class_ids.max()) + 1)
+        self.objects += len(class_ids)
+        np.add.at(self.class_counts, class_ids, 1)
+
+        sized = np.isfinite(widths_px) & np.isfinite(heights_px) & (widths_px > 0) & (heights_px > 0)
+        if not sized.any():
+            return
+
+        ids = class_ids[sized]
+        w = widths_px[sized]
+        h = heights_px[sized]
+
+        np.add.at(self.size_hist, (ids, np.digitize(np.sqrt(w * h), SIZE_BIN_EDGES)), 1)
+        np.add.at(self.aspect_hist, (ids, np.digitize(np.log2(w / h), ASPECT_BIN_EDGES)), 1)
+
+    @property
+    def num_errors(self):
+        return sum(
+            count for check, count in self.issue_counts.items()
+            if CHECK_SEVERITY[check] == "error"
+        )
+
+    def to_dict(self):
+        classes = {}
+        for class_id in np.flatnonzero(self.class_counts):
+            classes[str(class_id)] = {
+                "name": self.class_names.get(int(class_id), str(class_id)),
+                "count": int(self.class_counts[class_id]),
+                "size_hist": self.size_hist[class_id].tolist(),
+                "aspect_hist": self.aspect_hist[class_id].tolist(),
+            }
+
+        return {
+            "files": self.files,
+            "objects": self.objects,
+            "errors": self.num_errors,
+            "issues": {
+                check: {
+                    "severity": CHECK_SEVERITY[check],
+                    "count": count,
+                    "examples": self.examples.get(check, []),
+                }
+                for check, count in sorted(self.issue_counts.items())
+            },
+            "size_bin_edges": SIZE_BIN_EDGES.tolist(),
+            "aspect_bin_edges": ASPECT_BIN_EDGES.tolist(),
+            "classes": classes,
+        }
+
+    def print_summary(self):
+        print(f"Scanned {self.files} files, {self.objects} objects")
+
+        if not self.issue_counts:
+            print("No issues found.")
+        for check, count in sorted(self.issue_counts.items()):
+            print(f"  [{CHECK_SEVERITY[check]:<7}] {check:<15} {count}")
+            for example in self.examples[check][:3]:
+                where = example["file"]
+                if example["line"] is not None:
+                    where += f":{example['line']}"
+                print(f"      {where}: {example['message']}")
+
+        print("Per-class statistics:")
+        for class_id in np.flatnonzero(self.class_counts):
+            name = self.class_names.get(int(class_id), str(class_id))
+            print(
+                f"  {class_id:>4} {name:<15} count={self.class_counts[class_id]:<8} "
+                f"size={self.size_hist[class_id].tolist()} "
+                f"aspect={self.aspect_hist[class_id].tolist()}"
+            )
+
+
+# --------------------------------------------------
+# YOLO
+# --------------------------------------------------
+
+def parse_yolo_text(text):
+    """
+    Parse a YOLO label file (boxes and/or polygons) into flat arrays.
+
+    Args:
+        text (str): File contents
+
+    Returns:
+        tuple: (values, starts, lengths, line_numbers) where row i holds
+               values[starts[i]:starts[i] + lengths[i]]; blank lines are skipped
+    """
+
+    rows = [line.split() for line in text.splitlines()]
+    line_numbers = np.array([i + 1 for i, row in enumerate(rows) if row], dtype=np.int64)
+    rows = [row for row in rows if row]
+
+    lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    starts = np.cumsum(lengths) - lengths
+    values = np.array(list(chain.from_iterable(rows)), dtype=np.float64)
+
+    return values, starts, lengths, line_numbers
+
+
+def _segment_index(starts, lengths):
+    """
+    Flat indices covering [start, start + length) for every segment.
+    """
+    total = int(lengths.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets
+
+
+def check_yolo_labels(text, num_classes=None, iou_thr=DUPLICATE_IOU_THR):
+    """
+    Run all per-file YOLO checks.
+
+    Args:
+        text (str): Label file contents
+        num_classes (int, optional): Number of known classes
+        iou_thr (float): Duplicate IoU threshold
+
+    Returns:
+        tuple: (issues, class_ids, boxes) where issues is a list of
+               (check, line, message) and boxes are normalized corner boxes
+               of all well-formed objects
+    """
+
+    issues = []
+    values, starts, lengths, line_numbers = parse_yolo_text(text)
+
+    is_box = lengths == 5
+    is_polygon = (lengths >= 7) & (lengths % 2 == 1)
+    malformed = ~(is_box | is_polygon)
+    for line in line_numbers[malformed]:
+        issues.append(("malformed_line", int(line), "expected 5 values or a polygon with >= 3 points"))
+
+    valid = ~malformed
+    class_values = values[starts]
+    bad_class = valid & ((class_values != np.round(class_values)) | (class_values < 0))
+    if num_classes is not None:
+        bad_class |= valid & (class_values >= num_classes)
+    for line, value in zip(line_numbers[bad_class], class_values[bad_class]):
+        issues.append(("unknown_class", int(line), f"class id {value:g}"))
+
+    boxes = np.zeros((len(lengths), 4))
+    out_of_range = np.zeros(len(lengths), dtype=bool)
+    degenerate = np.zeros(len(lengths), dtype=bool)
+
+    # Bounding boxes
+    if is_box.any():
+        idx = starts[is_box][:, None] + np.arange(1, 5)
+        cxcywh = values[idx]
+        xyxy = cxcywh_to_xyxy(cxcywh)
+        boxes[is_box] = xyxy
+        out_of_range[is_box] = ((xyxy < -COORD_EPS) | (xyxy > 1 + COORD_EPS)).any(axis=1)
+        degenerate[is_box] = (cxcywh[:, 2] <= 0) | (cxcywh[:, 3] <= 0)
+
+    # Polygons
+    if is_polygon.any():
+        num_points = (lengths[is_polygon] - 1) // 2
+        point_idx = _segment_index(starts[is_polygon] + 1, num_points * 2)[::2]
+        x = values[point_idx]
+        y = values[point_idx + 1]
+
+        segment_starts = np.cumsum(num_points) - num_points
+        boxes[is_polygon] = np.stack([
+            np.minimum.reduceat(x, segment_starts),
+            np.minimum.reduceat(y, segment_starts),
+            np.maximum.reduceat(x, segment_starts),
+            np.maximum.reduceat(y, segment_starts),
+        ], axis=1)
+
+        coords_bad = (x < -COORD_EPS) | (x > 1 + COORD_EPS) | (y < -COORD_EPS) | (y > 1 + COORD_EPS)
+        out_of_range[is_polygon] = np.logical_or.reduceat(coords_bad, segment_starts)
+
+        # Shoelace area; the last vertex connects back to the first
+        next_idx = np.arange(len(x)) + 1
+        next_idx[np.cumsum(num_points) - 1] = segment_starts
+        twice_area = np.add.reduceat(x * y[next_idx] - x[next_idx] * y, segment_starts)
+        degenerate[is_polygon] = np.abs(twice_area) <= 1e-12
+
+    for line in line_numbers[out_of_range]:
+        issues.append(("out_of_range", int(line), "coordinates outside [0, 1]"))
+    for line in line_numbers[degenerate & valid]:
+        issues.append(("degenerate", int(line), "zero or negative area"))
+
+    well_formed = valid & ~bad_class & ~degenerate
+    class_ids = class_values[well_formed].astype(np.int64)
+    boxes = boxes[well_formed]
+    lines = line_numbers[well_formed]
+
+    for i, j in duplicate_pairs(boxes, class_ids, iou_thr):
+        issues.append(("duplicate", int(lines[j]), f"overlaps line {lines[i]} (same class)"))
+
+    return issues, class_ids, boxes
+
+
+def find_images(images_dir):
+    """
+    Recursively list image files, sorted.
+    """
+    images_dir = Path(images_dir)
+    return sorted(p for p in images_dir.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def get_yolo_label_path(img_path, images_dir, labels_dir=None, yolo_subdir=False):
+    """
+    Locate the label file of an image (mirrors Yolo-to-COCO-format/main.py,
+    plus an optional separate labels tree).
+    """
+
+    if labels_dir is not None:
+        return Path(labels_dir) / img_path.relative_to(images_dir).with_suffix(".txt")
+    if yolo_subdir:
+        return img_path.parent / YOLO_DARKNET_SUB_DIR / f"{img_path.stem}.txt"
+    return img_path.with_suffix(".txt")
+
+
+def _scan_yolo_file(img_path, label_path, num_classes, iou_thr):
+    import imagesize
+
+    # Older imagesize versions raise, newer ones return (-1, -1)
+    image_issues = []
+    try:
+        width, height = imagesize.get(str(img_path))
+    except (OSError, ValueError):
+        width = height = -1
+    if width <= 0 or height <= 0:
+        image_issues.append(("unreadable", None, f"cannot read image size: {img_path.name}"))
+        width = height = np.nan
+
+    if not label_path.exists():
+        return label_path, image_issues + [("missing_label", None, f"no label for {img_path.name}")], None
+
+    try:
+        with open(label_path, "r") as f:
+            text = f.read()
+        issues, class_ids, boxes = check_yolo_labels(text, num_classes, iou_thr)
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        return label_path, image_issues + [("unreadable", None, str(e))], None
+
+    sizes = (
+        class_ids,
+        (boxes[:, 2] - boxes[:, 0]) * width,
+        (boxes[:, 3] - boxes[:, 1]) * height,
+    )
+    return label_path, image_issues + issues, sizes
+
+
+def validate_yolo(images_dir, labels_dir=None, yolo_subdir=False, class_names=None,
+                  num_classes=None, iou_thr=DUPLICATE_IOU_THR, workers=8):
+    """
+    Validate a YOLO detection or segmentation dataset.
+
+    Args:
+        images_dir (str): Image root directory
+        labels_dir (str, optional): Label root mirroring images_dir;
+                                    by default labels sit next to the images
+        yolo_subdir (bool): Labels are in a YOLO_darknet/ subdirectory
+        class_names (list[str], optional): Known class names
+        num_classes (int, optional): Number of known classes
+        iou_thr (float): Duplicate IoU threshold
+        workers (int): Number of reader threads
+
+    Returns:
+        ValidationReport
+    """
+
+    images_dir = Path(images_dir)
+    if class_names is not None:
+        num_classes = len(class_names)
+    report = ValidationReport(dict(enumerate(class_names or [])))
+
+    image_paths = find_images(images_dir)
+    label_paths = [
+        get_yolo_label_path(p, images_dir, labels_dir, yolo_subdir) for p in image_paths
+    ]
+
+    def scan(pair):
+        return _scan_yolo_file(pair[0], pair[1], num_classes, iou_thr)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for label_path, issues, sizes in pool.map(scan, zip(image_paths, label_paths)):
+            report.files += 1
+            for check, line, message in issues:
+                report.add_issue(check, label_path, message, line)
+            if sizes is not None:
+                report.add_objects(*sizes)
+
+    # Label files without an image
+    label_root = Path(labels_dir) if labels_dir is not None else images_dir
+    expected = set(label_paths)
+    for txt_path in sorted(label_root.rglob("*.txt")):
+        if labels_dir is None and yolo_subdir and txt_path.parent.name != YOLO_DARKNET_SUB_DIR:
+            continue
+        if txt_path not in expected:
+            report.add_issue("missing_image", txt_path, "label without a matching image")
+
+    return report
+
+
+# --------------------------------------------------
+# COCO
+# --------------------------------------------------
+
+def _complete_entries(coco, section, required, report, json_file):
+    """
+    Entries of a COCO section that have all required keys; the others
+    are reported as missing_key.
+    """
+
+    entries = []
+    for k, entry in enumerate(coco.get(section, [])):
+        missing = [key for key in required if not isinstance(entry, dict) or key not in entry]
+        if missing:
+            report.add_issue("missing_key", json_file, f"{section}[{k}] has no {', '.join(missing)}")
+        else:
+            entries.append(entry)
+    return entries
+
+
+def _is_bbox(bbox):
+    return (
+        isinstance(bbox, list) and len(bbox) == 4
+        and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bbox)
+    )
+
+
+def _is_int(value):
+    # JSON numbers that fit the int64 id arrays (bool is an int in Python)
+    return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_types(coco, sections, report, json_file):
+    """
+    Report COCO fields whose type breaks the array checks as bad_type.
+
+    Args:
+        sections (dict): section -> {key: type check}
+
+    Returns:
+        bool: True when every field has the expected type
+    """
+
+    ok = True
+    for section, checks in sections.items():
+        for k, entry in enumerate(coco.get(section, [])):
+            for key, is_valid in checks.items():
+                if isinstance(entry, dict) and key in entry and not is_valid(entry[key]):
+                    ok = False
+                    report.add_issue("bad_type", json_file, f"{section}[{k}] {key} = {entry[key]!r}")
+    return ok
+
+
+def _repeated(values):
+    unique, counts = np.unique(values, return_counts=True)
+    return unique[counts > 1]
+
+
+def validate_coco(json_file, images_dir=None, iou_thr=DUPLICATE_IOU_THR, workers=8):
+    """
+    Validate a COCO detection annotation file.
+
+    Args:
+        json_file (str): COCO annotation file
+        images_dir (str, optional): Directory to check image files against
+        iou_thr (float): Duplicate IoU threshold
+        workers (int): Number of threads checking image files
+
+    Returns:
+        ValidationReport
+    """
+
+    report = ValidationReport()
+    try:
+        with open(json_file, "r") as f:
+            coco = json.load(f)
+        if not isinstance(coco, dict):
+            raise ValueError("top level is not a JSON object")
+    except (OSError, ValueError) as e:
+        report.add_issue("unreadable", json_file, str(e))
+        return report
+
+    report.files = 1
+    required = dict(COCO_REQUIRED_KEYS)
+    if images_dir is not None:
+        required["images"] += ("file_name",)
+
+    images, annotations, categories = (
+        _complete_entries(coco, section, required[section], report, json_file)
+        for section in ("images", "annotations", "categories")
+    )
+
+    types_ok = _check_types(coco, {
+        "images": {"id": _is_int, "width": _is_number, "height": _is_number},
+        "annotations": {"id": _is_int, "image_id": _is_int, "category_id": _is_int},
+        "categories": {"id": _is_int},
+    }, report, json_file)
+    if not types_ok:
+        # Ids are packed into int64 arrays below; fix the types first
+        return report
+
+    report.class_names = {c["id"]: c.get("name", str(c["id"])) for c in categories}
+
+    image_ids = np.array([img["id"] for img in images], dtype=np.int64)
+    image_sizes = np.array([[img["width"], img["height"]] for img in images], dtype=np.float64).reshape(-1, 2)
+    category_ids = np.array([c["id"] for c in categories], dtype=np.int64)
+
+    for image_id in _repeated(image_ids):
+        report.add_issue("duplicate_id", json_file, f"image id {image_id} used more than once")
+
+    ann_ids = np.array([a.get("id", -1) for a in annotations], dtype=np.int64)
+    for ann_id in _repeated(ann_ids):
+        report.add_issue("duplicate_id", json_file, f"annotation id {ann_id} used more than once")
+
+    bbox_ok = np.array([_is_bbox(a.get("bbox")) for a in annotations], dtype=bool)
+    for k in np.flatnonzero(~bbox_ok):
+        report.add_issue("malformed_line", json_file, f"annotation {ann_ids[k]} has no 4-value bbox")
+
+    ann_image = np.array([a["image_id"] for a in annotations], dtype=np.int64)
+    ann_category = np.array([a["category_id"] for a in annotations], dtype=np.int64)
+    bbox = np.array(
+        [a["bbox"] if ok else [0, 0, 0, 0] for a, ok in zip(annotations, bbox_ok)],
+        dtype=np.float64,
+    ).reshape(-1, 4)
+
+    # Image lookup by sorted id
+    order = np.argsort(image_ids, kind="stable")
+    sorted_ids = image_ids[order]
+    pos = np.clip(np.searchsorted(sorted_ids, ann_image), 0, max(len(sorted_ids) - 1, 0))
+    known_image = (sorted_ids[pos] == ann_image) if len(sorted_ids) else np.zeros(len(ann_image), bool)
+    for k in np.flatnonzero(~known_image):
+        report.add_issue("unknown_image", json_file, f"annotation {ann_ids[k]} -> image id {ann_image[k]}")
+
+    known_category = np.isin(ann_category, category_ids)
+    for k in np.flatnonzero(~known_category):
+        report.add_issue("unknown_class", json_file, f"annotation {ann_ids[k]} -> category id {ann_category[k]}")
+
+    degenerate = bbox_ok & ((bbox[:, 2] <= 0) | (bbox[:, 3] <= 0))
+    for k in np.flatnonzero(degenerate):
+        report.add_issue("degenerate", json_file, f"annotation {ann_ids[k]} bbox {bbox[k].tolist()}")
+
+    sizes = np.full((len(annotations), 2), np.nan)
+    if len(sorted_ids):
+        sizes[known_image] = image_sizes[order][pos[known_image]]
+    xyxy = xywh_to_xyxy(bbox)
+    out_of_range = bbox_ok & known_image & (
+        (xyxy[:, 0] < -COORD_EPS) | (xyxy[:, 1] < -COORD_EPS)
+        | (xyxy[:, 2] > sizes[:, 0] + COORD_EPS) | (xyxy[:, 3] > sizes[:, 1] + COORD_EPS)
+    )
+    for k in np.flatnonzero(out_of_range):
+        report.add_issue("out_of_range", json_file, f"annotation {ann_ids[k]} bbox {bbox[k].tolist()}")
+
+    # Duplicates per image
+    usable = np.flatnonzero(bbox_ok & ~degenerate)
+    by_image = usable[np.argsort(ann_image[usable], kind="stable")]
+    groups = np.split(by_image, np.flatnonzero(np.diff(ann_image[by_image])) + 1) if len(by_image) else []
+    for group in groups:
+        if len(group) < 2:
+            continue
+        for i, j in duplicate_pairs(xyxy[group], ann_category[group], iou_thr):
+            report.add_issue(
+                "duplicate", json_file,
+                f"annotation {ann_ids[group[j]]} overlaps {ann_ids[group[i]]} (same category)"
+            )
+
+    stats = bbox_ok & known_category & ~degenerate
+    report.add_objects(ann_category[stats], bbox[stats, 2], bbox[stats, 3])
+
+    if images_dir is not None:
+        images_dir = Path(images_dir)
+        paths = [images_dir / img["file_name"] for img in images]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for path, exists in zip(paths, pool.map(Path.exists, paths)):
+                if not exists:
+                    report.add_issue("missing_image", json_file, f"image file not found: {path.name}")
+
+    return report
+
+
+# --------------------------------------------------
+# RGB Masks
+# --------------------------------------------------
+
+def _color_key(rgb):
+    """
+    Pack RGB triples into single integers.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def _scan_mask(mask_path, color_to_class):
+    import cv2
+
+    image_bgr = cv2.imread(str(mask_path))
+    if image_bgr is None:
+        return [("unreadable", None, "cannot decode image")], None
+
+    height, width, _ = image_bgr.shape
+    keys = _color_key(image_bgr[..., ::-1])
+    colors, counts = np.unique(keys, return_counts=True)
+
+    known = {int(_color_key(color)): class_id for color, class_id in color_to_class.items()}
+    background = int(_color_key(MASK_BACKGROUND))
+
+    issues = []
+    unknown = [
+        (color, count) for color, count in zip(colors.tolist(), counts.tolist())
+        if color not in known and color != background
+    ]
+    if unknown:
+        pixels = sum(count for _, count in unknown)
+        issues.append((
+            "unknown_color", None,
+            f"{len(unknown)} unknown colors, {pixels} pixels ({pixels / keys.size:.2%})"
+        ))
+
+    class_ids, widths, heights = [], [], []
+    for color in colors.tolist():
+        if color not in known:
+            continue
+
+        region = keys == color
+        cols = np.flatnonzero(region.any(axis=0))
+        rows = np.flatnonzero(region.any(axis=1))
+        class_ids.append(known[color])
+        widths.append(cols[-1] - cols[0] + 1)
+        heights.append(rows[-1] - rows[0] + 1)
+
+    return issues, (class_ids, widths, heights)
+
+
+def validate_masks(masks_dir, images_dir=None, color_to_class=None, workers=8):
+    """
+    Validate a directory of color-coded segmentation masks.
+
+    Statistics count one object per class present in a mask, sized by
+    the bounding box of all its pixels.
+
+    Args:
+        masks_dir (str): Directory containing RGB masks
+        images_dir (str, optional): Directory with the matching images
+        color_to_class (dict, optional): RGB -> class id; defaults to
+                                         COLOR_TO_CLASS of Seg-to-Yolo-format
+        workers (int): Number of reader threads
+
+    Returns:
+        ValidationReport
+    """
+
+    if color_to_class is None:
+        from annotation_toolkit.modules import load_converter
+        color_to_class = load_converter("seg2yolo").COLOR_TO_CLASS
+
+    report = ValidationReport()
+    mask_paths = find_images(masks_dir)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda p: _scan_mask(p, color_to_class), mask_paths)
+        for mask_path, (issues, sizes) in zip(mask_paths, results):
+            report.files += 1
+            for check, line, message in issues:
+                report.add_issue(check, mask_path, message, line)
+            if sizes is not None:
+                report.add_objects(*sizes)
+
+    if images_dir is not None:
+        image_stems = {p.stem: p for p in find_images(images_dir)}
+        mask_stems = {p.stem: p for p in mask_paths}
+        for stem in sorted(mask_stems.keys() - image_stems.keys()):
+            report.add_issue("missing_image", mask_stems[stem], "mask without a matching image")
+        for stem in sorted(image_stems.keys() - mask_stems.keys()):
+            report.add_issue("missing_label", image_stems[stem], "image without a mask")
+
+    return report
+
+
+# --------------------------------------------------
+# Command Line
+# --------------------------------------------------
+
+def read_class_names(names_file):
+    """
+    Read class names, one per line (obj.names / classes.txt).
+    """
+    with open(names_file, "r") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def get_args(argv=None):
+    """
+    Parse command-line arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Validate a YOLO / COCO / mask dataset and collect statistics"
+    )
+    subparsers = parser.add_subparsers(dest="format", required=True)
+
+    yolo = subparsers.add_parser("yolo", help="YOLO bbox or polygon labels")
+    yolo.add_argument("--images", required=True, help="Image root directory.")
+    yolo.add_argument("--labels", default=None, help="Label root (default: next to images).")
+    yolo.add_argument("--yolo-subdir", action="store_true")
+    yolo.add_argument("--classes", default=None, help="Class names file (obj.names).")
+    yolo.add_argument("--num-classes", type=int, default=None)
+
+    coco = subparsers.add_parser("coco", help="COCO detection JSON")
+    coco.add_argument("--json", required=True, help="COCO annotation file.")
+    coco.add_argument("--images", default=None, help="Image directory to check file names.")
+
+    mask = subparsers.add_parser("mask", help="Color-coded segmentation masks")
+    mask.add_argument("--masks", required=True, help="Mask directory.")
+    mask.add_argument("--images", default=None, help="Image directory to check pairs.")
+
+    for sub in (yolo, coco, mask):
+        sub.add_argument("--workers", type=int, default=8)
+        sub.add_argument("--report", default=None, help="Write the full report as JSON.")
+        if sub is not mask:
+            sub.add_argument("--iou-thr", type=float, default=DUPLICATE_IOU_THR)
+
+    return parser.parse_args(argv)
+
+
+def main(opt):
+    if opt.format == "yolo":
+        class_names = read_class_names(opt.classes) if opt.classes else None
+        report = validate_yolo(
+            opt.images, opt.labels, opt.yolo_subdir, class_names,
+            opt.num_classes, opt.iou_thr, opt.workers,
+        )
+    elif opt.format == "coco":
+        report = validate_coco(opt.json, opt.images, opt.iou_thr, opt.workers)
+    else:
+        report = validate_masks(opt.masks, opt.images, workers=opt.workers)
+
+    report.print_summary()
+
+    if opt.report:
+        with open(opt.report, "w") as f:
+            json.dump(report.to_dict(), f, indent=4)
+
+    return 1 if report.num_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(get_args()))
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Tests import annotation_toolkit and load the converter scripts from the repository root
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
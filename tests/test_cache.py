@@ -0,0 +1,76 @@
+import json
+import shutil
+
+import pytest
+
+from annotation_toolkit.modules import REPO_ROOT, load_converter
+
+
+@pytest.fixture
+def yolo2coco(tmp_path, monkeypatch, capsys):
+    """
+    Run Yolo-to-COCO-format/main.py with --cache on a copy of the bundled dataset.
+    """
+
+    dataset = tmp_path / "dataset"
+    shutil.copytree(REPO_ROOT / "Yolo-to-COCO-format/input/dataset", dataset)
+    cache = tmp_path / "dataset.cache"
+    module = load_converter("yolo2coco")
+    monkeypatch.chdir(tmp_path)
+
+    def convert(*extra):
+        capsys.readouterr()
+        module.main(module.get_args(
+            ["-p", str(dataset), "--cache", str(cache), "--output", "out.json", *extra]
+        ))
+        loaded = "Loaded dataset cache" in capsys.readouterr().out
+        with open(tmp_path / "output" / "out.json") as f:
+            return json.load(f), loaded
+
+    convert.dataset = dataset
+    return convert
+
+
+def test_cache_is_reused_for_the_same_input(yolo2coco):
+    built, loaded = yolo2coco()
+    assert not loaded
+
+    reused, loaded = yolo2coco()
+    assert loaded
+    assert reused == built
+
+
+def test_changed_option_invalidates_cache(yolo2coco):
+    yolo2coco()
+
+    coco, loaded = yolo2coco("--box2seg")
+    assert not loaded
+    assert all(ann["segmentation"] for ann in coco["annotations"])
+
+    # The rebuilt cache belongs to the new options
+    _, loaded = yolo2coco("--box2seg")
+    assert loaded
+
+
+def test_changed_label_file_invalidates_cache(yolo2coco):
+    before, _ = yolo2coco()
+
+    label_path = yolo2coco.dataset / "example.txt"
+    lines = label_path.read_text().splitlines(keepends=True)
+    label_path.write_text("".join(lines[:-1]))
+
+    after, loaded = yolo2coco()
+    assert not loaded
+    assert len(after["annotations"]) == len(before["annotations"]) - 1
+
+
+def test_class_map_invalidates_cache(yolo2coco, tmp_path):
+    yolo2coco()
+
+    class_map = tmp_path / "map.json"
+    class_map.write_text(json.dumps({"classes": [{"name": "a", "from": [0]}]}))
+
+    coco, loaded = yolo2coco("--class-map", str(class_map))
+    assert not loaded
+    assert [c["name"] for c in coco["categories"]] == ["a"]
+    assert {ann["category_id"] for ann in coco["annotations"]} == {1}
@@ -0,0 +1,29 @@
+import pytest
+
+from annotation_toolkit.classmap import ClassMap
+
+
+def test_merge_and_drop():
+    lut = ClassMap({
+        "classes": [{"name": "defect", "from": ["crack", "hole"]}, {"name": "stain", "id": 10}],
+        "drop": ["background"],
+    }).compile(["crack", "hole", "stain", "background"])
+
+    assert lut.map([0, 1, 2, 3]).tolist() == [0, 0, 1, -1]
+    assert lut.map([0, 2], output="coco").tolist() == [1, 10]
+
+
+def test_duplicate_output_name():
+    class_map = ClassMap({"classes": [{"name": "a", "from": [0]}, {"name": "a", "from": [1]}]})
+
+    with pytest.raises(ValueError, match="listed twice"):
+        class_map.compile(["x", "y"])
+
+
+@pytest.mark.parametrize("classes", [
+    [{"name": "a", "id": 5}, {"name": "b", "id": 5}],
+    [{"name": "a"}, {"name": "b", "id": 1}],
+])
+def test_duplicate_coco_id(classes):
+    with pytest.raises(ValueError, match="COCO id"):
+        ClassMap({"classes": classes}).compile(["a", "b"])
@@ -0,0 +1,37 @@
+import shutil
+import subprocess
+import sys
+
+from annotation_toolkit.modules import REPO_ROOT
+
+
+def run_cli(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "annotation_toolkit", *args],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+
+
+def test_exit_code_of_command_is_kept(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    shutil.copy(REPO_ROOT / "Yolo-to-COCO-format/input/dataset/example.jpg", images)
+    (images / "example.txt").write_text("0 0.5 0.5 0.1\n7 1.5 0.5 0.1 0.1\n")
+
+    result = run_cli("validate", "yolo", "--images", str(images))
+    assert result.returncode == 1, result.stdout + result.stderr
+
+    direct = subprocess.run(
+        [sys.executable, "-m", "annotation_toolkit.validate", "yolo", "--images", str(images)],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    assert direct.returncode == result.returncode
+
+
+def test_clean_dataset_exits_zero():
+    result = run_cli("validate", "yolo", "--images", "Yolo-to-COCO-format/input/dataset")
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_unknown_command():
+    assert run_cli("no-such-command").returncode == 2
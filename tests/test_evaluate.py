@@ -0,0 +1,104 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from annotation_toolkit.modules import REPO_ROOT, load_converter
+
+EXAMPLE_GT = REPO_ROOT / "Yolo-to-COCO-format/output/dataset_coco.json"
+
+
+def jittered_detections(coco, rng, copies=3, false_positives=5):
+    """
+    Noisy copies of every ground-truth box plus random false positives.
+    """
+
+    detections = []
+    for ann in coco["annotations"]:
+        x, y, w, h = ann["bbox"]
+        for _ in range(copies):
+            dx, dy, dw, dh = rng.normal(0, 0.15, 4) * [w, h, w, h]
+            detections.append({
+                "image_id": ann["image_id"],
+                "category_id": ann["category_id"],
+                "bbox": [x + dx, y + dy, max(w + dw, 1.0), max(h + dh, 1.0)],
+                "score": float(rng.random()),
+            })
+
+    category_ids = [c["id"] for c in coco["categories"]]
+    for image in coco["images"]:
+        for _ in range(false_positives):
+            w, h = rng.uniform(4, image["width"] / 3), rng.uniform(4, image["height"] / 3)
+            detections.append({
+                "image_id": image["id"],
+                "category_id": int(rng.choice(category_ids)),
+                "bbox": [rng.uniform(0, image["width"] - w), rng.uniform(0, image["height"] - h), w, h],
+                "score": float(rng.random()),
+            })
+    return detections
+
+
+def synthetic_ground_truth(rng, num_images=20):
+    """
+    Boxes of all COCO area ranges, some of them crowd.
+    """
+
+    coco = {
+        "images": [{"id": i, "width": 640, "height": 480} for i in range(num_images)],
+        "annotations": [],
+        "categories": [{"id": 1, "name": "a"}, {"id": 3, "name": "b"}],
+    }
+    for image in coco["images"]:
+        for _ in range(rng.integers(0, 15)):
+            w, h = np.exp(rng.uniform(np.log(8), np.log(300), 2))
+            coco["annotations"].append({
+                "id": len(coco["annotations"]) + 1,
+                "image_id": image["id"],
+                "category_id": int(rng.choice([1, 3])),
+                "bbox": [float(rng.uniform(0, 640 - w)), float(rng.uniform(0, 480 - h)), float(w), float(h)],
+                "area": float(w * h),
+                "iscrowd": int(rng.random() < 0.05),
+            })
+    return coco
+
+
+def pycocotools_stats(gt_file, detections):
+    from pycocotools.coco import COCO
+    from pycocotools.cocoeval import COCOeval
+
+    coco_gt = COCO(str(gt_file))
+    coco_eval = COCOeval(coco_gt, coco_gt.loadRes(copy.deepcopy(detections)), "bbox")
+    coco_eval.evaluate()
+    coco_eval.accumulate()
+    coco_eval.summarize()
+    return coco_eval.stats
+
+
+@pytest.mark.parametrize("dataset", ["example", "synthetic"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matches_pycocotools(tmp_path, dataset, workers):
+    pytest.importorskip("pycocotools")
+    evaluate = load_converter("evaluate")
+    rng = np.random.default_rng(0)
+
+    if dataset == "example":
+        gt_file = EXAMPLE_GT
+        with open(gt_file) as f:
+            coco = json.load(f)
+    else:
+        coco = synthetic_ground_truth(rng)
+        gt_file = tmp_path / "gt.json"
+        gt_file.write_text(json.dumps(coco))
+
+    detections = jittered_detections(coco, rng)
+    results_file = tmp_path / "results.json"
+    results_file.write_text(json.dumps(detections))
+
+    metrics = evaluate.evaluate(
+        evaluate.load_ground_truth(gt_file), evaluate.load_detections(results_file), workers
+    )
+    expected = pycocotools_stats(gt_file, detections)
+
+    assert len(metrics["stats"]) == len(expected) == 12
+    np.testing.assert_allclose(metrics["stats"], expected, rtol=0, atol=1e-6)
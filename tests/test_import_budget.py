@@ -0,0 +1,7 @@
+from annotation_toolkit.import_budget import check_budgets
+
+
+def test_commands_within_import_budget():
+    # The CLI itself, a light converter and a tool with NumPy
+    failures = check_budgets([None, "yolo2coco", "coco2yolo", "validate"], repeat=3)
+    assert not failures, "\n".join(failures)
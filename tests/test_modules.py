@@ -0,0 +1,14 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from annotation_toolkit.modules import load_converter
+
+
+def test_concurrent_load_returns_initialised_module():
+    sys.modules.pop("_converter_poly2rect", None)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        modules = list(pool.map(lambda _: load_converter("poly2rect"), range(64)))
+
+    assert all(module is modules[0] for module in modules)
+    assert all(hasattr(module, "is_small_box") for module in modules)
@@ -0,0 +1,31 @@
+import shutil
+
+from annotation_toolkit.modules import REPO_ROOT, load_converter
+from annotation_toolkit.shards import iter_samples, pack_directory
+
+poly2rect = load_converter("poly2rect")
+
+EXAMPLE_LABELS = REPO_ROOT / "Polygon-to-Rectangle-format/data/mask.txt"
+
+
+def test_cli_converts_shards_like_loose_files(tmp_path):
+    src = tmp_path / "polygons"
+    src.mkdir()
+    shutil.copy(EXAMPLE_LABELS, src / "a.txt")
+    lines = EXAMPLE_LABELS.read_text().splitlines(keepends=True)
+    (src / "b.txt").write_text("".join(lines[:4]))
+    (src / "empty.txt").write_text("")
+    pack_directory(src, str(tmp_path / "polygons-%06d.tar"), max_count=2)
+
+    for input_path, output_path in (
+        (src, tmp_path / "loose"),
+        (tmp_path / "polygons-*.tar", tmp_path / "labels-%06d.tar"),
+    ):
+        poly2rect.main(poly2rect.get_args([
+            "--input", str(input_path), "--output", str(output_path), "--suppression", "nms",
+        ]))
+
+    loose = {path.stem: path.read_text() for path in (tmp_path / "loose").iterdir()}
+    from_shards = {key: sample["txt"].decode() for key, sample in iter_samples(str(tmp_path / "labels-*.tar"))}
+    assert from_shards == loose
+    assert sorted(loose) == ["a", "b", "empty"] and loose["a"]
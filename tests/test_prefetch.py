@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from annotation_toolkit.prefetch import prefetch, read_text, run_demo
+
+LATENCY = 0.02
+
+
+class SlowReader:
+    """
+    read_text() with a fixed latency that records the reads in flight.
+    """
+
+    def __init__(self, latency=LATENCY):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            return read_text(path)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def label_files(tmp_path):
+    paths = []
+    for i in range(48):
+        path = tmp_path / f"{i:03d}.txt"
+        path.write_text(f"{i % 3} 0.5 0.5 0.{i % 9 + 1} 0.1\n")
+        paths.append(path)
+    # Missing files read as None in both modes
+    paths.insert(10, tmp_path / "missing.txt")
+    return paths
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def test_same_results_faster_and_bounded(label_files):
+    sequential, sequential_time = timed(
+        lambda: [(path, SlowReader()(path)) for path in label_files]
+    )
+
+    reader = SlowReader()
+    prefetched, prefetch_time = timed(lambda: list(prefetch(label_files, reader, concurrency=8)))
+
+    assert prefetched == sequential
+    assert reader.max_in_flight <= 8
+    assert sequential_time / prefetch_time > 3
+
+
+def test_window_limits_reads_ahead(label_files):
+    taken = []
+
+    def items():
+        for path in label_files:
+            taken.append(path)
+            yield path
+
+    for consumed, _ in enumerate(prefetch(items(), SlowReader(0.001), concurrency=4, window=6), 1):
+        assert len(taken) - consumed <= 6
+
+
+def test_errors_surface_at_their_item(label_files):
+    def read(path):
+        if path.name == "005.txt":
+            raise OSError("read failed")
+        return read_text(path)
+
+    seen = []
+    with pytest.raises(OSError, match="read failed"):
+        for path, _ in prefetch(label_files, read, concurrency=4):
+            seen.append(path)
+    assert seen == label_files[:5]
+
+
+def test_demo_parses_every_box():
+    times = run_demo(num_files=20, latency=0.001, concurrency=4, boxes_per_file=5)
+    assert set(times) == {"sequential", "prefetch"}
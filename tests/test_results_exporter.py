@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from annotation_toolkit.modules import REPO_ROOT, load_converter
+
+EXAMPLE_IMAGE = REPO_ROOT / "Yolo-to-COCO-format/input/dataset/example.jpg"
+
+
+@pytest.fixture
+def read_yolo_results():
+    load_converter("yolo2coco")  # puts results_exporter on sys.path
+    from results_exporter import read_yolo_results
+
+    return read_yolo_results
+
+
+def test_reads_detections(tmp_path, read_yolo_results):
+    label = tmp_path / "pred.txt"
+    label.write_text("0 0.5 0.5 0.1 0.1 0.9\n\n1 0.25 0.25 0.1 0.1 0.3\n")
+
+    results = read_yolo_results(EXAMPLE_IMAGE, label, image_id=7)
+
+    assert results["category_id"].tolist() == [1, 2]
+    assert results["score"].tolist() == [0.9, 0.3]
+
+
+@pytest.mark.parametrize("text, line", [
+    ("0 0.5 0.5 0.1 0.1\n0 0.5 0.5 0.1 0.1 0.9 1\n", 1),  # 5 + 7 values still reshape to (2, 6)
+    ("0 0.5 0.5 0.1 0.1 0.9\n0 0.5 0.5 0.1 0.1\n", 2),
+])
+def test_rejects_wrong_column_count(tmp_path, read_yolo_results, text, line):
+    label = tmp_path / "pred.txt"
+    label.write_text(text)
+
+    with pytest.raises(ValueError, match=f"pred.txt:{line}: expected 6 values"):
+        read_yolo_results(EXAMPLE_IMAGE, label, image_id=0)
+
+
+def test_rejects_non_numeric_values(tmp_path, read_yolo_results):
+    label = tmp_path / "pred.txt"
+    label.write_text("0 0.5 0.5 0.1 0.1 high\n")
+
+    with pytest.raises(ValueError, match="pred.txt"):
+        read_yolo_results(EXAMPLE_IMAGE, label, image_id=0)
+
+
+@pytest.mark.parametrize("output_format", ["json", "columnar"])
+def test_failed_export_leaves_no_complete_looking_output(tmp_path, read_yolo_results, output_format):
+    from results_exporter import export_results, load_columnar_results
+
+    samples = []
+    for image_id in range(5):
+        label = tmp_path / f"{image_id}.txt"
+        label.write_text("0 0.5 0.5 0.1 0.1 0.9\n")
+        samples.append((image_id, EXAMPLE_IMAGE, label))
+    output = tmp_path / ("results.json" if output_format == "json" else "results")
+
+    assert export_results(samples, output, output_format, batch_size=2) == 5
+
+    # A malformed file in the third batch fails the next export midway
+    samples[4][2].write_text("0 0.5 0.5 0.1\n")
+    with pytest.raises(ValueError, match="4.txt:1"):
+        export_results(samples, output, output_format, batch_size=2)
+
+    if output_format == "json":
+        # The previous complete file is untouched and no temporary file is left
+        assert len(json.loads(output.read_text())) == 5
+        assert sorted(p.name for p in tmp_path.glob("results.json*")) == ["results.json"]
+    else:
+        assert list(output.iterdir()) == []
+        with pytest.raises(FileNotFoundError):
+            load_columnar_results(output)
+
+
+def test_export_reports_progress_per_batch(tmp_path, read_yolo_results):
+    from results_exporter import export_results
+
+    from annotation_toolkit.profiling import Profiler, profiling
+
+    class Progress(Profiler):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def add_count(self, name, n=1):
+            super().add_count(name, n)
+            if name == "images":
+                self.batches.append(n)
+                if sum(self.batches) >= 4:
+                    raise KeyboardInterrupt  # e.g. a cancelled server job
+
+    samples = []
+    for image_id in range(5):
+        label = tmp_path / f"{image_id}.txt"
+        label.write_text("0 0.5 0.5 0.1 0.1 0.9\n1 0.5 0.5 0.2 0.2 0.8\n")
+        samples.append((image_id, EXAMPLE_IMAGE, label))
+
+    with profiling(summary=False) as profiler:
+        assert export_results(samples, tmp_path / "results.json", batch_size=2) == 10
+    assert profiler.report()["counters"] == {"images": 5, "objects": 10}
+
+    progress = Progress()
+    with pytest.raises(KeyboardInterrupt), profiling(summary=False, profiler=progress):
+        export_results(samples, tmp_path / "cancelled.json", batch_size=2)
+    assert progress.batches == [2, 2]
+    assert not list(tmp_path.glob("cancelled.json*"))
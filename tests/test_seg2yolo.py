@@ -0,0 +1,148 @@
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+from annotation_toolkit.classmap import ClassMap
+from annotation_toolkit.modules import load_converter
+
+seg2yolo = load_converter("seg2yolo")
+
+
+def full_image_contours(image_bgr, color_groups):
+    """
+    Previous implementation: one binary mask over the full image per class,
+    traced with findContours. color_groups is [(class_id, [rgb, ...])].
+    """
+
+    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
+    height, width, _ = image_rgb.shape
+
+    lines = []
+    for class_id, colors in color_groups:
+        selected = np.zeros((height, width), dtype=bool)
+        for rgb in colors:
+            selected |= np.all(image_rgb == rgb, axis=2)
+        binary_mask = selected.astype(np.uint8) * 255
+        if cv2.countNonZero(binary_mask) == 0:
+            continue
+
+        contours, _ = cv2.findContours(binary_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for contour in contours:
+            if cv2.contourArea(contour) <= 1:
+                continue
+            polygon = []
+            for point in contour:
+                x, y = point[0]
+                polygon.append(x / width)
+                polygon.append(y / height)
+            lines.append(str(class_id) + " " + " ".join(map(str, polygon)) + "\n")
+
+    return "".join(lines)
+
+
+def random_mask(rng, colors):
+    """
+    Blocky random mask: disjoint regions per color, regions on every
+    border, single-pixel specks and pixels of unknown colors.
+    """
+
+    height, width = rng.integers(3, 80, 2)
+    palette = np.array([(0, 0, 0), (12, 34, 56)] + list(colors), dtype=np.uint8)
+
+    block = rng.integers(1, 9)
+    coarse = rng.integers(0, len(palette), (height // block + 1, width // block + 1))
+    labels = np.kron(coarse, np.ones((block, block), dtype=np.int64))[:height, :width]
+
+    specks = rng.random((height, width)) < 0.03
+    labels[specks] = rng.integers(0, len(palette), int(specks.sum()))
+
+    image_rgb = palette[labels]
+    return np.ascontiguousarray(image_rgb[:, :, ::-1])
+
+
+def default_groups():
+    return [(class_id, [rgb]) for rgb, class_id in seg2yolo.COLOR_TO_CLASS.items()]
+
+
+def test_matches_full_image_contours_on_random_masks():
+    rng = np.random.default_rng(0)
+    colors = list(seg2yolo.COLOR_TO_CLASS)
+
+    for _ in range(300):
+        image_bgr = random_mask(rng, colors)
+        assert seg2yolo.mask_to_yolo_txt(image_bgr) == full_image_contours(image_bgr, default_groups())
+
+
+def test_border_and_disjoint_regions():
+    rgb = list(seg2yolo.COLOR_TO_CLASS)[0]
+    image_rgb = np.zeros((20, 30, 3), dtype=np.uint8)
+    image_rgb[0:4, 0:5] = rgb       # top-left corner
+    image_rgb[16:20, 25:30] = rgb   # bottom-right corner
+    image_rgb[8:12, 12:18] = rgb    # inside
+    image_bgr = np.ascontiguousarray(image_rgb[:, :, ::-1])
+
+    text = seg2yolo.mask_to_yolo_txt(image_bgr)
+
+    assert text == full_image_contours(image_bgr, default_groups())
+    assert len(text.splitlines()) == 3
+    values = np.array([v for line in text.splitlines() for v in line.split()[1:]], dtype=float)
+    assert values.min() == 0.0
+    assert values.max() == pytest.approx(29 / 30)
+
+
+def test_two_colors_with_the_same_class(monkeypatch):
+    # Each color is still traced on its own, like the full-image path
+    colors = list(seg2yolo.COLOR_TO_CLASS)
+    color_to_class = {colors[0]: 0, colors[1]: 0, colors[2]: 1}
+    monkeypatch.setattr(seg2yolo, "COLOR_TO_CLASS", color_to_class)
+    monkeypatch.setattr(seg2yolo, "CODE_TO_CLASS", {
+        (r << 16) | (g << 8) | b: class_id for (r, g, b), class_id in color_to_class.items()
+    })
+    groups = [(class_id, [rgb]) for rgb, class_id in color_to_class.items()]
+
+    rng = np.random.default_rng(1)
+    for _ in range(100):
+        image_bgr = random_mask(rng, colors[:3])
+        assert seg2yolo.mask_to_yolo_txt(image_bgr) == full_image_contours(image_bgr, groups)
+
+
+def test_class_map_merge_traces_the_union():
+    colors = list(seg2yolo.COLOR_TO_CLASS)
+    class_lut = seg2yolo.compile_class_map(ClassMap({
+        "classes": [{"name": "merged", "from": [0, 1]}, {"name": "other", "from": [3]}],
+    }))
+    groups = [(0, [colors[0], colors[1]]), (1, [colors[3]])]
+
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        image_bgr = random_mask(rng, colors)
+        assert seg2yolo.mask_to_yolo_txt(image_bgr, class_lut) == full_image_contours(image_bgr, groups)
+
+
+def test_cli_converts_shards_like_loose_files(tmp_path):
+    from annotation_toolkit.modules import REPO_ROOT
+    from annotation_toolkit.shards import iter_samples, pack_directory
+
+    mask = cv2.imread(str(REPO_ROOT / "Seg-to-Yolo-format/data/masks/mask.png"))
+    src = tmp_path / "masks"
+    src.mkdir()
+    cv2.imwrite(str(src / "a.png"), mask)
+    cv2.imwrite(str(src / "b.png"), cv2.flip(mask, 1))
+    # Shard samples may also hold the photo; only the png member is read
+    packed = tmp_path / "packed"
+    shutil.copytree(src, packed)
+    cv2.imwrite(str(packed / "a.jpg"), mask)
+    pack_directory(packed, str(tmp_path / "masks-%06d.tar"), max_count=1)
+
+    for input_path, output_path in (
+        (src, tmp_path / "loose"),
+        (tmp_path / "masks-*.tar", tmp_path / "labels-%06d.tar"),
+    ):
+        seg2yolo.main(seg2yolo.get_args(["--input", str(input_path), "--output", str(output_path)]))
+
+    loose = {path.stem: path.read_text() for path in (tmp_path / "loose").iterdir()}
+    from_shards = {key: sample["txt"].decode() for key, sample in iter_samples(str(tmp_path / "labels-*.tar"))}
+    assert from_shards == loose
+    assert sorted(loose) == ["a", "b"] and loose["a"] != loose["b"]
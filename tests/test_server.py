@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from annotation_toolkit.modules import REPO_ROOT
+from annotation_toolkit.server import ConversionServer
+
+MASKS = REPO_ROOT / "Seg-to-Yolo-format/data/masks"
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ConversionServer(workers=1)
+    yield server
+    server.shutdown()
+
+
+def wait(server, job_id, timeout=60):
+    start = time.time()
+    while server.status(job_id)["status"] not in ("done", "failed", "cancelled"):
+        assert time.time() - start < timeout
+        time.sleep(0.05)
+    return server.status(job_id)
+
+
+def shared_keys(server, job_id):
+    return [key for key in server._shared.keys() if key.startswith(f"{job_id}:")]
+
+
+def test_finished_job_leaves_no_shared_state(server, tmp_path):
+    job_id = server.submit("seg2yolo", ["--input", str(MASKS), "--output", str(tmp_path)])
+
+    info = wait(server, job_id)
+
+    assert info["status"] == "done"
+    assert info["progress"] == 1
+    assert (tmp_path / "mask.txt").exists()
+    assert shared_keys(server, job_id) == []
+
+
+def test_cancelled_queued_job_leaves_no_shared_state(server, tmp_path):
+    # The single worker is busy with the first job, the later ones wait in the queue
+    job_ids = [
+        server.submit("seg2yolo", ["--input", str(MASKS), "--output", str(tmp_path / str(i))])
+        for i in range(4)
+    ]
+    server.cancel(job_ids[-1])
+
+    assert wait(server, job_ids[-1])["status"] == "cancelled"
+    for job_id in job_ids[:-1]:
+        wait(server, job_id)
+    for job_id in job_ids:
+        assert shared_keys(server, job_id) == []
+
+
+def test_only_recent_finished_jobs_are_kept(tmp_path):
+    server = ConversionServer(workers=1, max_finished=2)
+    try:
+        job_ids = [
+            server.submit("seg2yolo", ["--input", str(MASKS), "--output", str(tmp_path / str(i))])
+            for i in range(3)
+        ]
+        # One worker runs the jobs in order
+        wait(server, job_ids[-1])
+
+        with pytest.raises(KeyError):
+            server.status(job_ids[0])
+        assert [info["id"] for info in server.list()] == job_ids[1:]
+    finally:
+        server.shutdown()
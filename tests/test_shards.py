@@ -0,0 +1,48 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from annotation_toolkit.shards import iter_samples, split_key, unpack_shards
+
+
+def add_tar_member(archive, name, data=b"x", type=tarfile.REGTYPE, linkname=""):
+    info = tarfile.TarInfo(name)
+    info.type = type
+    info.linkname = linkname
+    info.size = len(data) if type == tarfile.REGTYPE else 0
+    archive.addfile(info, io.BytesIO(data) if type == tarfile.REGTYPE else None)
+
+
+def test_split_key_uses_first_dot_of_basename():
+    assert split_key("a.b/img.v2.JPG") == ("a.b/img", "v2.jpg")
+
+
+@pytest.mark.parametrize("name", ["../escape.txt", "a/../../escape.txt", "/tmp/escape.txt"])
+def test_unpack_rejects_paths_outside_output(tmp_path, name):
+    shard = tmp_path / "evil.tar"
+    with tarfile.open(shard, "w") as archive:
+        add_tar_member(archive, name)
+
+    with pytest.raises(ValueError):
+        unpack_shards(shard, tmp_path / "out")
+    assert not (tmp_path / "escape.txt").exists()
+
+
+def test_symlinks_and_devices_are_skipped(tmp_path):
+    shard = tmp_path / "links.tar"
+    with tarfile.open(shard, "w") as archive:
+        add_tar_member(archive, "000001.txt", b"0 0.5 0.5 0.1 0.1")
+        add_tar_member(archive, "000002.txt", type=tarfile.SYMTYPE, linkname="/etc/passwd")
+        add_tar_member(archive, "000003.txt", type=tarfile.CHRTYPE)
+
+    zip_shard = tmp_path / "links.zip"
+    with zipfile.ZipFile(zip_shard, "w") as archive:
+        archive.writestr("000001.txt", "0 0.5 0.5 0.1 0.1")
+        link = zipfile.ZipInfo("000002.txt")
+        link.external_attr = (0o120777) << 16
+        archive.writestr(link, "/etc/passwd")
+
+    for path in (shard, zip_shard):
+        assert [key for key, _ in iter_samples(path)] == ["000001"]
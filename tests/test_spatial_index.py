@@ -0,0 +1,97 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from annotation_toolkit.spatial_index import (
+    SpatialIndex,
+    build_spatial_index,
+    index_key,
+    load_spatial_index,
+)
+
+
+def random_coco(rng, num_images=5, num_boxes=200):
+    images = [
+        {"id": int(image_id), "width": int(rng.integers(50, 2000)), "height": int(rng.integers(50, 2000))}
+        for image_id in rng.permutation(100)[:num_images]
+    ]
+    annotations = []
+    for ann_id in range(num_boxes):
+        img = images[rng.integers(len(images))]
+        # Boxes may stick out of the image
+        x, y = rng.uniform(-50, img["width"] + 50), rng.uniform(-50, img["height"] + 50)
+        w, h = rng.exponential(img["width"] / 8), rng.exponential(img["height"] / 8)
+        annotations.append({
+            "id": ann_id,
+            "image_id": img["id"],
+            "category_id": int(rng.integers(1, 4)),
+            "bbox": [x, y, w, h],
+        })
+    return {"images": images, "annotations": annotations}
+
+
+def brute_force(coco, image_id, window, category_id=None):
+    x1, y1, x2, y2 = window
+    return sorted(
+        a["id"] for a in coco["annotations"]
+        if a["image_id"] == image_id
+        and (category_id is None or a["category_id"] == category_id)
+        and a["bbox"][0] <= x2 and a["bbox"][0] + a["bbox"][2] >= x1
+        and a["bbox"][1] <= y2 and a["bbox"][1] + a["bbox"][3] >= y1
+    )
+
+
+@pytest.mark.parametrize("grid_cells", [1, 4, 16])
+def test_query_matches_brute_force(tmp_path, grid_cells):
+    rng = np.random.default_rng(grid_cells)
+    coco = random_coco(rng)
+    index = SpatialIndex(build_spatial_index(coco, tmp_path / "index", grid_cells))
+
+    for _ in range(300):
+        img = coco["images"][rng.integers(len(coco["images"]))]
+        # Windows from tiny to larger than the image, partly outside it
+        x1 = rng.uniform(-100, img["width"])
+        y1 = rng.uniform(-100, img["height"])
+        window = (x1, y1, x1 + rng.exponential(img["width"] / 4), y1 + rng.exponential(img["height"] / 4))
+        category_id = None if rng.random() < 0.5 else int(rng.integers(1, 4))
+
+        ann_ids, _, _ = index.annotations(index.query(img["id"], window, category_id))
+
+        assert sorted(ann_ids.tolist()) == brute_force(coco, img["id"], window, category_id)
+
+
+def test_rejects_zero_size_images(tmp_path):
+    coco = {
+        "images": [{"id": 1, "width": 0, "height": 100}],
+        "annotations": [{"id": 1, "image_id": 1, "category_id": 1, "bbox": [0, 0, 10, 10]}],
+    }
+
+    with pytest.raises(ValueError, match="width / height"):
+        build_spatial_index(coco, tmp_path / "index")
+    assert not (tmp_path / "index" / "meta.json").exists()
+
+
+def test_rebuilds_stale_index(tmp_path):
+    json_file = tmp_path / "ann.json"
+    coco = {
+        "images": [{"id": 1, "width": 100, "height": 100}],
+        "annotations": [{"id": 1, "image_id": 1, "category_id": 1, "bbox": [0, 0, 10, 10]}],
+        "categories": [{"id": 1, "name": "a"}],
+    }
+    json_file.write_text(json.dumps(coco))
+    index = load_spatial_index(json_file)
+    assert index.meta["key"] == index_key(json_file)
+    assert index.annotations(index.query(1, (50, 50, 60, 60)))[0].tolist() == []
+
+    coco["annotations"].append({"id": 2, "image_id": 1, "category_id": 1, "bbox": [50, 50, 5, 5]})
+    json_file.write_text(json.dumps(coco))
+    os.utime(json_file, ns=(0, 10 ** 18))  # new mtime even on coarse clocks
+
+    index_dir = tmp_path / "ann.json.index"
+    with pytest.raises(ValueError, match="rebuild"):
+        SpatialIndex(index_dir)
+
+    index = load_spatial_index(json_file)
+    assert index.annotations(index.query(1, (50, 50, 60, 60)))[0].tolist() == [2]
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from annotation_toolkit.boxes import pairwise_iou
+from annotation_toolkit.suppression import suppress_boxes
+
+
+def brute_force_nms(boxes, classes, scores, iou_thr):
+    iou = pairwise_iou(boxes, boxes)
+    same_class = classes[:, None] == classes[None, :]
+    suppressed = np.zeros(len(boxes), bool)
+    keep = []
+    for i in np.argsort(-scores, kind="stable"):
+        if suppressed[i]:
+            continue
+        keep.append(i)
+        suppressed |= same_class[i] & (iou[i] >= iou_thr)
+    return np.sort(keep)
+
+
+def random_boxes(rng, num_boxes):
+    # Clustered, partly negative coordinates so classes overlap in x and the
+    # per-class shift of the sweep is exercised
+    centers = rng.uniform(-200, 200, size=(8, 2))
+    xy = centers[rng.integers(len(centers), size=num_boxes)] + rng.normal(0, 15, size=(num_boxes, 2))
+    wh = rng.uniform(0, 60, size=(num_boxes, 2))
+    return np.concatenate([xy, xy + wh], axis=1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_nms_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    num_boxes = int(rng.integers(1, 300))
+    boxes = random_boxes(rng, num_boxes)
+    classes = rng.integers(0, 4, size=num_boxes)
+    scores = rng.random(num_boxes)
+    iou_thr = rng.uniform(0.05, 0.9)
+
+    kept_boxes, kept_classes, kept_scores, keep = suppress_boxes(
+        boxes, classes, scores, method="nms", iou_thr=iou_thr
+    )
+
+    expected = brute_force_nms(boxes, classes, scores, iou_thr)
+    np.testing.assert_array_equal(keep, expected)
+    np.testing.assert_array_equal(kept_boxes, boxes[expected])
+    np.testing.assert_array_equal(kept_classes, classes[expected])
+    np.testing.assert_array_equal(kept_scores, scores[expected])
+
+
+def test_nms_without_scores_keeps_larger_boxes():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 11, 11]], dtype=float)
+
+    _, _, _, keep = suppress_boxes(boxes, np.array([0, 0]), iou_thr=0.5)
+
+    assert keep.tolist() == [1]
+
+
+def test_wbf_fuses_by_score():
+    boxes = np.array([
+        [0, 0, 10, 10],    # leader, score 0.9
+        [1, 1, 11, 11],    # IoU 81 / 119 with the leader, score 0.1
+        [50, 50, 60, 60],  # alone
+        [0, 0, 10, 10],    # same box as the leader but another class
+    ], dtype=float)
+    classes = np.array([0, 0, 0, 1])
+    scores = np.array([0.9, 0.1, 0.3, 0.2])
+
+    fused, fused_classes, fused_scores, keep = suppress_boxes(
+        boxes, classes, scores, method="wbf", iou_thr=0.5
+    )
+
+    assert keep.tolist() == [0, 2, 3]
+    # (0.9 * [0, 0, 10, 10] + 0.1 * [1, 1, 11, 11]) / (0.9 + 0.1)
+    np.testing.assert_allclose(fused, [
+        [0.1, 0.1, 10.1, 10.1],
+        [50, 50, 60, 60],
+        [0, 0, 10, 10],
+    ])
+    assert fused_classes.tolist() == [0, 0, 1]
+    # Mean score of each cluster
+    np.testing.assert_allclose(fused_scores, [0.5, 0.3, 0.2])
+
+
+@pytest.mark.parametrize("iou_thr", [0, -0.5, 1.5])
+def test_rejects_iou_thr_outside_unit_interval(iou_thr):
+    boxes = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=float)
+
+    with pytest.raises(ValueError, match="iou_thr"):
+        suppress_boxes(boxes, np.array([0, 0]), iou_thr=iou_thr)
@@ -0,0 +1,59 @@
+import json
+import shutil
+
+import pytest
+
+from annotation_toolkit.modules import REPO_ROOT
+from annotation_toolkit.tiling import slice_dataset, stitch_predictions
+
+EXAMPLE = REPO_ROOT / "Yolo-to-COCO-format/input/dataset/example"
+
+
+def make_dataset(root, *names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(EXAMPLE.with_suffix(".jpg"), path)
+        shutil.copy(EXAMPLE.with_suffix(".txt"), path.with_suffix(".txt"))
+
+
+def test_same_file_name_in_subfolders(tmp_path):
+    make_dataset(tmp_path / "images", "a/example.jpg", "b/example.jpg")
+
+    tiles = slice_dataset(tmp_path / "images", tmp_path / "tiles", tile_size=1024, workers=2)
+
+    names = [tile["tile"] for tile in tiles]
+    assert len(names) == len(set(names))
+    assert {tile["image"] for tile in tiles} == {"a__example", "b__example"}
+    assert len(list((tmp_path / "tiles/labels").iterdir())) == len(names)
+
+    # Tile labels as predictions: one output per source image
+    count = stitch_predictions(tmp_path / "tiles/tiles.json", tmp_path / "tiles/labels", tmp_path / "stitched")
+    assert count == 2
+    assert sorted(p.name for p in (tmp_path / "stitched").iterdir()) == ["a__example.txt", "b__example.txt"]
+
+
+def test_colliding_tile_names_are_rejected(tmp_path):
+    make_dataset(tmp_path / "images", "example.jpg", "example.png")
+
+    with pytest.raises(ValueError, match="share tile names"):
+        slice_dataset(tmp_path / "images", tmp_path / "tiles")
+    assert not (tmp_path / "tiles").exists()
+
+
+@pytest.mark.parametrize("overlap", [1.0, 1.5, -0.1])
+def test_invalid_overlap(tmp_path, overlap):
+    make_dataset(tmp_path / "images", "example.jpg")
+
+    with pytest.raises(ValueError, match="overlap"):
+        slice_dataset(tmp_path / "images", tmp_path / "tiles", overlap=overlap)
+
+
+def test_tiles_json_records_image_name(tmp_path):
+    make_dataset(tmp_path / "images", "example.jpg")
+
+    slice_dataset(tmp_path / "images", tmp_path / "tiles", tile_size=1024)
+
+    with open(tmp_path / "tiles/tiles.json") as f:
+        tiles = json.load(f)["tiles"]
+    assert tiles and all(tile["tile"].startswith("example_") for tile in tiles)
@@ -0,0 +1,99 @@
+import json
+import shutil
+
+import numpy as np
+
+from annotation_toolkit.boxes import duplicate_pairs, pairwise_iou
+from annotation_toolkit.modules import REPO_ROOT
+from annotation_toolkit.validate import validate_coco, validate_yolo
+
+EXAMPLE = REPO_ROOT / "Yolo-to-COCO-format/input/dataset/example"
+
+
+def test_coco_missing_keys_are_reported(tmp_path):
+    coco = {
+        "images": [{"id": 1, "width": 100, "height": 100}, {"id": 2, "width": 100}],
+        "annotations": [
+            {"id": 1, "image_id": 1, "category_id": 1, "bbox": [10, 10, 20, 20]},
+            {"id": 2, "category_id": 1, "bbox": [10, 10, 20, 20]},
+            {"id": 3, "image_id": 1, "bbox": [10, 10, 20, 20]},
+            {"id": 4, "image_id": 1, "category_id": 1, "bbox": [1, 2, "3", 4]},
+        ],
+        "categories": [{"id": 1, "name": "defect"}, {"name": "no id"}],
+    }
+    json_file = tmp_path / "coco.json"
+    json_file.write_text(json.dumps(coco))
+
+    report = validate_coco(json_file)
+
+    assert report.issue_counts == {"missing_key": 4, "malformed_line": 1}
+    messages = [example["message"] for example in report.examples["missing_key"]]
+    assert messages == [
+        "images[1] has no height",
+        "annotations[1] has no image_id",
+        "annotations[2] has no category_id",
+        "categories[1] has no id",
+    ]
+    assert report.objects == 1
+
+
+def test_coco_bad_id_types_are_reported(tmp_path):
+    coco = {
+        "images": [{"id": "img-1", "width": 100, "height": 100}, {"id": 2, "width": "100", "height": 100}],
+        "annotations": [
+            {"id": 1, "image_id": 2, "category_id": 1, "bbox": [10, 10, 20, 20]},
+            {"id": 2.5, "image_id": 2, "category_id": True, "bbox": [10, 10, 20, 20]},
+            {"id": 3, "image_id": 2 ** 70, "category_id": 1, "bbox": [10, 10, 20, 20]},
+        ],
+        "categories": [{"id": [1], "name": "defect"}],
+    }
+    json_file = tmp_path / "coco.json"
+    json_file.write_text(json.dumps(coco))
+
+    report = validate_coco(json_file)
+
+    assert report.issue_counts == {"bad_type": 6}
+    messages = [example["message"] for example in report.examples["bad_type"]]
+    assert messages == [
+        "images[0] id = 'img-1'",
+        "images[1] width = '100'",
+        "annotations[1] id = 2.5",
+        "annotations[1] category_id = True",
+        f"annotations[2] image_id = {2 ** 70}",
+        "categories[0] id = [1]",
+    ]
+    assert report.objects == 0
+
+
+def test_unreadable_image_is_reported(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    shutil.copy(EXAMPLE.with_suffix(".jpg"), images)
+    shutil.copy(EXAMPLE.with_suffix(".txt"), images)
+    (images / "broken.jpg").write_bytes(b"not an image")
+    (images / "broken.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+
+    report = validate_yolo(images)
+
+    assert report.issue_counts == {"unreadable": 1}
+    assert "broken.jpg" in report.examples["unreadable"][0]["message"]
+    assert report.files == 2
+
+
+def test_duplicate_pairs_match_full_iou_matrix():
+    rng = np.random.default_rng(0)
+    xy = rng.random((300, 2)) * 5
+    boxes = np.concatenate([xy, xy + rng.random((300, 2)) * 0.5 + 0.01], axis=1)
+    boxes = np.concatenate([boxes, boxes[:50] + 1e-4])
+    classes = rng.integers(0, 3, 300)
+    classes = np.concatenate([classes, classes[:50]])
+
+    expected = [
+        (i, j)
+        for i in range(len(boxes)) for j in range(i + 1, len(boxes))
+        if classes[i] == classes[j] and pairwise_iou(boxes[i], boxes[j])[0, 0] >= 0.5
+    ]
+
+    pairs = duplicate_pairs(boxes, classes, 0.5)
+    assert sorted(map(tuple, pairs.tolist())) == expected
+    assert len(expected) >= 50